@@ -0,0 +1,66 @@
+import json
+import pytest
+import numpy as np
+from napari_live_recording.common import AccumulationMode, MAX_FLOAT32_SUMMED_FRAMES
+from napari_live_recording.control.accumulation import FrameAccumulator
+
+
+def test_accumulation_modes(tmp_path):
+    written = []
+    accumulator = FrameAccumulator(4, AccumulationMode["Sum"], written.append)
+    for value in range(10):
+        accumulator(np.full((2, 2), 60000 + value, dtype=np.uint16))
+    assert len(written) == 2
+    # the sum of 4 uint16 frames is stored in a wider data type
+    assert written[0].dtype == np.uint32
+    assert written[0][0, 0] == 4 * 60000 + 0 + 1 + 2 + 3
+
+    # the last, incomplete group is written when the recording ends
+    accumulator.flush()
+    assert len(written) == 3
+    assert accumulator.sourceFrames == [(0, 3), (4, 7), (8, 9)]
+
+    metadataPath = tmp_path / "metadata.json"
+    accumulator.writeMetadata(str(metadataPath))
+    metadata = json.loads(metadataPath.read_text())
+    assert metadata["mode"] == "Sum"
+    assert metadata["sourceFrames"] == [[0, 3], [4, 7], [8, 9]]
+
+    written.clear()
+    accumulator = FrameAccumulator(3, AccumulationMode["Average"], written.append)
+    for value in [1, 2, 4]:
+        accumulator(np.full((2, 2), value, dtype=np.uint8))
+    assert written[0].dtype == np.uint8
+    assert np.all(written[0] == 2)
+
+
+def test_accumulation_unsupported_dtype():
+    written = []
+    accumulator = FrameAccumulator(
+        2, AccumulationMode["Sum"], written.append, ["uint8", "uint16", "float32"]
+    )
+    accumulator(np.full((2, 2), 65535, dtype=np.uint16))
+    accumulator(np.full((2, 2), 65535, dtype=np.uint16))
+    assert written[0].dtype == np.float32
+    assert np.all(written[0] == 2 * 65535)
+
+    # sums written as float32 are exact up to MAX_FLOAT32_SUMMED_FRAMES 16-bit frames
+    written.clear()
+    accumulator = FrameAccumulator(
+        MAX_FLOAT32_SUMMED_FRAMES,
+        AccumulationMode["Sum"],
+        written.append,
+        ["uint8", "uint16", "float32"],
+    )
+    for _ in range(MAX_FLOAT32_SUMMED_FRAMES):
+        accumulator(np.full((2, 2), 65535, dtype=np.uint16))
+    assert int(written[0][0, 0]) == MAX_FLOAT32_SUMMED_FRAMES * 65535
+    with pytest.raises(ValueError):
+        FrameAccumulator(
+            MAX_FLOAT32_SUMMED_FRAMES + 1,
+            AccumulationMode["Sum"],
+            written.append,
+            ["uint8", "uint16", "float32"],
+        )
+    # writers supporting 32-bit integers have no such limit
+    FrameAccumulator(1000, AccumulationMode["Sum"], written.append)
@@ -0,0 +1,31 @@
+import numpy as np
+from napari_live_recording.common import BinningMode
+from napari_live_recording.control.binning import FrameBinning
+
+
+def test_binning_modes():
+    frame = np.arange(5 * 6, dtype=np.uint16).reshape(5, 6) * 1000
+
+    # the last row does not fill a whole block and is discarded
+    summed = FrameBinning(2, BinningMode["Sum"])(frame)
+    assert summed.shape == (2, 3)
+    assert summed.dtype == np.uint32
+    assert summed[0, 0] == 0 + 1000 + 6000 + 7000
+
+    mean = FrameBinning(2, BinningMode["Mean"])(frame)
+    assert mean.dtype == np.uint16
+    assert mean[0, 0] == 3500
+
+    decimated = FrameBinning(2, BinningMode["Decimation"])(frame)
+    assert decimated.shape == (2, 3)
+    assert np.array_equal(decimated, frame[:4:2, ::2])
+    assert decimated.flags["C_CONTIGUOUS"]
+
+
+def test_binning_sum_does_not_overflow():
+    frame = np.full((8, 8, 3), 255, dtype=np.uint8)
+    binning = FrameBinning(4, BinningMode["Sum"])
+    assert binning.outputShape(frame.shape) == (2, 2, 3)
+    summed = binning(frame)
+    assert summed.dtype == np.uint16
+    assert np.all(summed == 16 * 255)
@@ -0,0 +1,85 @@
+import time
+import pytest
+import numpy as np
+from types import SimpleNamespace
+from napari_live_recording.common import ROI
+from napari_live_recording.control.frame_buffer import Framebuffer
+
+
+def make_buffer(capacity: int = 10, height: int = 4, width: int = 4) -> Framebuffer:
+    camera = SimpleNamespace(roiShape=ROI(height=height, width=width))
+    return Framebuffer(capacity, camera=camera, cameraKey="test", capacity=capacity)
+
+
+def test_pop_latest_discards_older_frames():
+    buffer = make_buffer()
+    for value in range(5):
+        buffer.addFrame(np.full((4, 4), value, dtype=np.uint16))
+
+    frame, discarded = buffer.popLatest()
+    assert np.all(frame == 4)
+    assert discarded == 4
+    assert buffer.empty
+
+    frame, discarded = buffer.popLatest()
+    assert frame is None
+    assert discarded == 0
+
+
+def test_compressed_buffer_holds_more_frames_in_same_budget():
+    buffer = make_buffer(capacity=4, height=64, width=64)
+    buffer.setCompression("zlib")
+    rng = np.random.default_rng(0)
+    frames = [
+        (1000 + rng.integers(0, 16, size=(64, 64))).astype(np.uint16)
+        for _ in range(20)
+    ]
+    for frame in frames:
+        buffer.addFrame(frame)
+    # wait for the background compression of all the frames
+    for item in list(buffer.buffer):
+        item.decompress()
+    assert buffer.compressionRatio > 2
+    assert buffer.memoryUsage <= 4 * frames[0].nbytes
+
+    # frames are restored losslessly, from the oldest one
+    first = 20 - buffer.length
+    assert np.array_equal(buffer.popHead(), frames[first])
+    assert np.array_equal(buffer.returnTail(), frames[-1])
+    assert buffer.returnTail().dtype == np.uint16
+
+
+def test_compressed_buffer_tracks_memory_usage():
+    buffer = make_buffer(capacity=4, height=64, width=64)
+    buffer.setCompression("zlib")
+    frame = np.full((64, 64), 1000, dtype=np.uint16)
+    for _ in range(10):
+        buffer.addFrame(frame)
+    for item in list(buffer.buffer):
+        item.decompress()
+    # the running counter is updated by the completion callbacks of the compression
+    deadline = time.monotonic() + 5
+    while buffer.memoryUsage != sum(item.nbytes for item in buffer.buffer):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert buffer.memoryUsage < 10 * frame.nbytes
+
+    items = list(buffer.buffer)
+    frame, discarded = buffer.popLatest()
+    assert discarded == len(items) - 1
+    assert buffer.memoryUsage == 0
+    assert all(item.storedBytes is None for item in items)
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.uint16])
+def test_compressed_frames_are_restored_writable(dtype):
+    buffer = make_buffer(height=8, width=8)
+    buffer.setCompression("zlib")
+    frame = np.arange(64, dtype=dtype).reshape(8, 8)
+    buffer.addFrame(frame)
+    restored = buffer.popHead()
+    assert restored.dtype == dtype
+    assert np.array_equal(restored, frame)
+    # in-place filters and accumulators write into the restored frames
+    restored += 1
+    assert np.array_equal(restored, frame + 1)
@@ -0,0 +1,26 @@
+import os
+from napari_live_recording.control.preflight import (
+    benchmarkWriteSpeed,
+    estimateCapacity,
+)
+
+
+def test_benchmark_write_speed(tmp_path):
+    writeSpeed = benchmarkWriteSpeed(str(tmp_path), totalBytes=2**22, blockBytes=2**20)
+    assert writeSpeed > 0
+    # the temporary file is removed
+    assert os.listdir(tmp_path) == []
+
+
+def test_estimate_capacity(tmp_path):
+    capacity = estimateCapacity(str(tmp_path), dataRate=100 * 2**20, writeSpeed=200 * 2**20)
+    assert capacity.isSustainable
+    assert capacity.maxSeconds == capacity.freeBytes * 0.8 / (100 * 2**20)
+
+    # the headroom of the write speed is kept in reserve
+    capacity = estimateCapacity(str(tmp_path), dataRate=190 * 2**20, writeSpeed=200 * 2**20)
+    assert not capacity.isSustainable
+
+    # recordings which do not write frames are not limited by the disk
+    capacity = estimateCapacity(str(tmp_path), dataRate=0, writeSpeed=200 * 2**20)
+    assert capacity.isSustainable and capacity.maxSeconds == float("inf")
@@ -0,0 +1,296 @@
+import json
+import pytest
+import numpy as np
+from napari_live_recording.common import (
+    createPipelineFilter,
+    DtypePolicy,
+    DTYPE_POLICY_KEY,
+    FilterGroups,
+    saturatingCast,
+    serializeFilterGroup,
+)
+from napari_live_recording.processing_engine.graph import FilterGraph
+from napari_live_recording.processing_engine.calibration import (
+    FlatFieldCorrection,
+    averageFrames,
+)
+from napari_live_recording.processing_engine.benchmark import (
+    benchmarkFilterGroup,
+    createSyntheticFrame,
+)
+from napari_live_recording.processing_engine.preview import (
+    StageCache,
+    evaluatePreview,
+)
+from napari_live_recording.processing_engine import registry
+from napari_live_recording.processing_engine.temporal import (
+    RollingMean,
+    FrameDifference,
+)
+
+
+def test_rolling_mean_pipeline():
+    filterGroup = {"1.RollingMean": [RollingMean, {"windowSize": 3}, {}, ""]}
+    pipeline = createPipelineFilter(filterGroup)
+
+    outputs = [pipeline(np.full((8, 8), value, dtype=np.uint16))[0, 0] for value in range(6)]
+    assert outputs == [0.0, 0.5, 1.0, 2.0, 3.0, 4.0]
+
+    # a new shape (i.e. ROI change) resets the state
+    output = pipeline(np.full((4, 4), 10, dtype=np.uint16))
+    assert output.shape == (4, 4)
+    assert np.all(output == 10)
+
+    # a new pipeline has its own state
+    newPipeline = createPipelineFilter(filterGroup)
+    assert np.all(newPipeline(np.full((8, 8), 7, dtype=np.uint16)) == 7)
+
+
+def test_rolling_mean_integer_working_dtype():
+    # the running sum of uint8 frames is kept in a wider data type
+    rollingMean = RollingMean(windowSize=4, workingDtype="uint8")
+    for _ in range(6):
+        output = rollingMean(np.full((4, 4), 250, dtype=np.uint8))
+    assert rollingMean.accumulator.sum.dtype == np.uint16
+    assert output.dtype == np.uint8
+    assert np.all(output == 250)
+
+
+def test_frame_difference():
+    difference = FrameDifference(lag=2)
+    outputs = [difference(np.full((4, 4), value * value, dtype=np.uint16))[0, 0] for value in range(5)]
+    assert outputs == [0.0, 1.0, 4.0, 8.0, 12.0]
+
+
+def test_filter_graph_shares_prefix():
+    calls = []
+
+    def double(input):
+        calls.append("double")
+        return input * 2
+
+    def increment(input):
+        calls.append("increment")
+        return input + 1
+
+    filterGroupsDict = {
+        "No Filter": {"1.No Filter": None},
+        "Double": {"1.double": [double, {}, {}, ""]},
+        "Increment": {"1.increment": [increment, {}, {}, ""]},
+    }
+    graph = FilterGraph(
+        {
+            "record": ["Double"],
+            "display": ["Double", "Increment"],
+            "raw": ["No Filter"],
+        },
+        filterGroupsDict,
+    )
+    outputs = graph(np.ones((2, 2)))
+
+    assert graph.primaryOutput == "record"
+    assert calls == ["double", "increment"]
+    assert np.all(outputs["record"] == 2)
+    assert np.all(outputs["display"] == 3)
+    assert np.all(outputs["raw"] == 1)
+
+
+def test_dtype_policy():
+    def scale(input, factor):
+        return input * factor
+
+    filterGroup = {
+        "1.scale": [scale, {"factor": 1.5}, {}, ""],
+        DTYPE_POLICY_KEY: DtypePolicy(workingDtype="float32", outputDtype="uint16"),
+    }
+    pipeline = createPipelineFilter(filterGroup)
+    output = pipeline(np.array([[0, 1000, 60000]], dtype=np.uint16))
+
+    assert output.dtype == np.uint16
+    # values above the type range saturate instead of wrapping around
+    assert output.tolist() == [[0, 1500, 65535]]
+
+
+def test_flat_field_correction():
+    dark = np.full((4, 4), 100, dtype=np.float32)
+    flat = np.full((4, 4), 1100, dtype=np.float32)
+    # one pixel is twice as sensitive as the others
+    flat[0, 0] = 2100
+    frame = np.full((4, 4), 600, dtype=np.uint16)
+    frame[0, 0] = 1100
+
+    # the mean response of the flat frame is (15 * 1000 + 2000) / 16
+    expected = 500 * 1062.5 / 1000
+    corrected = FlatFieldCorrection(dark=dark, flat=flat)(frame)
+    assert corrected.dtype == np.float32
+    np.testing.assert_allclose(corrected, expected, rtol=1e-5)
+
+    fixedPoint = FlatFieldCorrection(dark=dark, flat=flat, fixedPoint=True)(frame)
+    assert fixedPoint.dtype == np.uint16
+    assert np.all(fixedPoint == round(expected))
+
+    master = averageFrames(np.full((4, 4), value, dtype=np.uint16) for value in range(5))
+    assert master.dtype == np.float32
+    assert np.all(master == 2)
+
+
+def test_preview_reuses_cached_prefix():
+    calls = []
+
+    def add(image, value):
+        calls.append(value)
+        return image + value
+
+    def multiply(image, factor):
+        calls.append(factor)
+        return image * factor
+
+    image = np.ones((4, 4), dtype=np.float32)
+    cache = StageCache()
+    filterGroup = {
+        "1.add": [add, {"value": 1}, {}, ""],
+        "2.multiply": [multiply, {"factor": 3}, {}, ""],
+    }
+    assert np.all(evaluatePreview(image, 0, filterGroup, cache) == 6)
+    assert calls == [1, 3]
+
+    # editing the last stage only recomputes the last stage
+    filterGroup["2.multiply"][1] = {"factor": 4}
+    assert np.all(evaluatePreview(image, 0, filterGroup, cache) == 8)
+    assert calls == [1, 3, 4]
+
+    # editing the first stage recomputes everything after it
+    filterGroup["1.add"][1] = {"value": 2}
+    assert np.all(evaluatePreview(image, 0, filterGroup, cache) == 12)
+    assert calls == [1, 3, 4, 2, 4]
+
+    # a new preview image does not reuse the previous outputs
+    assert np.all(evaluatePreview(image, 1, filterGroup, cache) == 12)
+    assert calls == [1, 3, 4, 2, 4, 2, 4]
+
+    # the cache is bounded in memory
+    smallCache = StageCache(maxBytes=image.nbytes)
+    evaluatePreview(image, 0, filterGroup, smallCache)
+    assert len(smallCache) == 1
+    assert smallCache.currentBytes == image.nbytes
+
+
+def test_preview_in_place_filter_after_cached_stage():
+    def addInPlace(image, value):
+        image += value
+        return image
+
+    image = np.ones((4, 4), dtype=np.uint16)
+    cache = StageCache()
+    filterGroup = {
+        "1.cast": [saturatingCast, {"dtype": "uint16"}, {}, ""],
+        "2.add": [addInPlace, {"value": 1}, {}, ""],
+    }
+    assert np.all(evaluatePreview(image, 0, filterGroup, cache) == 2)
+    # the second stage starts from the cached (read-only) output of the first one
+    filterGroup["2.add"][1] = {"value": 2}
+    assert np.all(evaluatePreview(image, 0, filterGroup, cache) == 3)
+    # the preview image is neither modified nor frozen
+    assert np.all(image == 1)
+    assert image.flags.writeable
+
+
+def test_benchmark_filter_group():
+    frame = createSyntheticFrame((64, 64), "uint16")
+    assert frame.shape == (64, 64) and frame.dtype == np.uint16
+
+    filterGroup = {
+        "1.RollingMean": [RollingMean, {"windowSize": 3}, {}, ""],
+        DTYPE_POLICY_KEY: DtypePolicy(outputDtype="uint16"),
+    }
+    result = benchmarkFilterGroup(filterGroup, frame, iterations=5)
+    assert [stage.name for stage in result.stages] == ["1.RollingMean", "Cast to uint16"]
+    assert all(stage.meanTime > 0 for stage in result.stages)
+    # the rolling mean returns a new float32 frame at each call
+    assert result.stages[0].allocatedBytes >= 64 * 64 * 4
+    assert result.fps == 1 / result.meanTime
+
+
+def test_filter_registry_indexes_modules_without_importing(tmp_path, monkeypatch):
+    filtersFolder = tmp_path / "filters"
+    filtersFolder.mkdir()
+    (filtersFolder / "explicit.py").write_text(
+        "import numpy as np\n"
+        "from numpy import clip\n"
+        "exportedFilters = ['scale']\n"
+        "parametersDict = {'ksize': (3, 3)}\n"
+        "parametersHints = {'ksize': 'kernel size'}\n"
+        "functionDescription = 'Scales the image.'\n"
+        "def scale(input, ksize):\n"
+        "    return input\n"
+        "def helper():\n"
+        "    pass\n"
+    )
+    (filtersFolder / "implicit.py").write_text(
+        "from numpy import clip\n"
+        "parametersDict = {}\n"
+        "parametersHints = {}\n"
+        "functionDescription = ''\n"
+        "def invert(input):\n"
+        "    return -input\n"
+    )
+    indexFilePath = str(tmp_path / "index.json")
+    filterRegistry = registry.FilterRegistry(str(filtersFolder), "filters", indexFilePath)
+    filters = {info.reference: info for info in filterRegistry.scan()}
+    # only exported or locally defined filters are listed, never imported names
+    assert sorted(filters) == ["filters.explicit:scale", "filters.implicit:invert"]
+    assert filters["filters.explicit:scale"].parametersDict == {"ksize": (3, 3)}
+
+    # a new registry reuses the index for modules which did not change
+    parsedFiles = []
+    readModuleMetadata = registry.readModuleMetadata
+    monkeypatch.setattr(
+        registry,
+        "readModuleMetadata",
+        lambda filePath: parsedFiles.append(filePath) or readModuleMetadata(filePath),
+    )
+    filterRegistry = registry.FilterRegistry(str(filtersFolder), "filters", indexFilePath)
+    assert len(filterRegistry.scan()) == 2
+    assert parsedFiles == []
+
+
+def test_filter_groups_are_stored_as_references():
+    filterGroup = {
+        "1.RollingMean": [RollingMean, {"windowSize": 3}, {"windowSize": "hint"}, "mean"],
+        "2.saturatingCast": [saturatingCast, {"dtype": "uint8", "shape": (3, 3)}, {}, ""],
+        DTYPE_POLICY_KEY: DtypePolicy(workingDtype="float32"),
+    }
+    serialized = serializeFilterGroup(filterGroup)
+    assert serialized["filters"][0]["filter"] == (
+        "napari_live_recording.processing_engine.temporal:RollingMean"
+    )
+    # the serialized filter-group is plain JSON
+    filterGroups = FilterGroups(json.loads(json.dumps({"group": serialized})))
+    assert filterGroups["group"] == filterGroup
+
+    # filter-groups returned by the mapping can be edited without changing the stored one
+    filterGroups["group"]["1.RollingMean"][1]["windowSize"] = 10
+    assert filterGroups["group"]["1.RollingMean"][1]["windowSize"] == 3
+
+    with pytest.raises(ValueError):
+        filterGroups["lambda"] = {"1.lambda": [lambda x: x, {}, {}, ""]}
+    assert "lambda" not in filterGroups
+
+
+def test_preview_image_is_stored_in_user_folder(tmp_path, monkeypatch):
+    import napari_live_recording.common as common
+
+    previewImageFilePath = tmp_path / "napari-live-recording" / "preview_image.npy"
+    monkeypatch.setattr(common, "previewImageFilePath", str(previewImageFilePath))
+    monkeypatch.setattr(common, "legacyPreviewImageFilePath", str(tmp_path / "legacy.npy"))
+    monkeypatch.setattr(common, "_previewImageCache", None)
+    image = np.arange(12, dtype=np.uint16).reshape(3, 4)
+    common.Settings().setPreviewImage(image)
+    assert np.array_equal(np.load(previewImageFilePath), image)
+
+    # a preview image stored in the package by previous versions is copied to the user folder
+    previewImageFilePath.unlink()
+    np.save(tmp_path / "legacy.npy", image + 1)
+    monkeypatch.setattr(common, "_previewImageCache", None)
+    assert np.array_equal(common.Settings().getPreviewImage(), image + 1)
+    assert np.array_equal(np.load(previewImageFilePath), image + 1)
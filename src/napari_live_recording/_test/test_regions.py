@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from napari_live_recording.common import ROI
+from napari_live_recording.control.regions import (
+    RegionExtractor,
+    RegionWriter,
+    regionsFromShapes,
+)
+
+
+def test_region_extraction():
+    frame = np.arange(20 * 30, dtype=np.uint16).reshape(20, 30)
+    extractor = RegionExtractor(
+        [
+            ROI(offset_x=2, offset_y=3, height=4, width=5),
+            ROI(offset_x=20, offset_y=10, height=10, width=10),
+        ]
+    )
+    assert extractor.numberOfPixels == 4 * 5 + 10 * 10
+
+    written = {name: [] for name in extractor.names}
+    writer = RegionWriter(
+        extractor, {name: written[name].append for name in extractor.names}
+    )
+    writer(frame)
+    first, second = written["region0"][0], written["region1"][0]
+    assert np.array_equal(first, frame[3:7, 2:7])
+    assert np.array_equal(second, frame[10:20, 20:30])
+    # regions are copies, not views of the frame
+    assert first.flags["C_CONTIGUOUS"] and not np.shares_memory(first, frame)
+
+    with pytest.raises(ValueError):
+        RegionExtractor([])
+
+
+def test_regions_from_shapes():
+    rectangles = [
+        np.array([[2.4, 3.0], [2.4, 8.6], [6.0, 8.6], [6.0, 3.0]]),
+        # shapes of a 3D layer carry an extra leading coordinate
+        np.array([[0, 15, 25], [0, 15, 40], [0, 25, 40], [0, 25, 25]]),
+        # completely outside of the frame
+        np.array([[-5, -5], [-5, -1], [-1, -1], [-1, -5]]),
+    ]
+    regions = regionsFromShapes(rectangles, frameShape=(20, 30))
+    assert regions == [
+        ROI(offset_x=3, offset_y=2, height=4, width=6),
+        ROI(offset_x=25, offset_y=15, height=5, width=5),
+    ]
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from napari_live_recording.common import ROI, StatisticsFormat
+from napari_live_recording.control.regions import RegionExtractor
+from napari_live_recording.control.statistics import (
+    FrameStatistics,
+    StatisticsRecorder,
+)
+
+
+def test_frame_statistics():
+    frame = np.zeros((10, 20), dtype=np.uint8)
+    frame[2, 4] = 255
+    frame[6, 12] = 255
+    frame[0:2, 0:2] = 1
+    regions = RegionExtractor([ROI(offset_x=0, offset_y=0, height=2, width=2)])
+    statistics = FrameStatistics(
+        ["Mean", "Max", "Sum", "Saturated", "Centroid", "Region sums"], regions
+    )
+    assert statistics.columns == [
+        "frame",
+        "mean",
+        "max",
+        "sum",
+        "saturated",
+        "centroid_y",
+        "centroid_x",
+        "region0_sum",
+    ]
+    row = statistics(frame)
+    total = 2 * 255 + 4
+    assert row[0] == 0
+    assert row[1] == pytest.approx(total / 200)
+    assert row[2] == 255
+    assert row[3] == total
+    assert row[4] == 2
+    assert row[5] == pytest.approx((2 * 255 + 6 * 255 + 1 * 2) / total)
+    assert row[6] == pytest.approx((4 * 255 + 12 * 255 + 1 * 2) / total)
+    assert row[7] == 4
+    # the frame index increases with each frame
+    assert statistics(frame)[0] == 1
+
+
+@pytest.mark.parametrize("format", [StatisticsFormat["CSV"], StatisticsFormat["NPY"]])
+def test_statistics_recorder(tmp_path, format):
+    recorder = StatisticsRecorder(
+        str(tmp_path / "stats"), FrameStatistics(["Mean", "Min"]), format
+    )
+    # more frames than a chunk, so that several chunks are written
+    for value in range(1500):
+        recorder(np.full((4, 4), value % 100, dtype=np.uint16))
+    assert len(recorder.history()) == 1000
+    recorder.close()
+
+    if format == StatisticsFormat["CSV"]:
+        with open(recorder.writer.filePath) as file:
+            assert file.readline().strip() == "frame,mean,min"
+        data = np.loadtxt(recorder.writer.filePath, delimiter=",", skiprows=1)
+        frames, means = data[:, 0], data[:, 1]
+    else:
+        data = np.load(recorder.writer.filePath)
+        frames, means = data["frame"], data["mean"]
+    assert len(frames) == 1500
+    assert np.array_equal(frames, np.arange(1500))
+    assert np.array_equal(means, np.arange(1500) % 100)
@@ -0,0 +1,59 @@
+import numpy as np
+from types import SimpleNamespace
+from napari_live_recording.common import ROI
+from napari_live_recording.control.frame_buffer import Framebuffer
+from napari_live_recording.control.throughput import WriterMonitor
+
+
+def make_buffer(capacity: int = 10) -> Framebuffer:
+    camera = SimpleNamespace(roiShape=ROI(height=4, width=4))
+    return Framebuffer(capacity, camera=camera, cameraKey="test", capacity=capacity)
+
+
+def test_full_buffer_counts_dropped_frames():
+    buffer = make_buffer(capacity=4)
+    for value in range(6):
+        buffer.addFrame(np.full((4, 4), value, dtype=np.uint16))
+    assert buffer.addedFrames == 6
+    assert buffer.droppedFrames == 2
+    assert buffer.fillFraction == 1.0
+    assert np.all(buffer.popHead() == 2)
+
+
+def test_writer_monitor_detects_lagging_writer():
+    buffer = make_buffer(capacity=10)
+    frame = np.zeros((4, 4), dtype=np.uint16)
+    monitor = WriterMonitor([buffer], lagSeconds=2.0)
+    start = monitor._lastUpdate
+
+    # a writer keeping up with the camera
+    for _ in range(10):
+        buffer.addFrame(frame)
+        monitor.addFrame(buffer.popHead())
+    assert not monitor.update(start + 1.0)
+    assert monitor.status.framesPerSecond == 10
+    assert monitor.status.bytesPerSecond == 10 * frame.nbytes
+    assert monitor.status.queueDepth == 0
+
+    # the queue stays above half of the buffer: the writer is behind after two seconds
+    for _ in range(6):
+        buffer.addFrame(frame)
+    assert not monitor.update(start + 2.0)
+    assert not monitor.update(start + 3.0)
+    assert monitor.update(start + 4.0)
+    assert monitor.status.isBehind and monitor.status.queueDepth == 6
+    # the writer is reported as behind only once
+    assert not monitor.update(start + 5.0)
+    assert monitor.isBehind
+
+    # frames lost because the buffer is full also count as lagging
+    for _ in range(6):
+        buffer.addFrame(frame)
+    monitor.update(start + 6.0)
+    assert monitor.status.droppedFrames == 2
+
+    while not buffer.empty:
+        monitor.addFrame(buffer.popHead())
+    assert not monitor.update(start + 7.0)
+    assert not monitor.isBehind
+    assert monitor.status.framesPerSecond == 10
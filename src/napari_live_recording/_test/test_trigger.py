@@ -0,0 +1,46 @@
+import json
+import numpy as np
+from napari_live_recording.common import TriggerMetric, TriggerSettings
+from napari_live_recording.control.trigger import ChangeTrigger, TriggeredWriter
+
+
+def test_triggered_segments_with_pre_and_post_roll():
+    settings = TriggerSettings(threshold=20, preRollFrames=3, postRollFrames=2)
+    written = []
+    writer = TriggeredWriter(ChangeTrigger(settings), written.append)
+    frames = [np.full((16, 16), 100, dtype=np.uint16) for _ in range(40)]
+    for index in [20, 21, 22]:
+        frames[index] = np.full((16, 16), 200, dtype=np.uint16)
+    for index, frame in enumerate(frames):
+        frame[0, 0] = index
+        writer(frame)
+
+    assert writer.segments == [(17, 24)]
+    assert [frame[0, 0] for frame in written] == list(range(17, 25))
+    assert not writer.isRecording
+
+
+def test_pixels_above_level_closes_open_segment(tmp_path):
+    settings = TriggerSettings(
+        metric=TriggerMetric["Pixels above level"],
+        threshold=3,
+        pixelLevel=500,
+        subsampling=2,
+        preRollFrames=0,
+        postRollFrames=0,
+    )
+    written = []
+    writer = TriggeredWriter(ChangeTrigger(settings), written.append)
+    dark = np.zeros((8, 8), dtype=np.uint16)
+    bright = dark.copy()
+    # only the subsampled pixels are counted: 4 of them are above the level
+    bright[:4, :4] = 1000
+    for frame in [dark, bright, dark, dark, bright, bright]:
+        writer(frame)
+    writer.close()
+
+    assert writer.segments == [(1, 1), (4, 5)]
+    assert len(written) == 3
+    writer.writeMetadata(str(tmp_path / "segments.json"))
+    with open(tmp_path / "segments.json") as file:
+        assert json.load(file)["segments"] == [[1, 1], [4, 5]]
@@ -0,0 +1,304 @@
+import json
+import zlib
+from dataclasses import replace
+import numpy as np
+import pytest
+import tifffile
+from napari_live_recording.common import ColorType, FileFormat, RecordType, WriterInfo
+from napari_live_recording.control.compression import unshuffle
+from napari_live_recording.control.writers import (
+    CLASSIC_TIFF_LIMIT,
+    BatchedTiffWriter,
+    MemmapTiffWriter,
+    RawStreamWriter,
+    RolloverWriter,
+    TIFF_PAGE_OVERHEAD,
+    ZarrWriter,
+    convertRawStream,
+    createFrameWriter,
+    downsample,
+    openRawStream,
+    rawStreamReader,
+)
+
+
+def test_tiff_frame_writer(tmp_path):
+    writerInfo = WriterInfo(
+        folder=str(tmp_path),
+        filename="test",
+        fileFormat=FileFormat["ImageJ TIFF"],
+        recordType=RecordType["Number of frames"],
+    )
+    file, writeFunc = createFrameWriter(
+        str(tmp_path / "test"), writerInfo, ColorType.GRAYLEVEL
+    )
+    frames = np.arange(3 * 8 * 10, dtype=np.uint16).reshape(3, 8, 10)
+    for frame in frames:
+        writeFunc(frame)
+    file.close()
+    assert np.array_equal(tifffile.imread(tmp_path / "test.tif"), frames)
+
+
+def test_batched_tiff_writer(tmp_path):
+    frames = np.random.randint(0, 4000, (21, 8, 10)).astype(np.uint16)
+    writer = BatchedTiffWriter(
+        str(tmp_path / "batched.tif"), True, "minisblack", dict(A=1), maxFrames=8
+    )
+    for frame in frames:
+        writer.write(frame)
+    writer.close()
+    # an ImageJ file written in blocks is identical to one written frame by frame
+    with tifffile.TiffWriter(tmp_path / "frames.tif", imagej=True) as file:
+        for frame in frames:
+            file.write(
+                frame,
+                contiguous=True,
+                photometric="minisblack",
+                software="napari-live-recording",
+                metadata=dict(A=1),
+            )
+    assert (tmp_path / "batched.tif").read_bytes() == (
+        tmp_path / "frames.tif"
+    ).read_bytes()
+    with tifffile.TiffFile(tmp_path / "batched.tif") as file:
+        assert file.imagej_metadata["images"] == 21
+        assert np.array_equal(file.asarray(), frames)
+
+    writer = BatchedTiffWriter(
+        str(tmp_path / "batched.ome.tif"), False, "minisblack", maxFrames=8
+    )
+    for frame in frames:
+        writer.write(frame)
+    writer.close()
+    with tifffile.TiffFile(tmp_path / "batched.ome.tif") as file:
+        assert [series.shape for series in file.series] == [
+            (8, 8, 10),
+            (8, 8, 10),
+            (5, 8, 10),
+        ]
+        assert np.array_equal(
+            np.concatenate([series.asarray() for series in file.series]), frames
+        )
+
+
+@pytest.mark.parametrize("fileFormat", [FileFormat["ImageJ TIFF"], FileFormat["OME-TIFF"]])
+def test_memmap_tiff_writer(tmp_path, fileFormat):
+    writerInfo = WriterInfo(
+        folder=str(tmp_path),
+        filename="test",
+        fileFormat=fileFormat,
+        recordType=RecordType["Number of frames"],
+        stackSize=12,
+    )
+    file, writeFunc = createFrameWriter(
+        str(tmp_path / "test"), writerInfo, ColorType.GRAYLEVEL, frameCount=12
+    )
+    assert isinstance(file, MemmapTiffWriter)
+    frames = np.random.randint(0, 4000, (12, 8, 10)).astype(np.uint16)
+    for frame in frames:
+        writeFunc(frame)
+    with pytest.raises(ValueError):
+        writeFunc(frames[0])
+    file.close()
+    with tifffile.TiffFile(file.filePath) as result:
+        assert len(result.series) == 1
+        assert np.array_equal(result.asarray(), frames)
+
+
+def test_compressed_tiff_writer(tmp_path):
+    frames = (np.arange(20 * 8 * 10) % 50 + 1000).astype(np.uint16).reshape(20, 8, 10)
+    writer = BatchedTiffWriter(
+        str(tmp_path / "test.ome.tif"), False, "minisblack", compression="zlib", maxFrames=8
+    )
+    for frame in frames:
+        writer.write(frame)
+    writer.close()
+    with tifffile.TiffFile(tmp_path / "test.ome.tif") as file:
+        assert all(page.compression == tifffile.COMPRESSION.ADOBE_DEFLATE for page in file.pages)
+        assert np.array_equal(
+            np.concatenate([series.asarray() for series in file.series]), frames
+        )
+    # ImageJ stacks are contiguous and cannot be compressed
+    with pytest.raises(ValueError):
+        BatchedTiffWriter(str(tmp_path / "test.tif"), True, "minisblack", compression="zlib")
+
+
+@pytest.mark.parametrize("compression", [None, "lzf", "gzip"])
+def test_hdf5_frame_writer(tmp_path, compression):
+    h5py = pytest.importorskip("h5py")
+    writerInfo = WriterInfo(
+        folder=str(tmp_path),
+        filename="test",
+        fileFormat=FileFormat["HDF5"],
+        recordType=RecordType["Number of frames"],
+        compression=compression,
+    )
+    file, writeFunc = createFrameWriter(
+        str(tmp_path / "test"), writerInfo, ColorType.GRAYLEVEL, dict(Binning=2)
+    )
+    frames = np.arange(12 * 8 * 10, dtype=np.uint16).reshape(12, 8, 10)
+    for frame in frames:
+        writeFunc(frame)
+    file.close()
+    with h5py.File(tmp_path / "test.h5", "r") as result:
+        assert np.array_equal(result["frames"][:], frames)
+        assert result["frames"].attrs["Binning"] == 2
+        assert result["frames"].compression == compression
+        timestamps = result["timestamps"][:]
+        assert len(timestamps) == 12
+        assert np.all(np.diff(timestamps) >= 0)
+
+
+def readZarrArray(path):
+    """Reads a Zarr v2 array written by ZarrWriter, without requiring zarr."""
+    with open(path / ".zarray") as file:
+        metadata = json.load(file)
+    dtype, chunks = np.dtype(metadata["dtype"]), tuple(metadata["chunks"])
+    blocks = []
+    for index in range(-(-metadata["shape"][0] // chunks[0])):
+        with open(path.joinpath(str(index), *["0"] * (len(chunks) - 1)), "rb") as file:
+            data = file.read()
+        if metadata["compressor"] is not None:
+            blocks.append(unshuffle(zlib.decompress(data), chunks, dtype))
+        else:
+            blocks.append(np.frombuffer(data, dtype).reshape(chunks))
+    return np.concatenate(blocks)[: metadata["shape"][0]]
+
+
+@pytest.mark.parametrize("compression", [None, "zlib"])
+def test_zarr_frame_writer(tmp_path, compression):
+    writer = ZarrWriter(
+        str(tmp_path / "test.ome.zarr"),
+        compression,
+        dict(Binning=2),
+        pyramidLevels=1,
+        chunkBytes=8 * 10 * 2 * 4,
+    )
+    frames = np.arange(10 * 8 * 10, dtype=np.uint16).reshape(10, 8, 10)
+    for frame in frames:
+        writer.write(frame)
+    writer.close()
+    assert writer.chunkFrames == 4
+    assert np.array_equal(readZarrArray(tmp_path / "test.ome.zarr" / "0"), frames)
+    level = readZarrArray(tmp_path / "test.ome.zarr" / "1")
+    assert level.shape == (10, 4, 5)
+    assert np.array_equal(level, downsample(frames))
+    with open(tmp_path / "test.ome.zarr" / ".zattrs") as file:
+        attributes = json.load(file)
+    multiscales = attributes["multiscales"][0]
+    assert [axis["name"] for axis in multiscales["axes"]] == ["t", "y", "x"]
+    assert multiscales["datasets"][1]["coordinateTransformations"][0]["scale"] == [
+        1.0,
+        2.0,
+        2.0,
+    ]
+    assert attributes["napari-live-recording"] == {"Binning": 2}
+
+
+def test_raw_stream_writer(tmp_path):
+    path = str(tmp_path / "test.raw")
+    frames = np.random.randint(0, 4000, (50, 33, 17)).astype(np.uint16)
+    # blocks smaller than a frame, so that frames are split across writes
+    writer = RawStreamWriter(path, dict(Binning=2), blockBytes=1000)
+    assert writer.blockBytes == RawStreamWriter.ALIGNMENT
+    for frame in frames[:20]:
+        writer.write(frame)
+    # the frames written to disk so far can be read while recording
+    assert len(openRawStream(path)) <= 20
+    for frame in frames[20:]:
+        writer.write(frame)
+    with pytest.raises(ValueError):
+        writer.write(None)
+    writer.close()
+
+    stream = openRawStream(path)
+    assert isinstance(stream, np.memmap)
+    assert np.array_equal(stream, frames)
+    with open(path + ".json") as file:
+        sidecar = json.load(file)
+    assert sidecar["frameCount"] == 50
+    assert len(sidecar["timestamps"]) == 50
+    assert sidecar["metadata"] == {"Binning": 2}
+
+    assert convertRawStream(path, FileFormat["ImageJ TIFF"]) == str(tmp_path / "test.tif")
+    assert np.array_equal(tifffile.imread(tmp_path / "test.tif"), frames)
+
+    assert rawStreamReader(str(tmp_path / "test.tif")) is None
+    data, attributes, layerType = rawStreamReader(path)(path)[0]
+    assert layerType == "image" and data.shape == frames.shape
+
+
+def test_rollover_writer(tmp_path):
+    frames = np.random.randint(0, 255, (25, 16, 16)).astype(np.uint8)
+    writerInfo = WriterInfo(
+        folder=str(tmp_path),
+        filename="test",
+        fileFormat=FileFormat["OME-TIFF"],
+        recordType=RecordType["Toggled"],
+        # ten frames per file
+        rolloverBytes=10 * (frames[0].nbytes + TIFF_PAGE_OVERHEAD),
+    )
+    file, writeFunc = createFrameWriter(
+        str(tmp_path / "test"), writerInfo, ColorType.GRAYLEVEL
+    )
+    assert isinstance(file, RolloverWriter)
+    for frame in frames:
+        writeFunc(frame)
+    with pytest.raises(ValueError):
+        writeFunc(None)
+    file.close()
+
+    assert file.partPaths == [
+        str(tmp_path / "test.ome.tif"),
+        str(tmp_path / "test_0001.ome.tif"),
+        str(tmp_path / "test_0002.ome.tif"),
+    ]
+    # the file opened ahead of time for the next part is removed
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "test.ome.tif",
+        "test_0001.ome.tif",
+        "test_0002.ome.tif",
+    ]
+    parts = [tifffile.imread(path) for path in file.partPaths]
+    assert [len(part) for part in parts] == [10, 10, 5]
+    assert np.array_equal(np.concatenate(parts), frames)
+    assert not tifffile.TiffFile(file.partPaths[0]).is_bigtiff
+
+    # without rollover, OME-TIFF recordings of unknown length are a single BigTIFF file
+    writerInfo = replace(writerInfo, rolloverBytes=0)
+    file, writeFunc = createFrameWriter(
+        str(tmp_path / "long"), writerInfo, ColorType.GRAYLEVEL
+    )
+    assert isinstance(file, BatchedTiffWriter)
+    writeFunc(frames[0])
+    file.close()
+    assert tifffile.TiffFile(tmp_path / "long.ome.tif").is_bigtiff
+
+    # ImageJ does not support BigTIFF: recordings of unknown length are split before 4 GB
+    file, writeFunc = createFrameWriter(
+        str(tmp_path / "imagej"),
+        replace(writerInfo, fileFormat=FileFormat["ImageJ TIFF"]),
+        ColorType.GRAYLEVEL,
+    )
+    assert isinstance(file, RolloverWriter) and file.maxBytes == CLASSIC_TIFF_LIMIT
+    file.close()
+
+    # compressed recordings of known length are BigTIFF only if they may exceed 4 GB
+    compressedInfo = replace(writerInfo, compression="zlib")
+    for name, frameCount, isBigTiff in [("short", 25, False), ("huge", 2**24, True)]:
+        file, writeFunc = createFrameWriter(
+            str(tmp_path / name), compressedInfo, ColorType.GRAYLEVEL, frameCount=frameCount
+        )
+        assert isinstance(file, BatchedTiffWriter)
+        writeFunc(frames[0])
+        file.close()
+        assert tifffile.TiffFile(tmp_path / f"{name}.ome.tif").is_bigtiff == isBigTiff
+
+    # OME-TIFF files allowed to exceed 4 GB are written as BigTIFF
+    writerInfo = replace(writerInfo, rolloverBytes=2 * CLASSIC_TIFF_LIMIT)
+    file, writeFunc = createFrameWriter(
+        str(tmp_path / "big"), writerInfo, ColorType.GRAYLEVEL
+    )
+    writeFunc(frames[0])
+    file.close()
+    assert tifffile.TiffFile(tmp_path / "big.ome.tif").is_bigtiff
@@ -1,11 +1,22 @@
 from __future__ import annotations
 from enum import IntEnum
-from dataclasses import dataclass
+from collections.abc import MutableMapping
+from dataclasses import dataclass, asdict
 from functools import total_ordering
+from typing import Tuple
 import pymmcore_plus as mmc
+import numpy as np
 import os
-from qtpy.QtCore import QSettings, Qt
+import copy
+import importlib
+import importlib.util
+import json
+from qtpy.QtCore import QSettings, QStandardPaths, Qt
 import functools, pims
+from napari_live_recording.processing_engine.temporal import (
+    accumulatorDtype,
+    isTemporalFilter,
+)
 
 
 settingsFilePath = os.path.join(
@@ -13,6 +24,36 @@ settingsFilePath = os.path.join(
 )
 settings = QSettings(settingsFilePath, QSettings.IniFormat)
 
+# cache of the metadata of the filter modules; it depends on the local installation,
+# so it is kept in the cache folder of the user rather than in the package
+filterIndexFilePath = os.path.join(
+    QStandardPaths.writableLocation(QStandardPaths.GenericCacheLocation),
+    "napari-live-recording",
+    "filter_index.json",
+)
+
+# preview image of the filter creation window; the package folder may be read-only,
+# so it is kept in the data folder of the user (previous versions stored it in the package)
+previewImageFilePath = os.path.join(
+    QStandardPaths.writableLocation(QStandardPaths.GenericDataLocation),
+    "napari-live-recording",
+    "preview_image.npy",
+)
+legacyPreviewImageFilePath = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), "./preview_image.npy"
+)
+
+# settings keys of the filter-groups; the legacy key
+# stored the filter-groups as pickled Python objects
+FILTER_GROUPS_KEY = "filterGroups"
+LEGACY_FILTER_GROUPS_KEY = "availableFilterGroups"
+LEGACY_PREVIEW_IMAGE_KEY = "Preview Image"
+
+# filter-groups and preview image are read from disk once,
+# then kept in memory until they are changed
+_filterGroupsCache: FilterGroups = None
+_previewImageCache: np.ndarray = None
+
 class Settings:
     def __init__(self) -> None:
         self.settings = settings
@@ -26,18 +67,112 @@ class Settings:
         else:
             return None
 
-    def getFilterGroupsDict(self):
-        if self.settings.contains("availableFilterGroups"):
-            return self.settings.value("availableFilterGroups")
-        else:
-            self.settings.setValue(
-                "availableFilterGroups", {"No Filter": {"1.No Filter": None}}
-            )
-            return self.settings.value("availableFilterGroups")
+    def getFilterGroupsDict(self) -> FilterGroups:
+        """Returns the available filter-groups. Filter-groups are stored as references to their
+        filter functions and are resolved (imported) only when accessed; the result is cached in memory
+        and shared by all the callers until `setFilterGroupsDict` is called."""
+        global _filterGroupsCache
+        if _filterGroupsCache is None:
+            if self.settings.contains(FILTER_GROUPS_KEY):
+                serialized = json.loads(self.settings.value(FILTER_GROUPS_KEY))
+                _filterGroupsCache = FilterGroups(serialized)
+            else:
+                _filterGroupsCache = FilterGroups({})
+                if self.settings.contains(LEGACY_FILTER_GROUPS_KEY):
+                    _filterGroupsCache.update(self._readLegacyFilterGroups())
+                    self.settings.remove(LEGACY_FILTER_GROUPS_KEY)
+                self.setFilterGroupsDict(_filterGroupsCache)
+        return _filterGroupsCache
+
+    def _readLegacyFilterGroups(self) -> dict:
+        """Reads the filter-groups stored as pickled objects by older versions, skipping the ones that can not be converted."""
+        legacyGroups = self.settings.value(LEGACY_FILTER_GROUPS_KEY) or {}
+        filterGroups = {}
+        for name, filters in legacyGroups.items():
+            try:
+                serializeFilterGroup(filters)
+                filterGroups[name] = filters
+            except Exception as e:
+                print(f"Could not convert filter-group {name}: {e}")
+        return filterGroups
 
     def setFilterGroupsDict(self, newDict):
+        global _filterGroupsCache
         newDict["No Filter"] = {"1.No Filter": None}
-        self.settings.setValue("availableFilterGroups", newDict)
+        if not isinstance(newDict, FilterGroups):
+            filterGroups = FilterGroups({})
+            filterGroups.update(newDict)
+            newDict = filterGroups
+        self.settings.setValue(FILTER_GROUPS_KEY, json.dumps(newDict.serialized))
+        _filterGroupsCache = newDict
+
+    def getPreviewImage(self) -> np.ndarray:
+        """Returns the preview image of the filter creation window, or None if it was never set."""
+        global _previewImageCache
+        if _previewImageCache is None:
+            if os.path.exists(previewImageFilePath):
+                _previewImageCache = np.load(previewImageFilePath)
+            elif os.path.exists(legacyPreviewImageFilePath):
+                self.setPreviewImage(np.load(legacyPreviewImageFilePath))
+            elif self.settings.contains(LEGACY_PREVIEW_IMAGE_KEY):
+                self.setPreviewImage(self.settings.value(LEGACY_PREVIEW_IMAGE_KEY))
+                self.settings.remove(LEGACY_PREVIEW_IMAGE_KEY)
+        return _previewImageCache
+
+    def setPreviewImage(self, image: np.ndarray):
+        global _previewImageCache
+        os.makedirs(os.path.dirname(previewImageFilePath), exist_ok=True)
+        np.save(previewImageFilePath, image)
+        _previewImageCache = image
+
+    def getFilterGraphsDict(self):
+        """Returns the available filter graphs as a dictionary
+        (graph name -> output name -> ordered list of filter group names)."""
+        if self.settings.contains("availableFilterGraphs"):
+            return self.settings.value("availableFilterGraphs")
+        else:
+            return {}
+
+    def setFilterGraphsDict(self, newDict):
+        self.settings.setValue("availableFilterGraphs", newDict)
+
+
+# reserved key of a filter group storing its DtypePolicy;
+# all the other keys of a filter group are filter stages
+DTYPE_POLICY_KEY = "dtypePolicy"
+
+# data types selectable as working/output data type of a filter group;
+# None keeps the data type of the incoming frame
+AVAILABLE_DTYPES = [None, "uint8", "uint16", "float32", "float64"]
+
+
+def getFilterStages(filters: dict) -> dict:
+    """Returns the filter stages of a filter group, excluding its DtypePolicy."""
+    return {key: value for key, value in filters.items() if key != DTYPE_POLICY_KEY}
+
+
+def getDtypePolicy(filters: dict) -> DtypePolicy:
+    """Returns the DtypePolicy of a filter group, or a default one if none is set."""
+    return filters.get(DTYPE_POLICY_KEY, DtypePolicy())
+
+
+def saturatingCast(frame: np.ndarray, dtype) -> np.ndarray:
+    """Casts a frame to a new data type. When casting to an integer type,
+    values outside of the type range are clipped instead of wrapping around
+    and floating point values are rounded to the nearest integer."""
+    dtype = np.dtype(dtype)
+    if frame.dtype == dtype:
+        return frame
+    if dtype.kind in "ui":
+        info = np.iinfo(dtype)
+        if frame.dtype.kind == "f":
+            frame = np.rint(frame)
+            return np.clip(frame, info.min, info.max, out=frame).astype(dtype)
+        elif frame.dtype.kind in "ui" and (
+            np.iinfo(frame.dtype).min < info.min or np.iinfo(frame.dtype).max > info.max
+        ):
+            return np.clip(frame, info.min, info.max).astype(dtype)
+    return frame.astype(dtype)
 
 
 def createPipelineFilter(filters):
@@ -47,10 +182,28 @@ def createPipelineFilter(filters):
         )
 
     functionList = []
+    dtypePolicy = getDtypePolicy(filters)
+
+    if dtypePolicy.workingDtype is not None:
+        functionList.append(
+            functools.partial(saturatingCast, dtype=dtypePolicy.workingDtype)
+        )
 
-    for filter in filters.values():
-        filterPartial = functools.partial(filter[0], **filter[1])
-        functionList.append(pims.pipeline(filterPartial))
+    for filter in getFilterStages(filters).values():
+        if isTemporalFilter(filter[0]):
+            # stateful filters are instantiated once per pipeline,
+            # so that each pipeline owns its own accumulators
+            functionList.append(filter[0](**filter[1]))
+        else:
+            filterPartial = functools.partial(filter[0], **filter[1])
+            # pims.pipeline requires the wrapped callable to have a name
+            functools.update_wrapper(filterPartial, filter[0])
+            functionList.append(pims.pipeline(filterPartial))
+
+    if dtypePolicy.outputDtype is not None:
+        functionList.append(
+            functools.partial(saturatingCast, dtype=dtypePolicy.outputDtype)
+        )
     composedFunction = composeFunctions(list(reversed(functionList)))
     return composedFunction
 
@@ -59,15 +212,103 @@ def createPipelineFilter(filters):
 # for 30 Hz and 60 Hz refresh rates
 THIRTY_FPS = 33
 SIXTY_FPS = 16
+# refresh intervals are multiplied by this factor while the display rate is reduced
+REDUCED_DISPLAY_RATE_FACTOR = 4
 FileFormat = IntEnum(
-    value="FileFormat", names=[("ImageJ TIFF", 1), ("OME-TIFF", 2), ("HDF5", 3)]
+    value="FileFormat",
+    names=[
+        ("ImageJ TIFF", 1),
+        ("OME-TIFF", 2),
+        ("HDF5", 3),
+        ("OME-Zarr", 4),
+        ("Raw stream", 5),
+    ],
 )
 
 RecordType = IntEnum(
     value="RecordType",
-    names=[("Number of frames", 1), ("Time (seconds)", 2), ("Toggled", 3)],
+    names=[
+        ("Number of frames", 1),
+        ("Time (seconds)", 2),
+        ("Toggled", 3),
+        ("Triggered", 4),
+    ],
+)
+
+# change metric of a triggered recording, computed on a subsampled frame;
+# - Mean absolute difference: mean absolute difference from a running background;
+# - Pixels above level: number of pixels brighter than a given level
+TriggerMetric = IntEnum(
+    value="TriggerMetric",
+    names=[("Mean absolute difference", 1), ("Pixels above level", 2)],
+)
+
+# scheduling of the processing stage;
+# - Lossless: every acquired frame is processed (used for recording);
+# - Latest only: only the newest acquired frame is processed, older ones are discarded
+ProcessingMode = IntEnum(
+    value="ProcessingMode", names=[("Lossless", 1), ("Latest only", 2)]
+)
+
+
+# combination of consecutive frames when accumulating frames during recording
+AccumulationMode = IntEnum(
+    value="AccumulationMode", names=[("Sum", 1), ("Average", 2)]
 )
 
+# reduction applied to each block of pixels by the software binning of a camera
+BinningMode = IntEnum(
+    value="BinningMode", names=[("Sum", 1), ("Mean", 2), ("Decimation", 3)]
+)
+
+# software binning factors selectable for each camera
+AVAILABLE_BINNING_FACTORS = [1, 2, 4]
+
+# frames written by a recording;
+# - Raw: the frames acquired by the cameras;
+# - Processed: the frames after calibration and filtering (and their statistics);
+# - Raw and processed: both, in separate files
+RecordingMode = IntEnum(
+    value="RecordingMode",
+    names=[("Raw", 1), ("Processed", 2), ("Raw and processed", 3)],
+)
+
+# reaction to a writer which falls behind the camera during a recording;
+# - Warn only: a warning is shown;
+# - Reduce display rate: the live plots are refreshed less often;
+# - Drop processed frames: frames are not passed to the processing stage until the writers catch up,
+#   so that the raw recording is preserved;
+# - Stop recording: the recording is stopped, keeping the frames acquired so far
+BackpressurePolicy = IntEnum(
+    value="BackpressurePolicy",
+    names=[
+        ("Warn only", 1),
+        ("Reduce display rate", 2),
+        ("Drop processed frames", 3),
+        ("Stop recording", 4),
+    ],
+)
+
+# file format of the per-frame statistics streamed during recording
+StatisticsFormat = IntEnum(
+    value="StatisticsFormat", names=[("CSV", 1), ("NPY", 2), ("Parquet", 3)]
+)
+
+# per-frame statistics which can be streamed during recording;
+# "Saturated" counts the pixels at the maximum value of the data type,
+# "Centroid" is the intensity-weighted center of the frame (row, column),
+# "Region sums" is the sum of each region of interest of the camera
+AVAILABLE_STATISTICS = [
+    "Mean",
+    "Min",
+    "Max",
+    "Sum",
+    "Std",
+    "Saturated",
+    "Centroid",
+    "Region sums",
+]
+
 
 class ColorType(IntEnum):
     GRAYLEVEL = 0
@@ -81,6 +322,68 @@ TIFF_PHOTOMETRIC_MAP = {
 }
 
 
+# data types which can be stored in ImageJ TIFF files
+IMAGEJ_DTYPES = ["uint8", "uint16", "float32"]
+
+# largest number of 16-bit frames whose sum is held exactly by a float32 (24-bit significand),
+# i.e. the data type of the sums stored in ImageJ TIFF files
+MAX_FLOAT32_SUMMED_FRAMES = 2**24 // np.iinfo(np.uint16).max
+
+# lossless compressions of OME-TIFF files (name -> tifffile compression, horizontal predictor);
+# zstd and lzw are only available when imagecodecs is installed
+TIFF_COMPRESSIONS = {
+    "zlib": ("zlib", False),
+    "zlib + predictor": ("zlib", True),
+}
+if importlib.util.find_spec("imagecodecs") is not None:
+    TIFF_COMPRESSIONS["zstd"] = ("zstd", False)
+    TIFF_COMPRESSIONS["lzw + predictor"] = ("lzw", True)
+
+# lossless compressions available for each file format (None: uncompressed);
+# ImageJ stacks are stored contiguously, which rules out compression
+FILE_COMPRESSIONS = {
+    FileFormat["ImageJ TIFF"]: [None],
+    FileFormat["OME-TIFF"]: [None, *TIFF_COMPRESSIONS],
+    FileFormat["HDF5"]: [None, "lzf", "gzip"],
+    FileFormat["OME-Zarr"]: [None, "zlib"],
+    FileFormat["Raw stream"]: [None],
+}
+
+
+@dataclass(frozen=True)
+class TriggerSettings:
+    """Dataclass for the settings of a triggered recording."""
+
+    metric: TriggerMetric = TriggerMetric["Mean absolute difference"]
+    """Change metric computed on each frame.
+    """
+
+    threshold: float = 10.0
+    """Value of the metric above which frames are recorded.
+    """
+
+    pixelLevel: float = 1000.0
+    """Pixel value above which pixels are counted by the "Pixels above level" metric.
+    """
+
+    subsampling: int = 4
+    """Step between the pixels used to compute the metric, along both axes.
+    """
+
+    backgroundRate: float = 0.05
+    """Weight of each new frame in the running background (exponential moving average).
+    """
+
+    preRollFrames: int = 10
+    """Number of frames before the trigger which are recorded as well.
+    """
+
+    postRollFrames: int = 30
+    """Number of frames recorded after the metric falls below the threshold (hold-off);
+    the segment continues if the metric crosses the threshold again in the meantime.
+    """
+
+
 @dataclass(frozen=True)
 class WriterInfo:
     folder: str
@@ -89,6 +392,151 @@ class WriterInfo:
     recordType: RecordType
     stackSize: int = 0
     acquisitionTime: float = 0
+    accumulatedFrames: int = 1
+    accumulationMode: AccumulationMode = AccumulationMode["Average"]
+    statistics: Tuple[str, ...] = ()
+    statisticsFormat: StatisticsFormat = StatisticsFormat["CSV"]
+    writeFrames: bool = True
+    trigger: TriggerSettings = TriggerSettings()
+    compression: str = None
+    pyramidLevels: int = 0
+    rolloverBytes: int = 0
+    rolloverSeconds: float = 0
+    backpressurePolicy: BackpressurePolicy = BackpressurePolicy["Warn only"]
+    backpressureSeconds: float = 2.0
+
+
+@dataclass(frozen=True)
+class DtypePolicy:
+    """Dataclass for the data type policy of a filter group."""
+
+    workingDtype: str = None
+    """Data type of the frames entering the first filter of the group. None keeps the camera data type.
+    """
+
+    outputDtype: str = None
+    """Data type of the frames returned by the group, obtained with a saturating cast. None keeps the data type returned by the last filter.
+    """
+
+
+def _encodeParameter(value):
+    """Converts a filter parameter to a JSON compatible value, preserving tuples."""
+    if isinstance(value, tuple):
+        return {"__tuple__": [_encodeParameter(item) for item in value]}
+    if isinstance(value, list):
+        return [_encodeParameter(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _encodeParameter(item) for key, item in value.items()}
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _decodeParameter(value):
+    if isinstance(value, dict):
+        if list(value.keys()) == ["__tuple__"]:
+            return tuple(_decodeParameter(item) for item in value["__tuple__"])
+        return {key: _decodeParameter(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decodeParameter(item) for item in value]
+    return value
+
+
+def filterReference(filter) -> str:
+    """Returns the `module:function` reference of a filter function or temporal filter class."""
+    module = getattr(filter, "__module__", None)
+    name = getattr(filter, "__qualname__", None)
+    if module is None or name is None or "<" in name:
+        raise ValueError(f"{filter!r} can not be referenced by name")
+    return f"{module}:{name}"
+
+
+def resolveFilterReference(reference: str):
+    """Returns the filter function or temporal filter class of a `module:function` reference."""
+    moduleName, name = reference.split(":")
+    resolved = importlib.import_module(moduleName)
+    for attribute in name.split("."):
+        resolved = getattr(resolved, attribute)
+    return resolved
+
+
+def serializeFilterGroup(filters: dict) -> dict:
+    """Converts a filter-group into a JSON compatible dictionary, where each filter
+    is stored as a `module:function` reference and its parameters as JSON values."""
+    serialized = {"filters": []}
+    for name, filter in getFilterStages(filters).items():
+        if filter is None:
+            serialized["filters"].append({"name": name, "filter": None})
+        else:
+            serialized["filters"].append(
+                {
+                    "name": name,
+                    "filter": filterReference(filter[0]),
+                    "parameters": _encodeParameter(filter[1]),
+                    "hints": filter[2],
+                    "description": filter[3],
+                }
+            )
+    dtypePolicy = getDtypePolicy(filters)
+    if dtypePolicy != DtypePolicy():
+        serialized[DTYPE_POLICY_KEY] = asdict(dtypePolicy)
+    return serialized
+
+
+def deserializeFilterGroup(serialized: dict) -> dict:
+    """Converts a dictionary created by `serializeFilterGroup` back into a filter-group."""
+    filters = {}
+    for stage in serialized["filters"]:
+        if stage["filter"] is None:
+            filters[stage["name"]] = None
+        else:
+            filters[stage["name"]] = [
+                resolveFilterReference(stage["filter"]),
+                _decodeParameter(stage["parameters"]),
+                stage["hints"],
+                stage["description"],
+            ]
+    if DTYPE_POLICY_KEY in serialized:
+        filters[DTYPE_POLICY_KEY] = DtypePolicy(**serialized[DTYPE_POLICY_KEY])
+    return filters
+
+
+class FilterGroups(MutableMapping):
+    def __init__(self, serialized: dict) -> None:
+        """Dictionary of filter-groups (filter-group name -> filter-group) backed by their serialized form.
+        A filter-group is resolved the first time it is accessed and the resolved filters are cached;
+        each access returns a new copy of the filter-group, so that editing it
+        (i.e. in the filter creation window) does not change the stored one.
+
+        Args:
+            serialized (dict): filter-groups serialized with `serializeFilterGroup`.
+        """
+        self.serialized = serialized
+        self._resolved = {}
+
+    def __getitem__(self, name: str) -> dict:
+        if name not in self._resolved:
+            self._resolved[name] = deserializeFilterGroup(self.serialized[name])
+        filters = {}
+        for key, filter in self._resolved[name].items():
+            if isinstance(filter, list):
+                filter = [filter[0], copy.deepcopy(filter[1]), filter[2], filter[3]]
+            filters[key] = filter
+        return filters
+
+    def __setitem__(self, name: str, filters: dict) -> None:
+        self.serialized[name] = serializeFilterGroup(filters)
+        self._resolved.pop(name, None)
+
+    def __delitem__(self, name: str) -> None:
+        del self.serialized[name]
+        self._resolved.pop(name, None)
+
+    def __iter__(self):
+        return iter(self.serialized)
+
+    def __len__(self) -> int:
+        return len(self.serialized)
 
 
 @total_ordering
@@ -1,19 +1,43 @@
 import numpy as np
-import tifffile.tifffile as tiff
 import os
+import time
 from contextlib import contextmanager
 from napari.qt.threading import thread_worker, FunctionWorker
 from qtpy.QtCore import QThread, QObject, Signal, QTimer
 from napari_live_recording.common import (
-    TIFF_PHOTOMETRIC_MAP,
+    ROI,
+    IMAGEJ_DTYPES,
     WriterInfo,
     RecordType,
+    ProcessingMode,
+    BinningMode,
+    BackpressurePolicy,
+    RecordingMode,
     Settings,
     createPipelineFilter,
 )
 from napari_live_recording.control.devices.interface import ICamera
+from napari_live_recording.control.binning import FrameBinning
+from napari_live_recording.control.accumulation import FrameAccumulator
+from napari_live_recording.control.regions import RegionExtractor, RegionWriter
+from napari_live_recording.control.trigger import ChangeTrigger, TriggeredWriter
+from napari_live_recording.control.writers import createFrameWriter
+from napari_live_recording.control.statistics import (
+    FrameStatistics,
+    StatisticsRecorder,
+)
 from napari_live_recording.control.frame_buffer import Framebuffer
-from typing import Dict, NamedTuple
+from napari_live_recording.control.throughput import WriterMonitor
+from napari_live_recording.control.preflight import (
+    benchmarkWriteSpeed,
+    estimateCapacity,
+)
+from napari_live_recording.processing_engine.graph import FilterGraph
+from napari_live_recording.processing_engine.calibration import (
+    FlatFieldCorrection,
+    averageFrames,
+)
+from typing import Callable, Dict, List, NamedTuple, Tuple, Union
 from functools import partial
 
 
@@ -44,6 +68,10 @@ class MainController(QObject):
     newTimePoint = Signal(int)
     newMaxTimePoint = Signal(int)
     cameraDeleted = Signal(bool)
+    writerBehind = Signal(str, str)
+    writerCaughtUp = Signal(str, str)
+    capacityChecked = Signal(object)
+    capacityCheckFailed = Signal(str)
 
     def __init__(self) -> None:
         """Main Controller class. Stores all camera objects to access live and stack recordings."""
@@ -52,6 +80,8 @@ class MainController(QObject):
         self.rawBuffers: Dict[str, Framebuffer] = {}
         self.preProcessingBuffers: Dict[str, Framebuffer] = {}
         self.postProcessingBuffers: Dict[str, Framebuffer] = {}
+        self.graphOutputs: Dict[str, Dict[str, np.ndarray]] = {}
+        self.processingSinks: Dict[str, Dict[str, List[Callable]]] = {}
         self.settings = Settings()
         self.filterGroupsDict = self.settings.getFilterGroupsDict()
         self.stackSize = 50
@@ -59,11 +89,32 @@ class MainController(QObject):
         self.__isAcquiring = False
         self.isProcessing: Dict[str, bool] = {}
         self.isAppending: Dict[str, bool] = {}
+        self.skippedFrames: Dict[str, int] = {}
+        self.calibrationMasters: Dict[str, Dict[str, np.ndarray]] = {}
+        self.calibrations: Dict[str, FlatFieldCorrection] = {}
+        self.isCalibrationEnabled: Dict[str, bool] = {}
+        self.isCalibrationFixedPoint: Dict[str, bool] = {}
+        self.binnings: Dict[str, FrameBinning] = {}
+        self.regions: Dict[str, RegionExtractor] = {}
+        self.statisticsRecorders: Dict[str, StatisticsRecorder] = {}
+        # throughput of the writers of the current recording ("raw" and "processed") of each camera
+        self.writerMonitors: Dict[str, Dict[str, WriterMonitor]] = {}
+        self.backpressurePolicy = BackpressurePolicy["Warn only"]
+        self.isDroppingProcessed: Dict[str, bool] = {}
+        self.droppedProcessedFrames: Dict[str, int] = {}
+        # buffers filled by the acquisition loop; a recording fills only the buffers of its outputs
+        self.isBufferingRaw = True
+        self.isBufferingProcessed = True
+        self.writerMonitorTimer = QTimer()
+        self.writerMonitorTimer.setInterval(500)
+        self.writerMonitorTimer.timeout.connect(self.checkWriters)
         self.recordSignalCounter = SignalCounter()
         self.recordSignalCounter.maxCountReached.connect(
             lambda: self.recordFinished.emit()
         )
         self.recordFinished.connect(self.resetRecordingCounter)
+        self.recordFinished.connect(self.stopWriterMonitoring)
+        self.recordFinished.connect(self.resetBuffering)
 
     @property
     def isAcquiring(self) -> bool:
@@ -96,10 +147,17 @@ class MainController(QObject):
         self.postProcessingBuffers[cameraKey] = Framebuffer(
             self.stackSize, camera=camera, cameraKey=cameraKey, capacity=self.stackSize
         )
+        self.graphOutputs[cameraKey] = {}
+        self.processingSinks[cameraKey] = {}
         self.isProcessing[cameraKey] = False
         self.isAppending[cameraKey] = False
-
-        self.recordSignalCounter.maxCount += 3
+        self.skippedFrames[cameraKey] = 0
+        self.calibrationMasters[cameraKey] = {}
+        self.isCalibrationEnabled[cameraKey] = False
+        self.isCalibrationFixedPoint[cameraKey] = False
+        self.writerMonitors[cameraKey] = {}
+        self.isDroppingProcessed[cameraKey] = False
+        self.droppedProcessedFrames[cameraKey] = 0
         return cameraKey
 
     def appendToBuffer(self, toggle: bool):
@@ -111,11 +169,11 @@ class MainController(QObject):
                 for cameraKey in self.deviceControllers.keys():
                     try:
                         if self.isAppending[cameraKey]:
-                            currentFrame = np.copy(
-                                self.deviceControllers[cameraKey].device.grabFrame()
-                            )
-                            self.rawBuffers[cameraKey].addFrame(currentFrame)
-                            self.preProcessingBuffers[cameraKey].addFrame(currentFrame)
+                            currentFrame = self.grabFrame(cameraKey)
+                            if self.isBufferingRaw:
+                                self.rawBuffers[cameraKey].addFrame(currentFrame)
+                            if self.isBufferingProcessed:
+                                self.addProcessedFrame(cameraKey, currentFrame)
                     except Exception as e:
                         pass
 
@@ -134,48 +192,253 @@ class MainController(QObject):
                     self.rawBuffers[key].appendingFinished.disconnect()
                 except:
                     pass
+                try:
+                    self.preProcessingBuffers[key].appendingFinished.disconnect()
+                except:
+                    pass
+
+    def addProcessedFrame(self, cameraKey: str, frame: np.ndarray) -> None:
+        """Passes a frame to the processing stage, unless processed frames are dropped
+        because the writers of the camera are behind."""
+        if self.isDroppingProcessed[cameraKey]:
+            self.droppedProcessedFrames[cameraKey] += 1
+        else:
+            self.preProcessingBuffers[cameraKey].addFrame(frame)
+
+    def grabFrame(self, cameraKey: str) -> np.ndarray:
+        """Grabs a new frame from a camera, applying its software binning if enabled.
+        The returned frame is always a new array, not shared with the camera."""
+        frame = self.deviceControllers[cameraKey].device.grabFrame()
+        binning = self.binnings.get(cameraKey)
+        if binning is not None:
+            return binning(frame)
+        return np.copy(frame)
+
+    def setBinning(
+        self, cameraKey: str, factor: int, mode: BinningMode = BinningMode["Mean"]
+    ) -> None:
+        """Sets the software binning of a camera, applied to each frame before it is stored in the buffers.
+        A factor of 1 disables the binning."""
+        if factor == 1:
+            self.binnings.pop(cameraKey, None)
+        else:
+            self.binnings[cameraKey] = FrameBinning(factor, mode)
+
+    def setBufferCompression(self, cameraKey: str, codec: str = None) -> None:
+        """Sets the lossless codec used to keep the raw frames of a camera compressed in memory
+        until they are written (None disables the compression). The raw buffer is cleared."""
+        self.rawBuffers[cameraKey].setCompression(codec)
+
+    def setRegions(self, cameraKey: str, regions: List[ROI]) -> None:
+        """Sets the regions of interest recorded for a camera; each region is written to its own file
+        instead of the full frame. An empty list disables the multi-ROI recording."""
+        if len(regions) == 0:
+            self.regions.pop(cameraKey, None)
+        else:
+            self.regions[cameraKey] = RegionExtractor(regions)
+
+    def addProcessingSink(
+        self, camName: str, outputName: str, sink: Callable[[np.ndarray], None]
+    ) -> None:
+        """Adds a destination for one of the outputs of the filter graph of a camera.
+        The sink is called from the processing thread with each new frame of the output."""
+        self.processingSinks[camName].setdefault(outputName, []).append(sink)
+
+    def clearProcessingSinks(self, camName: str) -> None:
+        self.processingSinks[camName].clear()
+
+    def evaluateFilterGraph(
+        self, camName: str, filterGraph: FilterGraph, frame: np.ndarray
+    ) -> np.ndarray:
+        """Evaluates a filter graph on a frame and fans out each output to its destinations.
+        The primary output is returned, so that it can be stored in the post-processing buffer;
+        the latest frame of every other output is kept available for the live view."""
+        outputs = filterGraph(frame)
+        for outputName, outputFrame in outputs.items():
+            if outputName != filterGraph.primaryOutput:
+                self.graphOutputs[camName][outputName] = outputFrame
+            for sink in self.processingSinks[camName].get(outputName, []):
+                sink(outputFrame)
+        return outputs[filterGraph.primaryOutput]
+
+    def createProcessingFunction(
+        self, camName: str, selectedFilterGroup: Union[Dict, FilterGraph]
+    ) -> Callable[[np.ndarray], np.ndarray]:
+        """Builds the function applied to each frame of a camera in the processing stage:
+        the flat-field calibration of the camera (if enabled) followed by the selected
+        filter-group or filter-graph."""
+        functionList = []
+        calibration = self.calibrations.get(camName)
+        if calibration is not None and self.isCalibrationEnabled[camName]:
+            functionList.append(calibration)
+        if isinstance(selectedFilterGroup, FilterGraph):
+            self.graphOutputs[camName].clear()
+            functionList.append(
+                partial(self.evaluateFilterGraph, camName, selectedFilterGroup)
+            )
+        # if no filter-group is selected for camName the frame is left unchanged
+        elif list(selectedFilterGroup.values())[0] is not None:
+            functionList.append(createPipelineFilter(selectedFilterGroup))
+
+        def processingFunction(frame: np.ndarray) -> np.ndarray:
+            if frame is None:
+                raise ValueError("No frame available")
+            for function in functionList:
+                frame = function(frame)
+            return frame
+
+        return processingFunction
+
+    def captureCalibrationFrame(
+        self, cameraKey: str, frameType: str, numberOfFrames: int
+    ) -> None:
+        """Captures a master dark or flat frame by averaging consecutive frames of a camera,
+        and updates the precomputed flat-field correction of the camera.
+        If the camera is acquiring, appending to the buffers is paused during the capture.
+
+        Args:
+            cameraKey (str): key of the camera.
+            frameType (str): either "dark" or "flat".
+            numberOfFrames (int): number of averaged frames.
+        """
+        device = self.deviceControllers[cameraKey].device
+        with self.appendToBufferPaused():
+            device.setAcquisitionStatus(True)
+            master = averageFrames(
+                self.grabFrame(cameraKey) for _ in range(numberOfFrames)
+            )
+            if not self.isAcquiring:
+                device.setAcquisitionStatus(False)
+        masters = self.calibrationMasters[cameraKey]
+        masters[frameType] = master
+        # masters captured with a different ROI are not compatible anymore
+        for otherType in list(masters.keys()):
+            if masters[otherType].shape != master.shape:
+                masters.pop(otherType)
+        self.updateCalibration(cameraKey)
+
+    def measureFrameRate(
+        self, cameraKey: str, seconds: float = 1.0
+    ) -> Tuple[float, int]:
+        """Measures the frame rate of a camera and the size of its frames. While the camera is acquiring,
+        the frames added to its raw buffer are counted; otherwise frames are grabbed for the given time.
+
+        Args:
+            cameraKey (str): key of the camera.
+            seconds (float, optional): duration of the measurement (seconds). Defaults to 1.0.
+
+        Returns:
+            Tuple[float, int]: frames per second and bytes per frame.
+        """
+        if self.isAcquiring and self.isAppending[cameraKey]:
+            buffer = self.rawBuffers[cameraKey]
+            startFrames, start = buffer.addedFrames, time.perf_counter()
+            time.sleep(seconds)
+            frames = buffer.addedFrames - startFrames
+            return frames / (time.perf_counter() - start), buffer.returnTail().nbytes
+        device = self.deviceControllers[cameraKey].device
+        device.setAcquisitionStatus(True)
+        frame = self.grabFrame(cameraKey)
+        frames, start = 0, time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            self.grabFrame(cameraKey)
+            frames += 1
+        elapsed = time.perf_counter() - start
+        if not self.isAcquiring:
+            device.setAcquisitionStatus(False)
+        return frames / elapsed, frame.nbytes
+
+    def checkRecordingCapacity(
+        self, folder: str, outputsPerFrame: float = 2.0, headroom: float = 0.2
+    ) -> None:
+        """Pre-flight check of a recording: measures the frame rate of each camera and the write speed
+        of the recording folder in a background thread, then emits `capacityChecked` with the
+        `RecordingCapacity` of the folder (or `capacityCheckFailed` with the error message).
+
+        Args:
+            folder (str): folder of the recording.
+            outputsPerFrame (float, optional): frames written for each acquired frame (e.g. 2 for the raw and processed frames). Defaults to 2.0.
+            headroom (float, optional): fraction of the write speed and free space kept in reserve. Defaults to 0.2.
+        """
+
+        @thread_worker(
+            worker_class=FunctionWorker,
+            connect={
+                "returned": self.capacityChecked.emit,
+                "errored": lambda error: self.capacityCheckFailed.emit(str(error)),
+            },
+            start_thread=False,
+        )
+        def checkCapacity():
+            dataRate = 0.0
+            for cameraKey in list(self.deviceControllers.keys()):
+                frameRate, frameBytes = self.measureFrameRate(cameraKey)
+                dataRate += frameRate * frameBytes * outputsPerFrame
+            writeSpeed = benchmarkWriteSpeed(folder)
+            return estimateCapacity(folder, dataRate, writeSpeed, headroom)
+
+        self.capacityWorker = checkCapacity()
+        self.capacityWorker.start()
+
+    def clearCalibration(self, cameraKey: str) -> None:
+        self.calibrationMasters[cameraKey].clear()
+        self.calibrations.pop(cameraKey, None)
+
+    def setCalibrationOptions(
+        self, cameraKey: str, enabled: bool, fixedPoint: bool = False
+    ) -> None:
+        self.isCalibrationEnabled[cameraKey] = enabled
+        self.isCalibrationFixedPoint[cameraKey] = fixedPoint
+        self.updateCalibration(cameraKey)
+
+    def updateCalibration(self, cameraKey: str) -> None:
+        """Precomputes the flat-field correction maps of a camera from its master frames."""
+        masters = self.calibrationMasters[cameraKey]
+        if len(masters) == 0:
+            self.calibrations.pop(cameraKey, None)
+            return
+        self.calibrations[cameraKey] = FlatFieldCorrection(
+            dark=masters.get("dark"),
+            flat=masters.get("flat"),
+            fixedPoint=self.isCalibrationFixedPoint[cameraKey],
+        )
 
     def processFrames(
-        self, status: bool, type: str, camName: str, selectedFilterGroup: Dict = None
+        self,
+        status: bool,
+        type: str,
+        camName: str,
+        selectedFilterGroup: Union[Dict, FilterGraph] = None,
+        mode: ProcessingMode = ProcessingMode["Lossless"],
     ):
+        def popNextFrame(camName: str) -> np.ndarray:
+            if mode == ProcessingMode["Latest only"]:
+                frame, discarded = self.preProcessingBuffers[camName].popLatest()
+                self.skippedFrames[camName] += discarded
+                return frame
+            else:
+                return self.preProcessingBuffers[camName].popHead()
+
         @thread_worker(
             worker_class=FunctionWorker,
             start_thread=False,
         )
         def processFramesLoop(camName: str) -> None:
             self.isProcessing[camName] = True
-            # if no filter-group is selected for camName
-            if list(selectedFilterGroup.values())[0] == None:
-                while self.preProcessingBuffers[camName].empty:
-                    pass
+            self.skippedFrames[camName] = 0
+            filterFunction = self.createProcessingFunction(camName, selectedFilterGroup)
+            while self.preProcessingBuffers[camName].empty:
+                pass
 
-                while (
-                    self.isAppending[camName]
-                    or not self.preProcessingBuffers[camName].empty
-                ):
-                    try:
-                        self.postProcessingBuffers[camName].addFrame(
-                            self.preProcessingBuffers[camName].popHead()
-                        )
-                    except Exception as e:
-                        pass
-            # if a certain filter-group is selected for camName
-            else:
-                filterFunction = createPipelineFilter(selectedFilterGroup)
-                while self.preProcessingBuffers[camName].empty:
+            while (
+                self.isAppending[camName]
+                or not self.preProcessingBuffers[camName].empty
+            ):
+                try:
+                    frame_processed = filterFunction(popNextFrame(camName))
+                    self.postProcessingBuffers[camName].addFrame(frame_processed)
+                except Exception as e:
                     pass
-
-                while (
-                    self.isAppending[camName]
-                    or not self.preProcessingBuffers[camName].empty
-                ):
-                    try:
-                        frame_processed = filterFunction(
-                            self.preProcessingBuffers[camName].popHead()
-                        )
-                        self.postProcessingBuffers[camName].addFrame(frame_processed)
-                    except Exception as e:
-                        pass
             self.isProcessing[camName] = False
 
         if type == "live":
@@ -225,6 +488,17 @@ class MainController(QObject):
             self.isProcessing[cameraKey] = False
             self.isProcessing.pop(cameraKey)
             self.isAppending.pop(cameraKey)
+            self.skippedFrames.pop(cameraKey)
+            self.calibrationMasters.pop(cameraKey)
+            self.calibrations.pop(cameraKey, None)
+            self.isCalibrationEnabled.pop(cameraKey)
+            self.isCalibrationFixedPoint.pop(cameraKey)
+            self.binnings.pop(cameraKey, None)
+            self.regions.pop(cameraKey, None)
+            self.statisticsRecorders.pop(cameraKey, None)
+            self.writerMonitors.pop(cameraKey)
+            self.isDroppingProcessed.pop(cameraKey)
+            self.droppedProcessedFrames.pop(cameraKey)
             self.cameraDeleted.emit(False)
 
             self.deviceControllers[cameraKey].device.close()
@@ -235,36 +509,51 @@ class MainController(QObject):
             self.rawBuffers.pop(cameraKey)
             self.preProcessingBuffers.pop(cameraKey)
             self.postProcessingBuffers.pop(cameraKey)
-
-            self.recordSignalCounter.maxCount -= 3
+            self.graphOutputs.pop(cameraKey)
+            self.processingSinks.pop(cameraKey)
         except RuntimeError:
             # camera already deleted
             pass
 
-    def returnNewestFrame(self, cameraKey: str) -> None:
+    def returnNewestFrame(self, cameraKey: str, outputName: str = None) -> None:
+        """Returns the newest processed frame of a camera. If an output name is given,
+        the newest frame of that output of the selected filter graph is returned instead."""
         if self.isAcquiring:
+            if outputName is not None:
+                return self.graphOutputs[cameraKey].get(outputName)
             newestFrame = self.postProcessingBuffers[cameraKey].returnTail()
             return newestFrame
         else:
             pass
 
-    def live(self, status: bool, filtersList: dict):
+    def live(
+        self,
+        status: bool,
+        filtersList: dict,
+        mode: ProcessingMode = ProcessingMode["Latest only"],
+    ):
+        """Starts or stops the live acquisition. By default only the newest frame
+        is processed, so that the display latency does not grow when the filters
+        are slower than the camera; skipped frames are counted in `skippedFrames`."""
         for key in filtersList.keys():
             self.isAppending[key] = status
             self.rawBuffers[key].allowOverwrite = status
             self.preProcessingBuffers[key].allowOverwrite = status
             self.postProcessingBuffers[key].allowOverwrite = status
         for key in filtersList.keys():
-            self.processFrames(status, "live", key, filtersList[key])
+            self.processFrames(status, "live", key, filtersList[key], mode)
 
     def snap(self, cameraKey: str, selectedFilter) -> np.ndarray:
         self.deviceControllers[cameraKey].device.setAcquisitionStatus(True)
-        if list(selectedFilter.values())[0] == None:
-            image = self.deviceControllers[cameraKey].device.grabFrame()
-        else:
-            image_ = self.deviceControllers[cameraKey].device.grabFrame()
+        image = self.grabFrame(cameraKey)
+        calibration = self.calibrations.get(cameraKey)
+        if calibration is not None and self.isCalibrationEnabled[cameraKey]:
+            image = calibration(image)
+        if isinstance(selectedFilter, FilterGraph):
+            image = selectedFilter(image)[selectedFilter.primaryOutput]
+        elif list(selectedFilter.values())[0] != None:
             composedFunction = createPipelineFilter(selectedFilter)
-            image = composedFunction(image_)
+            image = composedFunction(image)
         self.deviceControllers[cameraKey].device.setAcquisitionStatus(False)
         return image
 
@@ -274,7 +563,9 @@ class MainController(QObject):
 
     def process(self, filtersList: dict, writerInfo: WriterInfo) -> None:
         def closeFile(filename) -> None:
-            files[filename].close()
+            # the statistics file of a camera is closed together with its frames file
+            for file in files[filename]:
+                file.close()
 
         def timeStackBuffer(camName: str, acquisitionTime: float):
             #TODO change into timer 
@@ -284,6 +575,10 @@ class MainController(QObject):
             self.postProcessingBuffers[camName].allowOverwrite = False
             self.postProcessingBuffers[camName].clearBuffer()
             self.postProcessingBuffers[camName].stackSize = round(acquisitionTime * 30)
+            self.preProcessingBuffers[camName].appendingFinished.connect(
+                self.stopAppendingForRecording
+            )
+            self.isAppending[camName] = True
 
         def fixedStackBuffer(camName: str, stackSize: int):
             self.preProcessingBuffers[camName].allowOverwrite = False
@@ -292,17 +587,24 @@ class MainController(QObject):
             self.postProcessingBuffers[camName].allowOverwrite = False
             self.postProcessingBuffers[camName].clearBuffer()
             self.postProcessingBuffers[camName].stackSize = stackSize
+            self.preProcessingBuffers[camName].appendingFinished.connect(
+                self.stopAppendingForRecording
+            )
+            self.isAppending[camName] = True
 
         def toggledBuffer(camName: str):
             self.preProcessingBuffers[camName].allowOverwrite = True
             self.postProcessingBuffers[camName].allowOverwrite = True
+            self.isAppending[camName] = True
 
         @thread_worker(
             worker_class=FunctionWorker,
             connect={"returned": closeFile},
             start_thread=False,
         )
-        def stackWriteToFile(filename: str, camName: str, writeFunc) -> str:
+        def stackWriteToFile(
+            filename: str, camName: str, writeFunc, monitor: WriterMonitor
+        ) -> str:
             while not self.isProcessing[camName]:
                 pass
             while (
@@ -315,6 +617,7 @@ class MainController(QObject):
                     else:
                         frame = self.postProcessingBuffers[camName].popHead()
                         writeFunc(frame)
+                        monitor.addFrame(frame)
                 except Exception as e:
                     pass
 
@@ -325,7 +628,9 @@ class MainController(QObject):
             connect={"returned": closeFile},
             start_thread=False,
         )
-        def toggledWriteToFile(filename: str, camName: str, writeFunc) -> str:
+        def toggledWriteToFile(
+            filename: str, camName: str, writeFunc, monitor: WriterMonitor
+        ) -> str:
             while not self.isProcessing[camName]:
                 pass
             while (
@@ -339,8 +644,13 @@ class MainController(QObject):
                         frame = self.postProcessingBuffers[camName].popHead()
 
                         writeFunc(frame)
+                        monitor.addFrame(frame)
                 except Exception as e:
                     pass
+            # the segment still open at the end of a triggered recording is closed
+            if filename in triggeredWriters:
+                triggeredWriters[filename].close()
+                triggeredWriters[filename].writeMetadata(filename + "_segments.json")
             return filename
 
         # when building the writer function for a specific type of
@@ -354,41 +664,64 @@ class MainController(QObject):
             )
             for camName in filtersList.keys()
         ]
-        sizes = [
-            self.deviceControllers[camName].device.roiShape.pixelSizes
-            for camName in filtersList.keys()
-        ]
         colorMaps = [
             self.deviceControllers[camName].device.colorType
             for camName in filtersList.keys()
         ]
-        files = {}
-        extension = ""
-        if writerInfo.fileFormat in [1, 2]:
-            kwargs = dict()
-            if writerInfo.fileFormat == 1:  # ImageJ TIFF
-                extension = ".tif"
-                kwargs.update(dict(imagej=True))
-            else:  # OME-TIFF
-                extension = ".ome.tif"
-                kwargs.update(dict(ome=True))
-            files = {
-                filename: tiff.TiffWriter(filename + extension, **kwargs)
-                for filename in filenames
-            }
-            writeFuncs = [
-                partial(
-                    file.write,
-                    photometric=TIFF_PHOTOMETRIC_MAP[colorMap][0],
-                    software="napari-live-recording",
-                    contiguous=kwargs.get("imagej", False),
+        files = {filename: [] for filename in filenames}
+        writeFuncs = [None for _ in filenames]
+        if writerInfo.writeFrames:
+            for index, (filename, colorMap) in enumerate(zip(filenames, colorMaps)):
+                file, writeFuncs[index] = createFrameWriter(
+                    filename, writerInfo, colorMap
                 )
-                for file, size, colorMap in zip(list(files.values()), sizes, colorMaps)
-            ]
+                files[filename].append(file)
+
+        # in a triggered recording only the segments in which the trigger fires
+        # (evaluated on the processed frames) are written
+        triggeredWriters = {}
+        if writerInfo.recordType == RecordType["Triggered"]:
+            for index, filename in enumerate(filenames):
+                if writeFuncs[index] is not None:
+                    writeFuncs[index] = TriggeredWriter(
+                        ChangeTrigger(writerInfo.trigger), writeFuncs[index]
+                    )
+                    triggeredWriters[filename] = writeFuncs[index]
+
+        # per-frame statistics of the processed frames are streamed to a separate file;
+        # when frames are not written, the statistics are the only output of the recording
+        self.statisticsRecorders.clear()
+        if len(writerInfo.statistics) > 0:
+            for index, (filename, camName) in enumerate(
+                zip(filenames, filtersList.keys())
+            ):
+                recorder = StatisticsRecorder(
+                    filename + "_statistics",
+                    FrameStatistics(writerInfo.statistics, self.regions.get(camName)),
+                    writerInfo.statisticsFormat,
+                )
+                self.statisticsRecorders[camName] = recorder
+                files[filename].append(recorder)
+                writeFuncs[index] = self._combineWriteFuncs(writeFuncs[index], recorder)
+        writeFuncs = [
+            writeFunc if writeFunc is not None else self._discardFrame
+            for writeFunc in writeFuncs
+        ]
 
-        else:
-            # TODO: implement HDF5 writing
-            raise ValueError("Unsupported file format selected for recording!")
+        # processed frames wait to be written in both the pre- and post-processing buffers
+        monitors = []
+        for camName in filtersList.keys():
+            self.isDroppingProcessed[camName] = False
+            self.droppedProcessedFrames[camName] = 0
+            monitor = WriterMonitor(
+                [self.preProcessingBuffers[camName], self.postProcessingBuffers[camName]],
+                writerInfo.backpressureSeconds,
+            )
+            self.writerMonitors[camName]["processed"] = monitor
+            monitors.append(monitor)
+        self.startWriterMonitoring(writerInfo.backpressurePolicy)
+        # a processing worker and a writer worker for each camera
+        self.recordSignalCounter.maxCount += 2 * len(filenames)
 
         fileWorkers = []
 
@@ -397,9 +730,9 @@ class MainController(QObject):
                 fixedStackBuffer(camName, writerInfo.stackSize)
 
             fileWorkers = [
-                stackWriteToFile(filename, camName, writeFunc)
-                for filename, camName, writeFunc in zip(
-                    filenames, filtersList.keys(), writeFuncs
+                stackWriteToFile(filename, camName, writeFunc, monitor)
+                for filename, camName, writeFunc, monitor in zip(
+                    filenames, filtersList.keys(), writeFuncs, monitors
                 )
             ]
 
@@ -407,19 +740,19 @@ class MainController(QObject):
             for camName in filtersList.keys():
                 timeStackBuffer(camName, writerInfo.acquisitionTime)
             fileWorkers = [
-                stackWriteToFile(filename, camName, writeFunc)
-                for filename, camName, writeFunc in zip(
-                    filenames, filtersList.keys(), writeFuncs
+                stackWriteToFile(filename, camName, writeFunc, monitor)
+                for filename, camName, writeFunc, monitor in zip(
+                    filenames, filtersList.keys(), writeFuncs, monitors
                 )
             ]
 
-        elif writerInfo.recordType == RecordType["Toggled"]:
+        elif writerInfo.recordType in [RecordType["Toggled"], RecordType["Triggered"]]:
             for camName in filtersList.keys():
                 toggledBuffer(camName)
             fileWorkers = [
-                toggledWriteToFile(filename, camName, writeFunc)
-                for filename, camName, writeFunc in zip(
-                    filenames, filtersList.keys(), writeFuncs
+                toggledWriteToFile(filename, camName, writeFunc, monitor)
+                for filename, camName, writeFunc, monitor in zip(
+                    filenames, filtersList.keys(), writeFuncs, monitors
                 )
             ]
 
@@ -430,11 +763,31 @@ class MainController(QObject):
             fileworker.finished.connect(lambda: self.closeWorkerConnection(fileworker))
             fileworker.start()
 
+    @staticmethod
+    def _discardFrame(frame: np.ndarray) -> None:
+        """Writer function of recordings which do not store frames."""
+        pass
+
+    @staticmethod
+    def _combineWriteFuncs(
+        writeFunc: Callable[[np.ndarray], None], sink: Callable[[np.ndarray], None]
+    ) -> Callable[[np.ndarray], None]:
+        if writeFunc is None:
+            return sink
+
+        def combinedWriteFunc(frame: np.ndarray) -> None:
+            sink(frame)
+            writeFunc(frame)
+
+        return combinedWriteFunc
+
     def record(self, camNames: list, writerInfo: WriterInfo) -> None:
         self.recordingTimer = QTimer(singleShot=True)
 
         def closeFile(filename) -> None:
-            files[filename].close()
+            # a camera recording regions of interest writes one file per region
+            for file in files[filename]:
+                file.close()
 
         def timeStackBuffer(camName: str, acquisitionTime: float):
             self.rawBuffers[camName].allowOverwrite = False
@@ -458,12 +811,25 @@ class MainController(QObject):
             self.rawBuffers[camName].allowOverwrite = True
             self.isAppending[camName] = True
 
+        def finishWriting(filename: str, writeFunc) -> None:
+            # the segment still open at the end of a triggered recording is closed
+            if isinstance(writeFunc, TriggeredWriter):
+                writeFunc.close()
+                writeFunc.writeMetadata(filename + "_segments.json")
+                writeFunc = writeFunc.writeFunc
+            # frames accumulated after the last complete group are written as well
+            if isinstance(writeFunc, FrameAccumulator):
+                writeFunc.flush()
+                writeFunc.writeMetadata(filename + "_accumulation.json")
+
         @thread_worker(
             worker_class=FunctionWorker,
             connect={"returned": closeFile},
             start_thread=False,
         )
-        def stackWriteToFile(filename: str, camName: str, writeFunc) -> str:
+        def stackWriteToFile(
+            filename: str, camName: str, writeFunc, monitor: WriterMonitor
+        ) -> str:
             try:
                 while self.rawBuffers[camName].empty:
                     pass
@@ -471,8 +837,10 @@ class MainController(QObject):
                     try:
                         frame = self.rawBuffers[camName].popHead()
                         writeFunc(frame)
+                        monitor.addFrame(frame)
                     except Exception as e:
                         pass
+                finishWriting(filename, writeFunc)
             except Exception as e:
                 pass
             return filename
@@ -482,14 +850,19 @@ class MainController(QObject):
             connect={"returned": closeFile},
             start_thread=False,
         )
-        def toggledWriteToFile(filename: str, camName: str, writeFunc) -> str:
+        def toggledWriteToFile(
+            filename: str, camName: str, writeFunc, monitor: WriterMonitor
+        ) -> str:
             while self.rawBuffers[camName].empty:
                 pass
-                while self.isAppending[camName] or not self.rawBuffers[camName].empty:
-                    try:
-                        writeFunc(self.rawBuffers[camName].popHead())
-                    except:
-                        pass
+            while self.isAppending[camName] or not self.rawBuffers[camName].empty:
+                try:
+                    frame = self.rawBuffers[camName].popHead()
+                    writeFunc(frame)
+                    monitor.addFrame(frame)
+                except:
+                    pass
+            finishWriting(filename, writeFunc)
             return filename
 
         # when building the writer function for a specific type of
@@ -506,33 +879,84 @@ class MainController(QObject):
             self.deviceControllers[camName].device.colorType for camName in camNames
         ]
         files = {}
-        extension = ""
-        if writerInfo.fileFormat in [1, 2]:
-            kwargs = dict()
-            if writerInfo.fileFormat == 1:  # ImageJ TIFF
-                extension = ".tif"
-                kwargs.update(dict(imagej=True))
-            else:  # OME-TIFF
-                extension = ".ome.tif"
-                kwargs.update(dict(ome=True))
-            files = {
-                filename: tiff.TiffWriter(filename + extension, **kwargs)
-                for filename in filenames
-            }
+        metadata = {}
+        if writerInfo.accumulatedFrames > 1:
+            metadata.update(
+                AccumulationMode=writerInfo.accumulationMode.name,
+                AccumulatedFrames=writerInfo.accumulatedFrames,
+            )
+
+        # the length of a fixed-size recording is known in advance,
+        # so that its files can be preallocated
+        frameCount = None
+        if writerInfo.recordType == RecordType["Number of frames"]:
+            frameCount = -(-writerInfo.stackSize // writerInfo.accumulatedFrames)
+
+        def createWriteFunc(
+            filename: str, filePath: str, colorMap, fileMetadata: dict = None
+        ) -> Callable:
+            file, writeFunc = createFrameWriter(
+                filePath,
+                writerInfo,
+                colorMap,
+                {**metadata, **(fileMetadata or {})},
+                frameCount,
+            )
+            files.setdefault(filename, []).append(file)
+            return writeFunc
+
+        writeFuncs = []
+        for filename, camName, colorMap in zip(filenames, camNames, colorMaps):
+            extractor = self.regions.get(camName)
+            if not writerInfo.writeFrames:
+                # the buffer is still emptied, but no file is created
+                files[filename] = []
+                writeFuncs.append(self._discardFrame)
+            elif extractor is None:
+                writeFuncs.append(createWriteFunc(filename, filename, colorMap))
+            else:
+                # only the regions of interest are stored, each in its own file
+                regionWriteFuncs = {
+                    name: createWriteFunc(
+                        filename,
+                        f"{filename}_{name}",
+                        colorMap,
+                        dict(RegionOffsetX=region.offset_x, RegionOffsetY=region.offset_y),
+                    )
+                    for name, region in zip(extractor.names, extractor.regions)
+                }
+                writeFuncs.append(RegionWriter(extractor, regionWriteFuncs))
+
+        # when accumulating, every N consecutive frames are combined
+        # and only the result is passed to the writer
+        if writerInfo.accumulatedFrames > 1 and writerInfo.writeFrames:
             writeFuncs = [
-                partial(
-                    file.write,
-                    photometric=TIFF_PHOTOMETRIC_MAP[colorMap][0],
-                    software="napari-live-recording",
-                    contiguous=kwargs.get("imagej", False),
+                FrameAccumulator(
+                    writerInfo.accumulatedFrames,
+                    writerInfo.accumulationMode,
+                    writeFunc,
+                    IMAGEJ_DTYPES if writerInfo.fileFormat == 1 else None,
                 )
-                for file, colorMap in zip(list(files.values()), colorMaps)
+                for writeFunc in writeFuncs
             ]
-        else:
-            # TODO: implement HDF5 writing
-            raise ValueError(
-                "Unsupported file format selected for recording! HDF5 will be implemented in the future."
+
+        # in a triggered recording only the segments in which the trigger fires are written;
+        # frames are gated before being accumulated
+        if writerInfo.recordType == RecordType["Triggered"] and writerInfo.writeFrames:
+            writeFuncs = [
+                TriggeredWriter(ChangeTrigger(writerInfo.trigger), writeFunc)
+                for writeFunc in writeFuncs
+            ]
+
+        monitors = []
+        for camName in camNames:
+            monitor = WriterMonitor(
+                [self.rawBuffers[camName]], writerInfo.backpressureSeconds
             )
+            self.writerMonitors[camName]["raw"] = monitor
+            monitors.append(monitor)
+        self.startWriterMonitoring(writerInfo.backpressurePolicy)
+        self.recordSignalCounter.maxCount += len(filenames)
 
         fileWorkers = []
 
@@ -541,22 +965,28 @@ class MainController(QObject):
                 fixedStackBuffer(camName, writerInfo.stackSize)
 
             fileWorkers = [
-                stackWriteToFile(filename, camName, writeFunc)
-                for filename, camName, writeFunc in zip(filenames, camNames, writeFuncs)
+                stackWriteToFile(filename, camName, writeFunc, monitor)
+                for filename, camName, writeFunc, monitor in zip(
+                    filenames, camNames, writeFuncs, monitors
+                )
             ]
         elif writerInfo.recordType == RecordType["Time (seconds)"]:
             for camName in camNames:
                 timeStackBuffer(camName, writerInfo.acquisitionTime)
             fileWorkers = [
-                stackWriteToFile(filename, camName, writeFunc)
-                for filename, camName, writeFunc in zip(filenames, camNames, writeFuncs)
+                stackWriteToFile(filename, camName, writeFunc, monitor)
+                for filename, camName, writeFunc, monitor in zip(
+                    filenames, camNames, writeFuncs, monitors
+                )
             ]
-        elif writerInfo.recordType == RecordType["Toggled"]:
+        elif writerInfo.recordType in [RecordType["Toggled"], RecordType["Triggered"]]:
             for camName in camNames:
                 toggledBuffer(camName)
             fileWorkers = [
-                toggledWriteToFile(filename, camName, writeFunc)
-                for filename, camName, writeFunc in zip(filenames, camNames, writeFuncs)
+                toggledWriteToFile(filename, camName, writeFunc, monitor)
+                for filename, camName, writeFunc, monitor in zip(
+                    filenames, camNames, writeFuncs, monitors
+                )
             ]
 
         for fileworker in fileWorkers:
@@ -566,8 +996,79 @@ class MainController(QObject):
     def stopAppendingForRecording(self, camName):
         self.isAppending[camName] = False
 
+    def stopRecording(self) -> None:
+        """Stops the current recording of all the cameras; the frames already acquired are still written."""
+        for camName in self.deviceControllers.keys():
+            self.stopAppendingForRecording(camName)
+
+    def startWriterMonitoring(self, policy: BackpressurePolicy) -> None:
+        self.backpressurePolicy = policy
+        self.writerMonitorTimer.start()
+
+    def stopWriterMonitoring(self) -> None:
+        self.writerMonitorTimer.stop()
+        for camName in self.isDroppingProcessed.keys():
+            self.isDroppingProcessed[camName] = False
+
+    def checkWriters(self) -> None:
+        """Updates the throughput of the writers of the current recording. When a writer falls behind
+        the camera, `writerBehind` is emitted and the backpressure policy of the recording is applied;
+        when it catches up, `writerCaughtUp` is emitted. Processed frames are dropped only until
+        the writers of the camera catch up."""
+        for camName, monitors in self.writerMonitors.items():
+            for stage, monitor in monitors.items():
+                wasBehind = monitor.isBehind
+                if monitor.update():
+                    self.writerBehind.emit(camName, stage)
+                    if self.backpressurePolicy == BackpressurePolicy["Stop recording"]:
+                        self.stopRecording()
+                elif wasBehind and not monitor.isBehind:
+                    self.writerCaughtUp.emit(camName, stage)
+            if self.backpressurePolicy == BackpressurePolicy["Drop processed frames"]:
+                self.isDroppingProcessed[camName] = any(
+                    monitor.isBehind for monitor in monitors.values()
+                )
+
     def resetRecordingCounter(self):
         self.recordSignalCounter.count = 0
+        self.recordSignalCounter.maxCount = 0
+
+    def resetBuffering(self) -> None:
+        self.isBufferingRaw = True
+        self.isBufferingProcessed = True
+
+    def recordAndProcess(
+        self,
+        filtersList: dict,
+        writerInfo: WriterInfo,
+        writerInfoProcessed: WriterInfo,
+        mode: RecordingMode = RecordingMode["Raw and processed"],
+    ) -> None:
+        """Starts a recording of the raw and/or processed frames of the cameras.
+        Only the buffers and workers of the selected outputs are used: the buffers of the other output
+        are emptied and not filled during the recording, so that they use neither memory nor disk bandwidth.
+
+        Args:
+            filtersList (dict): filter-group or filter-graph of each camera (camera key -> filter).
+            writerInfo (WriterInfo): writer information of the raw frames.
+            writerInfoProcessed (WriterInfo): writer information of the processed frames.
+            mode (RecordingMode, optional): frames which are recorded. Defaults to RecordingMode["Raw and processed"].
+        """
+        self.resetRecordingCounter()
+        self.isBufferingRaw = mode != RecordingMode["Processed"]
+        self.isBufferingProcessed = mode != RecordingMode["Raw"]
+        self.statisticsRecorders.clear()
+        for camName in filtersList.keys():
+            self.writerMonitors[camName].clear()
+            if not self.isBufferingRaw:
+                self.rawBuffers[camName].clearBuffer()
+            if not self.isBufferingProcessed:
+                self.preProcessingBuffers[camName].clearBuffer()
+                self.postProcessingBuffers[camName].clearBuffer()
+        if self.isBufferingProcessed:
+            self.process(filtersList, writerInfoProcessed)
+        if self.isBufferingRaw:
+            self.record(list(filtersList.keys()), writerInfo)
 
     def cleanup(self):
         for key in self.deviceControllers.keys():
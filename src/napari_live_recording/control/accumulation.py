@@ -0,0 +1,109 @@
+import json
+import numpy as np
+from typing import Callable, List, Tuple
+from napari_live_recording.common import (
+    AccumulationMode,
+    MAX_FLOAT32_SUMMED_FRAMES,
+    accumulatorDtype,
+)
+
+
+class FrameAccumulator:
+    def __init__(
+        self,
+        numberOfFrames: int,
+        mode: AccumulationMode,
+        writeFunc: Callable[[np.ndarray], None],
+        supportedDtypes: List[str] = None,
+    ) -> None:
+        """Combines every N consecutive frames of a recording into a single frame,
+        which is the only one passed to the writer function.
+        Frames are added to a preallocated accumulator of a data type wide enough
+        to hold the sum of N frames without overflowing.
+
+        - Sum: the sum of the N frames is written, in the accumulator data type;
+        - Average: the average of the N frames is written (rounded), in the camera data type.
+
+        The range of source frames combined into each written frame is tracked in `sourceFrames`.
+
+        Args:
+            numberOfFrames (int): number of consecutive frames combined together (N).
+            mode (AccumulationMode): combination of the frames.
+            writeFunc (Callable[[np.ndarray], None]): function writing each combined frame.
+            supportedDtypes (List[str], optional): data types supported by the writer; combined frames of other data types are written as float32, so that at most MAX_FLOAT32_SUMMED_FRAMES frames can be summed if 32-bit integers are not supported. Defaults to None (all data types are supported).
+        """
+        if numberOfFrames < 1:
+            raise ValueError("At least one frame must be accumulated")
+        if (
+            AccumulationMode(mode) == AccumulationMode["Sum"]
+            and supportedDtypes is not None
+            and "uint32" not in supportedDtypes
+            and numberOfFrames > MAX_FLOAT32_SUMMED_FRAMES
+        ):
+            # the sums of 16-bit frames would lose their lowest bits when written as float32
+            raise ValueError(
+                f"At most {MAX_FLOAT32_SUMMED_FRAMES} frames can be summed without 32-bit integers"
+            )
+        self.numberOfFrames = int(numberOfFrames)
+        self.mode = AccumulationMode(mode)
+        self.writeFunc = writeFunc
+        self.supportedDtypes = supportedDtypes
+        self.accumulator: np.ndarray = None
+        self.frameDtype: np.dtype = None
+        self.sourceFrames: List[Tuple[int, int]] = []
+        self._count = 0
+        self._received = 0
+
+    def allocate(self, frame: np.ndarray) -> None:
+        """Allocates the accumulator for frames with the shape and data type of `frame`."""
+        self.frameDtype = frame.dtype
+        self.accumulator = np.zeros(
+            frame.shape, dtype=accumulatorDtype(frame.dtype, self.numberOfFrames)
+        )
+
+    def __call__(self, frame: np.ndarray) -> None:
+        if self.accumulator is None or self.accumulator.shape != frame.shape:
+            # frames of a different shape can not be combined with the previous ones
+            self.flush()
+            self.allocate(frame)
+        np.add(self.accumulator, frame, out=self.accumulator, casting="unsafe")
+        self._count += 1
+        self._received += 1
+        if self._count == self.numberOfFrames:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the frames accumulated so far (if any) and resets the accumulator.
+        Called automatically every N frames; at the end of the recording
+        it writes the last, possibly incomplete, group of frames."""
+        if self._count == 0:
+            return
+        if self.mode == AccumulationMode["Sum"]:
+            output = self.accumulator.copy()
+        elif self.frameDtype.kind in "ui":
+            output = (self.accumulator + self._count // 2) // self._count
+            output = output.astype(self.frameDtype)
+        else:
+            output = (self.accumulator / self._count).astype(self.frameDtype)
+        if (
+            self.supportedDtypes is not None
+            and output.dtype.name not in self.supportedDtypes
+        ):
+            output = output.astype(np.float32)
+        self.sourceFrames.append((self._received - self._count, self._received - 1))
+        self.accumulator.fill(0)
+        self._count = 0
+        self.writeFunc(output)
+
+    def writeMetadata(self, filePath: str) -> None:
+        """Writes a JSON file listing, for each written frame, the first and last source frame combined into it."""
+        with open(filePath, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "mode": self.mode.name,
+                    "framesPerAccumulation": self.numberOfFrames,
+                    "sourceFrames": self.sourceFrames,
+                },
+                file,
+                indent=1,
+            )
@@ -0,0 +1,56 @@
+import numpy as np
+from napari_live_recording.common import BinningMode, accumulatorDtype
+
+
+class FrameBinning:
+    def __init__(self, factor: int, mode: BinningMode = BinningMode["Mean"]) -> None:
+        """Software binning of the frames, applied right after they are grabbed from the camera.
+        Blocks of `factor` x `factor` pixels are reduced to a single pixel with a reshape
+        and a reduction over the block axes, so that no Python loop runs over the pixels;
+        rows and columns not filling a whole block are discarded.
+
+        - Sum: the pixels of each block are summed in a data type wide enough not to overflow;
+        - Mean: the pixels of each block are averaged (rounded) and the camera data type is kept;
+        - Decimation: only the first pixel of each block is kept.
+
+        Args:
+            factor (int): binning factor along both axes.
+            mode (BinningMode, optional): reduction applied to each block. Defaults to BinningMode["Mean"].
+        """
+        if factor < 1:
+            raise ValueError("Binning factor must be at least 1")
+        self.factor = int(factor)
+        self.mode = BinningMode(mode)
+
+    def outputShape(self, shape: tuple) -> tuple:
+        """Returns the shape of a frame with the given shape after binning."""
+        return (shape[0] // self.factor, shape[1] // self.factor, *shape[2:])
+
+    def sumDtype(self, dtype) -> np.dtype:
+        """Returns the smallest data type which can hold the sum of a block of pixels of the given type."""
+        return accumulatorDtype(dtype, self.factor**2)
+
+    def __call__(self, frame: np.ndarray) -> np.ndarray:
+        factor = self.factor
+        if factor == 1:
+            return frame
+        height, width = frame.shape[0] // factor, frame.shape[1] // factor
+        if self.mode == BinningMode["Decimation"]:
+            return np.ascontiguousarray(
+                frame[: height * factor : factor, : width * factor : factor]
+            )
+        blocks = frame[: height * factor, : width * factor].reshape(
+            height, factor, width, factor, *frame.shape[2:]
+        )
+        sumDtype = self.sumDtype(frame.dtype)
+        binned = blocks.sum(axis=(1, 3), dtype=sumDtype)
+        if self.mode == BinningMode["Sum"]:
+            return binned
+        pixels = factor * factor
+        if frame.dtype.kind in "ui":
+            # integer mean rounded to the nearest value
+            binned += pixels // 2
+            binned //= pixels
+            return binned.astype(frame.dtype)
+        binned /= pixels
+        return binned
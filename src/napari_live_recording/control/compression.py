@@ -0,0 +1,103 @@
+import os
+import zlib
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Tuple
+
+# lossless codecs available for the in-memory compression of the frame buffers
+# (name -> compression and decompression functions); zlib is always available,
+# faster codecs are added when their packages are installed
+AVAILABLE_CODECS: Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "zlib": (lambda data: zlib.compress(data, 1), zlib.decompress),
+}
+try:
+    import lz4.frame
+
+    AVAILABLE_CODECS["lz4"] = (lz4.frame.compress, lz4.frame.decompress)
+except ImportError:
+    pass
+try:
+    import zstandard
+
+    AVAILABLE_CODECS["zstd"] = (
+        zstandard.ZstdCompressor(level=1).compress,
+        zstandard.ZstdDecompressor().decompress,
+    )
+except ImportError:
+    pass
+
+# pool shared by all the buffers, so that compression never runs in the acquisition loop;
+# codecs release the GIL while compressing, so frames are compressed in parallel
+_compressionPool: ThreadPoolExecutor = None
+
+
+def compressionPool() -> ThreadPoolExecutor:
+    global _compressionPool
+    if _compressionPool is None:
+        _compressionPool = ThreadPoolExecutor(
+            max_workers=max((os.cpu_count() or 2) // 2, 1),
+            thread_name_prefix="FrameCompression",
+        )
+    return _compressionPool
+
+
+def shuffle(frame: np.ndarray) -> bytes:
+    """Groups the bytes of the pixels by significance (all the first bytes, then all the second bytes, ...),
+    which makes the slowly varying high bytes of camera frames much easier to compress."""
+    if frame.dtype.itemsize == 1:
+        return frame.tobytes()
+    frame = np.ascontiguousarray(frame)
+    return frame.view(np.uint8).reshape(-1, frame.dtype.itemsize).T.tobytes()
+
+
+def unshuffle(data: bytes, shape: tuple, dtype: np.dtype) -> np.ndarray:
+    """Restores a frame from the output of `shuffle`, as a new writable array."""
+    if dtype.itemsize == 1:
+        # a view of the bytes would be read-only, they are copied once into a writable buffer
+        return np.frombuffer(bytearray(data), dtype=dtype).reshape(shape)
+    buffer = np.frombuffer(data, dtype=np.uint8).reshape(dtype.itemsize, -1).T
+    return np.ascontiguousarray(buffer).view(dtype).reshape(shape)
+
+
+class CompressedFrame:
+    def __init__(self, frame: np.ndarray, codec: str) -> None:
+        """Frame stored compressed in memory. The frame is compressed in the background by the shared
+        compression pool; until compression is done, the uncompressed frame is kept by the pool.
+
+        Args:
+            frame (np.ndarray): frame to compress (must not be modified afterwards).
+            codec (str): name of the codec (see AVAILABLE_CODECS).
+        """
+        self.shape = frame.shape
+        self.dtype = frame.dtype
+        self.rawBytes = frame.nbytes
+        self.codec = codec
+        self.storedBytes: int = None
+        """Bytes accounted for the frame by the buffer holding it (None if it is not held by a buffer)."""
+        self._future: Future = compressionPool().submit(self._compress, frame)
+
+    def _compress(self, frame: np.ndarray) -> bytes:
+        return AVAILABLE_CODECS[self.codec][0](shuffle(frame))
+
+    @property
+    def nbytes(self) -> int:
+        """Memory currently used by the frame."""
+        if self._future.done():
+            return len(self._future.result())
+        return self.rawBytes
+
+    def addDoneCallback(self, callback: Callable[["CompressedFrame"], None]) -> None:
+        """Calls `callback` with the frame when its compression is done (immediately if it is already done);
+        the callback is not called if the compression is cancelled."""
+        self._future.add_done_callback(
+            lambda future: None if future.cancelled() else callback(self)
+        )
+
+    def discard(self) -> None:
+        """Cancels the compression of a frame removed from the buffer, if not yet started."""
+        self._future.cancel()
+
+    def decompress(self) -> np.ndarray:
+        """Returns the original frame, as a new array."""
+        data = self._future.result()
+        return unshuffle(AVAILABLE_CODECS[self.codec][1](data), self.shape, self.dtype)
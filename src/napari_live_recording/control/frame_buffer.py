@@ -1,7 +1,9 @@
 import numpy as np
 from collections import deque
+from threading import Lock
 from napari_live_recording.common import ROI
 from napari_live_recording.control.devices.interface import ICamera
+from napari_live_recording.control.compression import CompressedFrame
 from qtpy.QtCore import QObject, Signal
 
 
@@ -18,20 +20,120 @@ class Framebuffer(QObject):
         cameraKey: str,
         capacity: int,
         allowOverwrite: bool = True,
+        codec: str = None,
     ) -> None:
         super().__init__()
         self.stackSize = stackSize
         self.cameraKey = cameraKey
         self._appendedFrames = 0
+        # frames added to the buffer and frames lost because the buffer was full,
+        # since the buffer was created (used to monitor the writers)
+        self.addedFrames = 0
+        self.droppedFrames = 0
         self.allowOverwrite = allowOverwrite
         self.frameShape = camera.roiShape.pixelSizes
+        self.capacity = capacity
+        self.codec = None
         self.buffer = deque(maxlen=capacity)
+        # memory used by the compressed frames currently stored, updated when frames are
+        # added or removed and when their compression is done, so that it is never recomputed
+        self._storedBytes = 0
+        self._storedBytesLock = Lock()
+        self.setCompression(codec)
+
+    def setCompression(self, codec: str = None) -> None:
+        """Sets the lossless codec used to store the frames in memory (None stores them uncompressed).
+        Compressed frames are compressed in a background pool when added and decompressed when returned.
+        The buffer keeps the same memory budget (capacity times the size of an uncompressed frame),
+        so that it holds as many more frames as the compression ratio. The buffer is cleared."""
+        self.codec = codec
+        self.clearBuffer()
+        self.buffer = deque(maxlen=self.capacity if codec is None else None)
+
+    def _store(self, frame: np.ndarray):
+        if self.codec is None:
+            return frame
+        item = CompressedFrame(frame, self.codec)
+        # frames are accounted uncompressed until their compression is done
+        with self._storedBytesLock:
+            item.storedBytes = item.rawBytes
+            self._storedBytes += item.rawBytes
+        item.addDoneCallback(self._onCompressed)
+        return item
+
+    def _onCompressed(self, item: CompressedFrame) -> None:
+        with self._storedBytesLock:
+            # frames removed in the meantime are not accounted anymore
+            if item.storedBytes is not None:
+                self._storedBytes += item.nbytes - item.storedBytes
+                item.storedBytes = item.nbytes
+
+    def _release(self, item) -> None:
+        """Stops accounting a compressed frame removed from the buffer."""
+        if isinstance(item, CompressedFrame):
+            with self._storedBytesLock:
+                if item.storedBytes is not None:
+                    self._storedBytes -= item.storedBytes
+                    item.storedBytes = None
+
+    def _discard(self, item) -> None:
+        """Releases a frame removed from the buffer without being returned."""
+        self._release(item)
+        if isinstance(item, CompressedFrame):
+            item.discard()
+
+    @staticmethod
+    def _restore(item) -> np.ndarray:
+        if isinstance(item, CompressedFrame):
+            return item.decompress()
+        return np.copy(item)
+
+    def _enforceBudget(self, frameBytes: int) -> None:
+        """Discards the oldest compressed frames when the memory budget is exceeded."""
+        budget = self.capacity * frameBytes
+        while self._storedBytes > budget and len(self.buffer) > 1:
+            self._discard(self.buffer.pop())
+            self.droppedFrames += 1
+
+    @property
+    def memoryUsage(self) -> int:
+        """Memory used by the frames currently stored (bytes)."""
+        if self.codec is not None:
+            return self._storedBytes
+        return sum(item.nbytes for item in list(self.buffer))
+
+    @property
+    def compressionRatio(self) -> float:
+        """Ratio between the uncompressed and stored size of the frames currently stored (1 when uncompressed)."""
+        items = list(self.buffer)
+        if self.codec is None or len(items) == 0:
+            return 1.0
+        rawBytes = sum(item.rawBytes for item in items if isinstance(item, CompressedFrame))
+        storedBytes = self._storedBytes
+        return rawBytes / storedBytes if storedBytes > 0 else 1.0
+
+    @property
+    def fillFraction(self) -> float:
+        """Fraction of the buffer in use: number of frames over capacity,
+        or memory used over memory budget when the frames are compressed."""
+        items = list(self.buffer)
+        if self.codec is None or len(items) == 0:
+            return len(items) / self.capacity
+        rawBytes = next(
+            (item.rawBytes for item in items if isinstance(item, CompressedFrame)), 0
+        )
+        if rawBytes == 0:
+            return len(items) / self.capacity
+        return self._storedBytes / (self.capacity * rawBytes)
 
     def clearBuffer(self):
         """Clearing the buffer and resetting the appended frames to zero"""
         try:
             self._appendedFrames = 0
+            items = list(self.buffer)
             self.buffer.clear()
+            for item in items:
+                self._discard(item)
         except Exception as e:
             print("Clearing Error", e)
 
@@ -44,9 +146,15 @@ class Framebuffer(QObject):
 
             # when shapes of frames in buffer and new frame match, attach the frame and raise number of appended frames
             elif newFrame.shape == self.frameShape:
-                self.buffer.appendleft(newFrame)
+                # a full buffer silently overwrites its oldest frame
+                if len(self.buffer) == self.buffer.maxlen:
+                    self.droppedFrames += 1
+                self.buffer.appendleft(self._store(newFrame))
+                self.addedFrames += 1
                 if not self.allowOverwrite:
                     self._appendedFrames += 1
+                if self.codec is not None:
+                    self._enforceBudget(newFrame.nbytes)
 
             # when shapes do not match, set the new shape as default
             elif newFrame.shape != self.frameShape:
@@ -57,26 +165,43 @@ class Framebuffer(QObject):
     def popHead(self):
         """Return and delete the head (oldest frame) of the buffer"""
         try:
-            frame = np.copy(self.buffer.pop())
-            return frame
+            item = self.buffer.pop()
+            self._release(item)
+            return self._restore(item)
         except Exception as e:
             pass
 
     def popTail(self):
         """Return and delete the tail (newest frame) of the buffer"""
         try:
-            frame = np.copy(self.buffer.popleft())
-            return frame
+            item = self.buffer.popleft()
+            self._release(item)
+            return self._restore(item)
         except Exception as e:
             pass
 
+    def popLatest(self):
+        """Return and delete the tail (newest frame) of the buffer, discarding all the older frames.
+        Returns the frame (None if the buffer is empty) and the number of discarded frames."""
+        try:
+            frame = self.buffer.popleft()
+        except IndexError:
+            return None, 0
+        self._release(frame)
+        # older frames are removed from the head, so that frames
+        # appended in the meantime by the acquisition thread are kept
+        discarded = len(self.buffer)
+        for _ in range(discarded):
+            self._discard(self.buffer.pop())
+        return self._restore(frame), discarded
+
     def returnTail(self):
         """Return the tail (newest frame) of the buffer"""
-        return np.copy(self.buffer[0])
+        return self._restore(self.buffer[0])
 
     def returnHead(self):
         """Return the head (oldest frame) of the buffer"""
-        return np.copy(self.buffer[-1])
+        return self._restore(self.buffer[-1])
 
     def changeROI(self, newROI: ROI):
         """Change the default shape when the ROI is changed"""
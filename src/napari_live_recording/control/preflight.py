@@ -0,0 +1,92 @@
+import os
+import time
+import shutil
+import numpy as np
+from typing import NamedTuple
+
+
+class RecordingCapacity(NamedTuple):
+    """Result of the pre-flight check of a recording folder."""
+
+    writeSpeed: float
+    """Sequential write speed of the folder (bytes per second)."""
+
+    dataRate: float
+    """Expected data rate of the recording (bytes per second)."""
+
+    freeBytes: int
+    """Free space of the folder (bytes)."""
+
+    maxSeconds: float
+    """Longest recording which fits in the free space, keeping the headroom (seconds; infinite if no data is written)."""
+
+    isSustainable: bool
+    """True if the folder can sustain the data rate, keeping the headroom."""
+
+
+def benchmarkWriteSpeed(
+    folder: str,
+    totalBytes: int = 2**28,
+    blockBytes: int = 2**23,
+    maxSeconds: float = 3.0,
+) -> float:
+    """Measures the sequential write speed of a folder by writing a temporary file in blocks,
+    as the writers of a recording do. The file is synced to disk before the clock is stopped,
+    so that the operating system cache does not inflate the result, and removed afterwards.
+    Incompressible data is written, so that compressing file systems are not favoured.
+
+    Args:
+        folder (str): folder to benchmark.
+        totalBytes (int, optional): size of the temporary file (bytes). Defaults to 2**28 (256 MiB).
+        blockBytes (int, optional): size of each write (bytes). Defaults to 2**23 (8 MiB).
+        maxSeconds (float, optional): the benchmark stops early after this time (seconds). Defaults to 3.0.
+
+    Returns:
+        float: write speed (bytes per second).
+    """
+    # never use more than a tenth of the free space
+    totalBytes = min(totalBytes, shutil.disk_usage(folder).free // 10)
+    blockBytes = max(min(blockBytes, totalBytes), 1)
+    block = np.random.default_rng().integers(0, 256, blockBytes, dtype=np.uint8).tobytes()
+    filePath = os.path.join(folder, f".benchmark_{os.getpid()}.tmp")
+    writtenBytes = 0
+    try:
+        with open(filePath, "wb", buffering=0) as file:
+            start = time.perf_counter()
+            while writtenBytes < totalBytes:
+                writtenBytes += file.write(block)
+                if time.perf_counter() - start > maxSeconds:
+                    break
+            os.fsync(file.fileno())
+            elapsed = time.perf_counter() - start
+    finally:
+        if os.path.exists(filePath):
+            os.remove(filePath)
+    return writtenBytes / max(elapsed, 1e-9)
+
+
+def estimateCapacity(
+    folder: str, dataRate: float, writeSpeed: float, headroom: float = 0.2
+) -> RecordingCapacity:
+    """Compares the expected data rate of a recording with the write speed and free space of a folder.
+    A fraction `headroom` of both the write speed and the free space is kept in reserve
+    (other programs, file system overhead, slower regions of the disk).
+
+    Args:
+        folder (str): folder of the recording.
+        dataRate (float): expected data rate of the recording (bytes per second).
+        writeSpeed (float): write speed of the folder (bytes per second), see `benchmarkWriteSpeed`.
+        headroom (float, optional): fraction of the write speed and free space kept in reserve. Defaults to 0.2.
+
+    Returns:
+        RecordingCapacity: capacity of the folder for the recording.
+    """
+    freeBytes = shutil.disk_usage(folder).free
+    usableBytes = freeBytes * (1 - headroom)
+    return RecordingCapacity(
+        writeSpeed=writeSpeed,
+        dataRate=dataRate,
+        freeBytes=freeBytes,
+        maxSeconds=usableBytes / dataRate if dataRate > 0 else float("inf"),
+        isSustainable=dataRate <= writeSpeed * (1 - headroom),
+    )
@@ -0,0 +1,93 @@
+import numpy as np
+from typing import Callable, Dict, List
+from napari_live_recording.common import ROI
+
+
+class RegionExtractor:
+    def __init__(self, regions: List[ROI]) -> None:
+        """Extracts a list of rectangular regions from each frame.
+        The slices of each region are computed once, so that extracting the regions
+        only costs a copy of their pixels.
+
+        Args:
+            regions (List[ROI]): regions to extract, in frame coordinates (offsets, width and height in pixels).
+        """
+        if len(regions) == 0:
+            raise ValueError("At least one region is required")
+        for region in regions:
+            if region.width <= 0 or region.height <= 0:
+                raise ValueError(f"Region {region} has no pixels")
+        self.regions = list(regions)
+        self.names = [f"region{index}" for index in range(len(regions))]
+        self.slices = [
+            (
+                slice(region.offset_y, region.offset_y + region.height),
+                slice(region.offset_x, region.offset_x + region.width),
+            )
+            for region in self.regions
+        ]
+
+    @property
+    def numberOfPixels(self) -> int:
+        """Returns the total number of pixels of the regions."""
+        return sum(region.width * region.height for region in self.regions)
+
+    def __call__(self, frame: np.ndarray) -> Dict[str, np.ndarray]:
+        """Returns a contiguous copy of each region of the frame (region name -> region)."""
+        return {
+            name: np.ascontiguousarray(frame[regionSlices])
+            for name, regionSlices in zip(self.names, self.slices)
+        }
+
+
+class RegionWriter:
+    def __init__(
+        self,
+        extractor: RegionExtractor,
+        writeFuncs: Dict[str, Callable[[np.ndarray], None]],
+    ) -> None:
+        """Writes each region of the incoming frames with its own writer function,
+        so that each region is stored in a separate stream.
+
+        Args:
+            extractor (RegionExtractor): extractor of the regions.
+            writeFuncs (Dict[str, Callable[[np.ndarray], None]]): writer function of each region (region name -> function).
+        """
+        self.extractor = extractor
+        self.writeFuncs = writeFuncs
+
+    def __call__(self, frame: np.ndarray) -> None:
+        for name, region in self.extractor(frame).items():
+            self.writeFuncs[name](region)
+
+
+def regionsFromShapes(shapes: List[np.ndarray], frameShape: tuple = None) -> List[ROI]:
+    """Converts a list of shapes (i.e. the data of a napari Shapes layer) into regions.
+    Each region is the bounding box of a shape, in pixels; the last two columns
+    of the shape vertices are used as (row, column) coordinates.
+
+    Args:
+        shapes (List[np.ndarray]): vertices of each shape.
+        frameShape (tuple, optional): shape of the frames; if given, the regions are clipped to the frame. Defaults to None.
+
+    Returns:
+        List[ROI]: regions of the shapes; shapes with no pixels inside the frame are discarded.
+    """
+    regions = []
+    for vertices in shapes:
+        vertices = np.asarray(vertices)[:, -2:]
+        top, left = np.floor(vertices.min(axis=0)).astype(int)
+        bottom, right = np.ceil(vertices.max(axis=0)).astype(int)
+        top, left = max(top, 0), max(left, 0)
+        if frameShape is not None:
+            bottom, right = min(bottom, frameShape[0]), min(right, frameShape[1])
+        if bottom > top and right > left:
+            regions.append(
+                ROI(
+                    offset_x=int(left),
+                    offset_y=int(top),
+                    height=int(bottom - top),
+                    width=int(right - left),
+                )
+            )
+    return regions
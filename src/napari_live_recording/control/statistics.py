@@ -0,0 +1,223 @@
+import numpy as np
+from collections import deque
+from threading import Lock
+from typing import List
+from napari_live_recording.common import StatisticsFormat
+from napari_live_recording.control.regions import RegionExtractor
+
+# extension of the statistics file of each format
+STATISTICS_EXTENSIONS = {
+    StatisticsFormat["CSV"]: ".csv",
+    StatisticsFormat["NPY"]: ".npy",
+    StatisticsFormat["Parquet"]: ".parquet",
+}
+
+
+class FrameStatistics:
+    def __init__(
+        self,
+        statistics: List[str],
+        regions: RegionExtractor = None,
+        saturationLevel: float = None,
+    ) -> None:
+        """Computes a set of scalar statistics of each frame with vectorised reductions.
+        The statistics of a frame are returned as a row of float64 values, one per column;
+        the first column is always the index of the frame.
+
+        Args:
+            statistics (List[str]): statistics to compute (see AVAILABLE_STATISTICS).
+            regions (RegionExtractor, optional): regions of interest whose sums are computed by "Region sums". Defaults to None.
+            saturationLevel (float, optional): value of saturated pixels. Defaults to None (maximum of integer data types, 1.0 for floating point frames).
+        """
+        self.statistics = list(statistics)
+        self.regions = regions
+        self.saturationLevel = saturationLevel
+        self.columns = ["frame"]
+        for statistic in self.statistics:
+            if statistic == "Centroid":
+                self.columns.extend(["centroid_y", "centroid_x"])
+            elif statistic == "Region sums":
+                if regions is not None:
+                    self.columns.extend(f"{name}_sum" for name in regions.names)
+            else:
+                self.columns.append(statistic.lower())
+        self._count = 0
+
+    def _saturationLevel(self, dtype: np.dtype) -> float:
+        if self.saturationLevel is not None:
+            return self.saturationLevel
+        if dtype.kind in "ui":
+            return np.iinfo(dtype).max
+        return 1.0
+
+    def __call__(self, frame: np.ndarray) -> np.ndarray:
+        row = np.empty(len(self.columns), dtype=np.float64)
+        row[0] = self._count
+        self._count += 1
+        index = 1
+        total = None
+        for statistic in self.statistics:
+            if statistic in ["Mean", "Sum"]:
+                if total is None:
+                    total = frame.sum(dtype=np.float64)
+                row[index] = total / frame.size if statistic == "Mean" else total
+            elif statistic == "Min":
+                row[index] = frame.min()
+            elif statistic == "Max":
+                row[index] = frame.max()
+            elif statistic == "Std":
+                row[index] = frame.std(dtype=np.float64)
+            elif statistic == "Saturated":
+                row[index] = np.count_nonzero(
+                    frame >= self._saturationLevel(frame.dtype)
+                )
+            elif statistic == "Centroid":
+                # projections of the frame on each axis (channels are summed together)
+                rows = frame.sum(axis=tuple(range(1, frame.ndim)), dtype=np.float64)
+                columns = frame.sum(
+                    axis=(0, *range(2, frame.ndim)), dtype=np.float64
+                )
+                weight = rows.sum()
+                if weight == 0:
+                    row[index : index + 2] = np.nan
+                else:
+                    row[index] = rows @ np.arange(rows.size) / weight
+                    row[index + 1] = columns @ np.arange(columns.size) / weight
+                index += 1
+            elif statistic == "Region sums":
+                if self.regions is None:
+                    continue
+                for regionSlices in self.regions.slices:
+                    row[index] = frame[regionSlices].sum(dtype=np.float64)
+                    index += 1
+                continue
+            index += 1
+        return row
+
+
+class StatisticsWriter:
+    def __init__(
+        self,
+        filePath: str,
+        columns: List[str],
+        format: StatisticsFormat = StatisticsFormat["CSV"],
+        chunkSize: int = 1024,
+    ) -> None:
+        """Appends rows of per-frame statistics to a columnar file.
+        Rows are collected in a preallocated chunk and written one chunk at a time,
+        so that the file is not accessed for each frame.
+
+        - CSV: a text file with a header of column names;
+        - NPY: a structured array with a field per column, written when the writer is closed;
+        - Parquet: a row group per chunk (requires pyarrow).
+
+        Args:
+            filePath (str): path of the output file, without extension.
+            columns (List[str]): names of the columns.
+            format (StatisticsFormat, optional): format of the file. Defaults to StatisticsFormat["CSV"].
+            chunkSize (int, optional): number of rows written at once. Defaults to 1024.
+        """
+        self.format = StatisticsFormat(format)
+        self.filePath = filePath + STATISTICS_EXTENSIONS[self.format]
+        self.columns = list(columns)
+        self._chunk = np.empty((chunkSize, len(self.columns)), dtype=np.float64)
+        self._rows = 0
+        self._chunks: List[np.ndarray] = []
+        self._file = None
+        if self.format == StatisticsFormat["CSV"]:
+            self._file = open(self.filePath, "w", encoding="utf-8")
+            self._file.write(",".join(self.columns) + "\n")
+        elif self.format == StatisticsFormat["Parquet"]:
+            try:
+                import pyarrow
+                import pyarrow.parquet
+            except ImportError:
+                raise ImportError(
+                    "Parquet statistics files require pyarrow (pip install pyarrow)"
+                )
+            self._pyarrow = pyarrow
+            self._file = pyarrow.parquet.ParquetWriter(
+                self.filePath,
+                pyarrow.schema([(column, pyarrow.float64()) for column in self.columns]),
+            )
+
+    def append(self, row: np.ndarray) -> None:
+        self._chunk[self._rows] = row
+        self._rows += 1
+        if self._rows == len(self._chunk):
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the rows collected so far."""
+        if self._rows == 0:
+            return
+        chunk = self._chunk[: self._rows]
+        if self.format == StatisticsFormat["CSV"]:
+            np.savetxt(self._file, chunk, fmt="%.10g", delimiter=",")
+        elif self.format == StatisticsFormat["NPY"]:
+            self._chunks.append(chunk.copy())
+        else:
+            self._file.write_table(
+                self._pyarrow.Table.from_arrays(
+                    [self._pyarrow.array(chunk[:, index]) for index in range(chunk.shape[1])],
+                    names=self.columns,
+                )
+            )
+        self._rows = 0
+
+    def close(self) -> None:
+        self.flush()
+        if self.format == StatisticsFormat["NPY"]:
+            dtype = [(column, np.float64) for column in self.columns]
+            data = np.empty(sum(len(chunk) for chunk in self._chunks), dtype=dtype)
+            start = 0
+            for chunk in self._chunks:
+                for index, column in enumerate(self.columns):
+                    data[column][start : start + len(chunk)] = chunk[:, index]
+                start += len(chunk)
+            np.save(self.filePath, data)
+        elif self._file is not None:
+            self._file.close()
+
+
+class StatisticsRecorder:
+    def __init__(
+        self,
+        filePath: str,
+        statistics: FrameStatistics,
+        format: StatisticsFormat = StatisticsFormat["CSV"],
+        historyLength: int = 1000,
+    ) -> None:
+        """Reduction sink of the processing stage: computes the statistics of each processed frame
+        and appends them to a file. The latest rows are also kept in memory to be plotted live.
+
+        Args:
+            filePath (str): path of the statistics file, without extension.
+            statistics (FrameStatistics): statistics computed for each frame.
+            format (StatisticsFormat, optional): format of the statistics file. Defaults to StatisticsFormat["CSV"].
+            historyLength (int, optional): number of rows kept in memory. Defaults to 1000.
+        """
+        self.statistics = statistics
+        self.writer = StatisticsWriter(filePath, statistics.columns, format)
+        self._history = deque(maxlen=historyLength)
+        self._lock = Lock()
+
+    @property
+    def columns(self) -> List[str]:
+        return self.statistics.columns
+
+    def __call__(self, frame: np.ndarray) -> None:
+        row = self.statistics(frame)
+        self.writer.append(row)
+        with self._lock:
+            self._history.append(row)
+
+    def history(self) -> np.ndarray:
+        """Returns the latest rows of statistics (one row per frame)."""
+        with self._lock:
+            if len(self._history) == 0:
+                return np.empty((0, len(self.columns)))
+            return np.stack(self._history)
+
+    def close(self) -> None:
+        self.writer.close()
@@ -0,0 +1,92 @@
+import time
+import numpy as np
+from typing import List, NamedTuple
+from napari_live_recording.control.frame_buffer import Framebuffer
+
+
+class WriterStatus(NamedTuple):
+    """Throughput of a writer, measured between the last two updates of its monitor."""
+
+    framesPerSecond: float
+    bytesPerSecond: float
+    queueDepth: int
+    fillFraction: float
+    droppedFrames: int
+    isBehind: bool
+
+
+class WriterMonitor:
+    def __init__(
+        self,
+        buffers: List[Framebuffer],
+        lagSeconds: float = 2.0,
+        fillThreshold: float = 0.5,
+    ) -> None:
+        """Measures the throughput of a writer worker and detects when it falls behind the camera.
+        The writer reports each frame it takes from its buffers with `addFrame`; the monitor is
+        updated periodically, from another thread, with `update`.
+
+        The writer is lagging while its buffers are filled above `fillThreshold`, or while frames
+        are lost because the buffers are full; it is behind after lagging for `lagSeconds` seconds.
+
+        Args:
+            buffers (List[Framebuffer]): buffers holding the frames waiting to be written.
+            lagSeconds (float, optional): time a writer can lag before it is behind (seconds). Defaults to 2.0.
+            fillThreshold (float, optional): fill fraction of the buffers above which the writer is lagging. Defaults to 0.5.
+        """
+        self.buffers = buffers
+        self.lagSeconds = lagSeconds
+        self.fillThreshold = fillThreshold
+        self.writtenFrames = 0
+        self.writtenBytes = 0
+        self.isBehind = False
+        self._lagStart: float = None
+        self._lastUpdate = time.monotonic()
+        self._lastFrames = 0
+        self._lastBytes = 0
+        self._initialDropped = self.droppedFrames
+        self._lastDropped = self._initialDropped
+        self.status = WriterStatus(0.0, 0.0, 0, 0.0, 0, False)
+
+    @property
+    def droppedFrames(self) -> int:
+        return sum(buffer.droppedFrames for buffer in self.buffers)
+
+    def addFrame(self, frame: np.ndarray) -> None:
+        """Counts a frame taken from the buffers by the writer."""
+        self.writtenFrames += 1
+        self.writtenBytes += frame.nbytes
+
+    def update(self, now: float = None) -> bool:
+        """Measures the throughput since the previous update and checks whether the writer is behind.
+
+        Args:
+            now (float, optional): current time, as returned by `time.monotonic`. Defaults to None (current time).
+
+        Returns:
+            bool: True if the writer has just fallen behind.
+        """
+        now = time.monotonic() if now is None else now
+        elapsed = max(now - self._lastUpdate, 1e-9)
+        writtenFrames, writtenBytes = self.writtenFrames, self.writtenBytes
+        droppedFrames = self.droppedFrames
+        fillFraction = max((buffer.fillFraction for buffer in self.buffers), default=0.0)
+        isLagging = fillFraction > self.fillThreshold or droppedFrames > self._lastDropped
+        if not isLagging:
+            self._lagStart = None
+        elif self._lagStart is None:
+            self._lagStart = now
+        wasBehind = self.isBehind
+        self.isBehind = isLagging and now - self._lagStart >= self.lagSeconds
+        self.status = WriterStatus(
+            framesPerSecond=(writtenFrames - self._lastFrames) / elapsed,
+            bytesPerSecond=(writtenBytes - self._lastBytes) / elapsed,
+            queueDepth=sum(buffer.length for buffer in self.buffers),
+            fillFraction=fillFraction,
+            droppedFrames=droppedFrames - self._initialDropped,
+            isBehind=self.isBehind,
+        )
+        self._lastUpdate = now
+        self._lastFrames, self._lastBytes = writtenFrames, writtenBytes
+        self._lastDropped = droppedFrames
+        return self.isBehind and not wasBehind
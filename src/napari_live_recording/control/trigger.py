@@ -0,0 +1,120 @@
+import json
+import numpy as np
+from collections import deque
+from typing import Callable, List, Tuple
+from napari_live_recording.common import TriggerMetric, TriggerSettings
+
+
+class ChangeTrigger:
+    def __init__(self, settings: TriggerSettings) -> None:
+        """Computes a cheap change metric of each frame and tells whether it crosses the trigger threshold.
+        The metric is computed on a subsampled view of the frame (one pixel every `subsampling` along each axis),
+        so its cost is a small fraction of the frame size.
+
+        - Mean absolute difference: mean absolute difference between the frame and a running background,
+          updated as an exponential moving average of the previous frames;
+        - Pixels above level: number of pixels brighter than `pixelLevel`.
+
+        Args:
+            settings (TriggerSettings): metric, thresholds and subsampling of the trigger.
+        """
+        self.settings = settings
+        self.background: np.ndarray = None
+        self.lastMetric = 0.0
+
+    def metric(self, frame: np.ndarray) -> float:
+        step = max(int(self.settings.subsampling), 1)
+        sample = frame[::step, ::step]
+        if self.settings.metric == TriggerMetric["Pixels above level"]:
+            return float(np.count_nonzero(sample > self.settings.pixelLevel))
+        sample = sample.astype(np.float32)
+        if self.background is None or self.background.shape != sample.shape:
+            # the first frame is the initial background, so it never triggers
+            self.background = sample
+            return 0.0
+        difference = np.abs(sample - self.background)
+        metric = float(difference.mean())
+        rate = self.settings.backgroundRate
+        self.background *= 1 - rate
+        self.background += rate * sample
+        return metric
+
+    def __call__(self, frame: np.ndarray) -> bool:
+        self.lastMetric = self.metric(frame)
+        return self.lastMetric > self.settings.threshold
+
+
+class TriggeredWriter:
+    def __init__(
+        self, trigger: ChangeTrigger, writeFunc: Callable[[np.ndarray], None]
+    ) -> None:
+        """Writes only the segments of a recording in which the trigger fires.
+        While idle, the latest `preRollFrames` frames are kept in a ring buffer and written
+        when the trigger fires; after the metric falls below the threshold, `postRollFrames`
+        more frames are written before the segment is closed.
+        The range of source frames of each segment is tracked in `segments`.
+
+        Args:
+            trigger (ChangeTrigger): trigger evaluated on each frame.
+            writeFunc (Callable[[np.ndarray], None]): function writing each recorded frame.
+        """
+        self.trigger = trigger
+        self.writeFunc = writeFunc
+        self.preRoll = deque(maxlen=max(trigger.settings.preRollFrames, 0))
+        self.segments: List[Tuple[int, int]] = []
+        self._remainingFrames = 0
+        self._segmentStart: int = None
+        self._received = 0
+
+    @property
+    def isRecording(self) -> bool:
+        return self._segmentStart is not None
+
+    def __call__(self, frame: np.ndarray) -> None:
+        triggered = self.trigger(frame)
+        index = self._received
+        self._received += 1
+        if triggered:
+            if not self.isRecording:
+                self._segmentStart = index - len(self.preRoll)
+                while len(self.preRoll) > 0:
+                    self.writeFunc(self.preRoll.popleft())
+            self._remainingFrames = self.trigger.settings.postRollFrames
+            self.writeFunc(frame)
+        elif self._remainingFrames > 0:
+            # post-roll of the current segment
+            self._remainingFrames -= 1
+            self.writeFunc(frame)
+            if self._remainingFrames == 0:
+                self.close(lastFrame=index)
+        else:
+            # a segment without post-roll ends with the last triggering frame
+            self.close(lastFrame=index - 1)
+            self.preRoll.append(frame)
+
+    def close(self, lastFrame: int = None) -> None:
+        """Closes the current segment (if any). Called automatically after the post-roll;
+        at the end of the recording it closes a segment which is still open."""
+        if not self.isRecording:
+            return
+        if lastFrame is None:
+            lastFrame = self._received - 1
+        self.segments.append((self._segmentStart, lastFrame))
+        self._segmentStart = None
+        self._remainingFrames = 0
+
+    def writeMetadata(self, filePath: str) -> None:
+        """Writes a JSON file listing the first and last source frame of each recorded segment."""
+        settings = self.trigger.settings
+        with open(filePath, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "metric": settings.metric.name,
+                    "threshold": settings.threshold,
+                    "preRollFrames": settings.preRollFrames,
+                    "postRollFrames": settings.postRollFrames,
+                    "segments": self.segments,
+                },
+                file,
+                indent=1,
+            )
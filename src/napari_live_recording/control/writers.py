@@ -0,0 +1,940 @@
+import os
+import json
+import time
+import shutil
+import numpy as np
+import tifffile.tifffile as tiff
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, List, Tuple
+from napari_live_recording.common import (
+    TIFF_COMPRESSIONS,
+    TIFF_PHOTOMETRIC_MAP,
+    ColorType,
+    FileFormat,
+    RecordType,
+    WriterInfo,
+)
+from napari_live_recording.control.compression import (
+    AVAILABLE_CODECS,
+    compressionPool,
+    shuffle,
+)
+
+# extension of the recorded files of each format
+FILE_EXTENSIONS = {
+    FileFormat["ImageJ TIFF"]: ".tif",
+    FileFormat["OME-TIFF"]: ".ome.tif",
+    FileFormat["HDF5"]: ".h5",
+    FileFormat["OME-Zarr"]: ".ome.zarr",
+    FileFormat["Raw stream"]: ".raw",
+}
+
+
+# image data which fit in a classic (32-bit) TIFF file, leaving room for metadata as tifffile does
+CLASSIC_TIFF_LIMIT = 2**32 - 2**25
+
+# upper bound of the bytes added to a TIFF file by each page (IFD and tags)
+TIFF_PAGE_OVERHEAD = 256
+
+
+def writeJSON(filePath: str, content: dict) -> None:
+    """Writes a JSON file, replacing it atomically so that readers never see a partial file."""
+    with open(filePath + ".tmp", "w", encoding="utf-8") as file:
+        json.dump(content, file, indent=1, default=str)
+    os.replace(filePath + ".tmp", filePath)
+
+
+class BatchedTiffWriter:
+    def __init__(
+        self,
+        filePath: str,
+        imagej: bool,
+        photometric: str,
+        metadata: dict = None,
+        compression: str = None,
+        bigtiff: bool = False,
+        frameCount: int = None,
+        maxFrames: int = 128,
+        maxBytes: int = 2**23,
+        maxDelay: float = 1.0,
+    ) -> None:
+        """Writes frames to a TIFF file in blocks. Frames are copied into a preallocated block,
+        which is written with a single call once it holds `maxFrames` frames or `maxBytes` bytes,
+        or when the oldest frame in it is older than `maxDelay` seconds; for OME-TIFF, this removes
+        the per-frame overhead of tifffile, which dominates with small frames at high frame rates.
+
+        - ImageJ TIFF: the frames of each block are appended to a single contiguous series,
+          so the file is identical to an unbatched one;
+        - OME-TIFF: each block is stored as an image series of consecutive frames (axes TYX).
+
+        OME-TIFF files can be compressed. Compressed blocks are handed to a writer thread,
+        so that the next block is filled while the previous one is written, and the frames
+        of a block are compressed in parallel by tifffile (one worker per CPU).
+
+        Args:
+            filePath (str): path of the TIFF file.
+            imagej (bool): True for ImageJ TIFF, False for OME-TIFF.
+            photometric (str): photometric interpretation of the frames.
+            metadata (dict, optional): metadata stored in the file. Defaults to None.
+            compression (str, optional): compression of OME-TIFF files (see TIFF_COMPRESSIONS). Defaults to None (no compression).
+            bigtiff (bool, optional): write a BigTIFF file, which can exceed 4 GB (not supported by ImageJ); if None, the file is created with the first frame, as BigTIFF unless `frameCount` frames fit in a classic TIFF file. Defaults to False.
+            frameCount (int, optional): number of frames of the file, if known in advance (only used if `bigtiff` is None). Defaults to None.
+            maxFrames (int, optional): maximum number of frames per block. Defaults to 128.
+            maxBytes (int, optional): maximum size of a block (bytes). Defaults to 8 MiB.
+            maxDelay (float, optional): maximum time a frame waits in the block (seconds). Defaults to 1 second.
+        """
+        if compression is not None and (imagej or compression not in TIFF_COMPRESSIONS):
+            raise ValueError(f"Unsupported TIFF compression: {compression}")
+        if imagej and bigtiff is not False:
+            raise ValueError("ImageJ does not support BigTIFF files")
+        self.filePath = filePath
+        self.frameCount = frameCount
+        self.imagej = imagej
+        self.compression = compression
+        self.photometric = photometric
+        self.metadata = metadata if metadata is not None else {}
+        self.maxFrames = max(maxFrames, 1)
+        self.maxBytes = maxBytes
+        self.maxDelay = maxDelay
+        self.writtenFrames = 0
+        self._block: np.ndarray = None
+        self._blockFrames = 0
+        self._blockStart = 0.0
+        self._pending: Deque[Future] = deque()
+        self._writer: ThreadPoolExecutor = None
+        if compression is not None:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="TiffWriter")
+        self.file: tiff.TiffWriter = None
+        if bigtiff is not None:
+            self._openFile(bigtiff)
+
+    def _openFile(self, bigtiff: bool) -> None:
+        self.file = tiff.TiffWriter(
+            self.filePath, bigtiff=bigtiff, imagej=self.imagej, ome=not self.imagej
+        )
+
+    def _writeFrames(self, frames: np.ndarray) -> None:
+        options = dict(photometric=self.photometric, software="napari-live-recording")
+        if not self.imagej:
+            axes = "TYXS" if frames.ndim == 4 else "TYX"
+            if self.compression is not None:
+                codec, predictor = TIFF_COMPRESSIONS[self.compression]
+                options.update(
+                    compression=codec,
+                    compressionargs=dict(level=1) if codec == "zlib" else None,
+                    predictor=predictor,
+                    maxworkers=os.cpu_count(),
+                )
+            self.file.write(frames, metadata={**self.metadata, "axes": axes}, **options)
+            return
+        # tifffile only appends data with the shape of the first frame to a contiguous series;
+        # once the series exists, each call just writes the frame after the previous one
+        for frame in frames:
+            self.file.write(frame, contiguous=True, metadata=self.metadata, **options)
+
+    def flush(self) -> None:
+        """Writes the frames of the current block."""
+        if self._blockFrames == 0:
+            return
+        if self._writer is None:
+            self._writeFrames(self._block[: self._blockFrames])
+        else:
+            # the block is written in the background, the next one is filled meanwhile
+            frames, self._block = self._block[: self._blockFrames], np.empty_like(self._block)
+            self._pending.append(self._writer.submit(self._writeFrames, frames))
+            while len(self._pending) > 1:
+                self._pending.popleft().result()
+        self.writtenFrames += self._blockFrames
+        self._blockFrames = 0
+
+    def write(self, frame: np.ndarray) -> None:
+        if frame is None:
+            raise ValueError("No frame to write")
+        if self.file is None:
+            # files which may exceed 4 GB are written as BigTIFF
+            bigtiff = (
+                self.frameCount is None
+                or self.frameCount * (frame.nbytes + TIFF_PAGE_OVERHEAD) > CLASSIC_TIFF_LIMIT
+            )
+            self._openFile(bigtiff)
+        if self._block is None:
+            size = max(1, min(self.maxFrames, self.maxBytes // max(frame.nbytes, 1)))
+            self._block = np.empty((size, *frame.shape), dtype=frame.dtype)
+        if self._blockFrames == 0:
+            self._blockStart = time.monotonic()
+        self._block[self._blockFrames] = frame
+        self._blockFrames += 1
+        if (
+            self._blockFrames == len(self._block)
+            or time.monotonic() - self._blockStart > self.maxDelay
+        ):
+            self.flush()
+
+    def close(self) -> None:
+        self.flush()
+        if self._writer is not None:
+            while len(self._pending) > 0:
+                self._pending.popleft().result()
+            self._writer.shutdown()
+        if self.file is None:
+            # a recording without frames still creates its file
+            self._openFile(False)
+        self.file.close()
+
+
+class MemmapTiffWriter:
+    def __init__(
+        self,
+        filePath: str,
+        frameCount: int,
+        imagej: bool,
+        photometric: str,
+        metadata: dict = None,
+    ) -> None:
+        """Writes a recording of known length into a preallocated TIFF file.
+        When the first frame is written, the file is created with room for `frameCount` frames
+        (a single ImageJ hyperstack or OME-TIFF series) and memory-mapped; each frame is then
+        copied straight into its slot, with no TIFF encoding, and the operating system writes
+        the mapped pages to disk in the background. If the recording ends early, the remaining
+        frames of the file are left blank.
+
+        Files larger than 4 GB are written as BigTIFF (OME-TIFF) or, as ImageJ itself does,
+        as a classic TIFF file describing only the first frame of the stack (ImageJ TIFF).
+
+        Args:
+            filePath (str): path of the TIFF file.
+            frameCount (int): number of frames of the recording.
+            imagej (bool): True for ImageJ TIFF, False for OME-TIFF.
+            photometric (str): photometric interpretation of the frames.
+            metadata (dict, optional): metadata stored in the file. Defaults to None.
+        """
+        if frameCount < 1:
+            raise ValueError("A preallocated file requires at least one frame")
+        self.filePath = filePath
+        self.frameCount = frameCount
+        self.imagej = imagej
+        self.photometric = photometric
+        self.metadata = metadata if metadata is not None else {}
+        self.writtenFrames = 0
+        self._frames: np.memmap = None
+
+    def write(self, frame: np.ndarray) -> None:
+        if frame is None:
+            raise ValueError("No frame to write")
+        if self.writtenFrames == self.frameCount:
+            raise ValueError(f"All the {self.frameCount} frames of the file are written")
+        if self._frames is None:
+            metadata = dict(self.metadata)
+            if not self.imagej:
+                metadata["axes"] = "TYXS" if frame.ndim == 3 else "TYX"
+            isLarge = self.frameCount * frame.nbytes > CLASSIC_TIFF_LIMIT
+            self._frames = tiff.memmap(
+                self.filePath,
+                shape=(self.frameCount, *frame.shape),
+                dtype=frame.dtype,
+                imagej=self.imagej,
+                ome=not self.imagej,
+                bigtiff=isLarge and not self.imagej,
+                truncate=isLarge and self.imagej,
+                photometric=self.photometric,
+                software="napari-live-recording",
+                metadata=metadata,
+            )
+        self._frames[self.writtenFrames] = frame
+        self.writtenFrames += 1
+
+    def close(self) -> None:
+        if self._frames is not None:
+            self._frames.flush()
+            self._frames = None
+
+
+class HDF5Writer:
+    def __init__(
+        self,
+        filePath: str,
+        compression: str = None,
+        metadata: dict = None,
+        chunkBytes: int = 2**20,
+        flushInterval: int = 10,
+    ) -> None:
+        """Appends frames to an HDF5 file. Frames are stored in a resizable dataset ("frames"),
+        chunked along time with several whole frames per chunk, so that appending a frame only
+        writes into the current chunk. The write time of each frame is stored in the "timestamps" dataset.
+        Datasets are grown by a whole chunk at a time and trimmed to the number of written frames when
+        the file is closed; until then, the timestamps of the frames not yet written are NaN.
+
+        The file is opened in single-writer/multiple-reader (SWMR) mode as soon as the datasets
+        are created (with the first frame), so that other processes can read the recording while
+        it is being written; datasets are flushed every `flushInterval` frames.
+
+        Args:
+            filePath (str): path of the HDF5 file.
+            compression (str, optional): HDF5 compression filter ("lzf" or "gzip"). Defaults to None (no compression).
+            metadata (dict, optional): attributes of the frames dataset. Defaults to None.
+            chunkBytes (int, optional): approximate size of each chunk (bytes). Defaults to 1 MiB.
+            flushInterval (int, optional): number of frames between flushes for SWMR readers. Defaults to 10.
+        """
+        try:
+            import h5py
+        except ImportError:
+            raise ImportError("HDF5 recording requires h5py (pip install h5py)")
+        if compression not in [None, "lzf", "gzip"]:
+            raise ValueError(f"Unsupported HDF5 compression: {compression}")
+        self.filePath = filePath
+        self.compression = compression
+        self.metadata = metadata if metadata is not None else {}
+        self.chunkBytes = chunkBytes
+        self.flushInterval = flushInterval
+        # SWMR requires the latest file format
+        self.file = h5py.File(filePath, "w", libver="latest")
+        self.frames = None
+        self.timestamps = None
+        self.framesPerChunk = 1
+        self.frameCount = 0
+
+    def _createDatasets(self, frame: np.ndarray) -> None:
+        self.framesPerChunk = max(1, self.chunkBytes // max(frame.nbytes, 1))
+        options = {}
+        if self.compression == "gzip":
+            # fastest gzip level, the ratio gain of higher levels is small for camera frames
+            options = dict(compression="gzip", compression_opts=1, shuffle=True)
+        elif self.compression == "lzf":
+            options = dict(compression="lzf", shuffle=True)
+        self.frames = self.file.create_dataset(
+            "frames",
+            shape=(0, *frame.shape),
+            maxshape=(None, *frame.shape),
+            chunks=(self.framesPerChunk, *frame.shape),
+            dtype=frame.dtype,
+            **options,
+        )
+        for key, value in self.metadata.items():
+            self.frames.attrs[key] = value
+        self.timestamps = self.file.create_dataset(
+            "timestamps",
+            shape=(0,),
+            maxshape=(None,),
+            chunks=(4096,),
+            dtype=np.float64,
+            fillvalue=np.nan,
+        )
+        self.timestamps.attrs["unit"] = "s"
+        self.file.swmr_mode = True
+
+    def write(self, frame: np.ndarray, timestamp: float = None) -> None:
+        if frame is None:
+            raise ValueError("No frame to write")
+        if self.frames is None:
+            self._createDatasets(frame)
+        index = self.frameCount
+        if index == self.frames.shape[0]:
+            # resizing is expensive (it rewrites the dataset metadata), grow by a whole chunk
+            size = index + self.framesPerChunk
+            self.frames.resize(size, axis=0)
+            self.timestamps.resize(size, axis=0)
+        self.frames[index] = frame
+        self.timestamps[index] = time.time() if timestamp is None else timestamp
+        self.frameCount += 1
+        if self.frameCount % self.flushInterval == 0:
+            self.frames.flush()
+            self.timestamps.flush()
+
+    def close(self) -> None:
+        if self.frames is not None:
+            self.frames.resize(self.frameCount, axis=0)
+            self.timestamps.resize(self.frameCount, axis=0)
+        self.file.close()
+
+
+def downsample(data: np.ndarray) -> np.ndarray:
+    """Halves the size of the last two axes of an array, averaging blocks of 2x2 pixels
+    (a trailing odd row or column is dropped). The data type is preserved."""
+    height, width = data.shape[-2] // 2 * 2, data.shape[-1] // 2 * 2
+    blocks = data[..., :height, :width].reshape(
+        *data.shape[:-2], height // 2, 2, width // 2, 2
+    )
+    result = blocks.mean(axis=(-3, -1))
+    if np.issubdtype(data.dtype, np.integer):
+        result = np.rint(result)
+    return result.astype(data.dtype)
+
+
+class ZarrWriter:
+    def __init__(
+        self,
+        filePath: str,
+        compression: str = None,
+        metadata: dict = None,
+        pyramidLevels: int = 0,
+        chunkBytes: int = 2**22,
+        maxPendingChunks: int = 4,
+    ) -> None:
+        """Streams frames to an OME-Zarr store (Zarr v2 layout with OME-NGFF 0.4 multiscale metadata).
+        Frames are copied into a block of consecutive frames, which is written as one chunk
+        (whole frames along the spatial axes, about `chunkBytes` along time) once full.
+        Chunks are compressed and written by the shared compression pool, so that the
+        writer loop only copies frames; at most `maxPendingChunks` chunks are queued
+        before the writer waits for the oldest one.
+
+        The shape of the arrays is updated each time a chunk is stored, so that other
+        tools can read the recording chunk by chunk while it is being written.
+        Each pyramid level halves the size of the frames of the previous one (2x2 average)
+        and is built from the same block when the chunk is written.
+
+        Args:
+            filePath (str): path of the store (a directory).
+            compression (str, optional): chunk compression ("zlib", with byte shuffling). Defaults to None (no compression).
+            metadata (dict, optional): attributes stored with the multiscale metadata. Defaults to None.
+            pyramidLevels (int, optional): number of downsampled levels. Defaults to 0.
+            chunkBytes (int, optional): approximate size of each chunk (bytes). Defaults to 4 MiB.
+            maxPendingChunks (int, optional): maximum number of chunks waiting to be written. Defaults to 4.
+        """
+        if compression not in [None, "zlib"]:
+            raise ValueError(f"Unsupported Zarr compression: {compression}")
+        if os.path.exists(filePath):
+            # replace a previous recording, as the other writers do
+            if not os.path.isfile(os.path.join(filePath, ".zgroup")):
+                raise FileExistsError(f"{filePath} exists and is not a Zarr store")
+            shutil.rmtree(filePath)
+        os.makedirs(filePath)
+        self.filePath = filePath
+        self.compression = compression
+        self.metadata = metadata if metadata is not None else {}
+        self.pyramidLevels = max(int(pyramidLevels), 0)
+        self.chunkBytes = chunkBytes
+        self.maxPendingChunks = max(maxPendingChunks, 1)
+        self.frameCount = 0
+        self.chunkFrames = 0
+        self.shapes: List[tuple] = []
+        self._block: np.ndarray = None
+        self._isRGB = False
+        self._pending: Deque[Tuple[int, Future]] = deque()
+        self._storedChunks = 0
+        self._writeJSON(".zgroup", {"zarr_format": 2})
+
+    def _writeJSON(self, path: str, content: dict) -> None:
+        writeJSON(os.path.join(self.filePath, path), content)
+
+    def _writeArrayMetadata(self, frames: int) -> None:
+        for level, shape in enumerate(self.shapes):
+            compressor, filters = None, None
+            if self.compression == "zlib":
+                compressor = {"id": "zlib", "level": 1}
+                if self._block.dtype.itemsize > 1:
+                    filters = [{"id": "shuffle", "elementsize": self._block.dtype.itemsize}]
+            self._writeJSON(
+                os.path.join(str(level), ".zarray"),
+                {
+                    "zarr_format": 2,
+                    "shape": [frames, *shape],
+                    "chunks": [self.chunkFrames, *shape],
+                    "dtype": self._block.dtype.str,
+                    "compressor": compressor,
+                    "filters": filters,
+                    "fill_value": 0,
+                    "order": "C",
+                    "dimension_separator": "/",
+                },
+            )
+
+    def _createArrays(self, frame: np.ndarray) -> None:
+        # OME-NGFF requires the channel axis before the spatial axes
+        self._isRGB = frame.ndim == 3
+        shape = (frame.shape[2], *frame.shape[:2]) if self._isRGB else frame.shape
+        self.chunkFrames = max(1, self.chunkBytes // max(frame.nbytes, 1))
+        self.shapes = [shape]
+        for _ in range(self.pyramidLevels):
+            shape = (*shape[:-2], shape[-2] // 2, shape[-1] // 2)
+            if shape[-2] == 0 or shape[-1] == 0:
+                break
+            self.shapes.append(shape)
+        self._block = np.zeros((self.chunkFrames, *self.shapes[0]), dtype=frame.dtype)
+        for level in range(len(self.shapes)):
+            os.makedirs(os.path.join(self.filePath, str(level)))
+        self._writeArrayMetadata(0)
+        axes = [{"name": "t", "type": "time", "unit": "second"}]
+        if self._isRGB:
+            axes.append({"name": "c", "type": "channel"})
+        axes.extend([{"name": "y", "type": "space"}, {"name": "x", "type": "space"}])
+        self._writeJSON(
+            ".zattrs",
+            {
+                "multiscales": [
+                    {
+                        "version": "0.4",
+                        "name": os.path.basename(self.filePath),
+                        "axes": axes,
+                        "datasets": [
+                            {
+                                "path": str(level),
+                                "coordinateTransformations": [
+                                    {
+                                        "type": "scale",
+                                        "scale": [1.0] * (len(axes) - 2) + [2.0**level] * 2,
+                                    }
+                                ],
+                            }
+                            for level in range(len(self.shapes))
+                        ],
+                        "type": "mean",
+                    }
+                ],
+                "napari-live-recording": self.metadata,
+            },
+        )
+
+    def _storeChunk(self, index: int, block: np.ndarray) -> None:
+        for level in range(len(self.shapes)):
+            if level > 0:
+                block = downsample(block)
+            if self.compression is None:
+                data = np.ascontiguousarray(block).tobytes()
+            else:
+                data = AVAILABLE_CODECS[self.compression][0](shuffle(block))
+            key = "/".join([str(index)] + ["0"] * (block.ndim - 1))
+            path = os.path.join(self.filePath, str(level), key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as file:
+                file.write(data)
+
+    def _collectChunks(self, wait: bool = False) -> None:
+        # chunks are published in order, once they and all the previous ones are stored
+        stored = self._storedChunks
+        while len(self._pending) > 0 and (wait or self._pending[0][1].done()):
+            index, future = self._pending.popleft()
+            future.result()
+            stored = index + 1
+        if stored != self._storedChunks:
+            self._storedChunks = stored
+            self._writeArrayMetadata(min(stored * self.chunkFrames, self.frameCount))
+
+    def _submitChunk(self) -> None:
+        index = (self.frameCount - 1) // self.chunkFrames
+        block, self._block = self._block, np.zeros_like(self._block)
+        self._pending.append((index, compressionPool().submit(self._storeChunk, index, block)))
+        if len(self._pending) > self.maxPendingChunks:
+            # the writer is faster than the pool, wait for the oldest chunk
+            self._pending[0][1].result()
+        self._collectChunks()
+
+    def write(self, frame: np.ndarray) -> None:
+        if frame is None:
+            raise ValueError("No frame to write")
+        if self._block is None:
+            self._createArrays(frame)
+        position = self.frameCount % self.chunkFrames
+        self._block[position] = np.moveaxis(frame, -1, 0) if self._isRGB else frame
+        self.frameCount += 1
+        if position == self.chunkFrames - 1:
+            self._submitChunk()
+
+    def close(self) -> None:
+        """Writes the last (partial) chunk and waits for all the chunks to be stored."""
+        if self._block is None:
+            return
+        if self.frameCount % self.chunkFrames != 0:
+            # edge chunks are stored whole, the frames past the end are zeros
+            self._submitChunk()
+        self._collectChunks(wait=True)
+        self._writeArrayMetadata(self.frameCount)
+
+
+class RawStreamWriter:
+    # size of the disk blocks, writes are multiples of it (except the last one)
+    ALIGNMENT = 4096
+
+    def __init__(
+        self,
+        filePath: str,
+        metadata: dict = None,
+        blockBytes: int = 2**23,
+        maxPendingBlocks: int = 4,
+    ) -> None:
+        """Appends frames to a flat binary file, for the highest sustained write speed.
+        The bytes of the frames are copied into a block of `blockBytes` bytes (a multiple of 4096),
+        which is written once full with a single sequential write by a dedicated writer thread;
+        at most `maxPendingBlocks` blocks wait to be written, and written blocks are reused.
+
+        The shape, data type and metadata of the frames are stored in a JSON sidecar
+        (`<filePath>.json`) when the first frame is written; the number of frames and the
+        write time of each frame are added when the writer is closed. The file can be opened
+        as a memory map with `openRawStream` and converted with `convertRawStream`.
+
+        Args:
+            filePath (str): path of the binary file.
+            metadata (dict, optional): metadata stored in the sidecar. Defaults to None.
+            blockBytes (int, optional): size of each write (bytes). Defaults to 8 MiB.
+            maxPendingBlocks (int, optional): maximum number of blocks waiting to be written. Defaults to 4.
+        """
+        self.filePath = filePath
+        self.metadata = metadata if metadata is not None else {}
+        self.blockBytes = max(blockBytes // self.ALIGNMENT, 1) * self.ALIGNMENT
+        self.maxPendingBlocks = max(maxPendingBlocks, 1)
+        self.shape: tuple = None
+        self.dtype: np.dtype = None
+        self.frameCount = 0
+        self.timestamps: List[float] = []
+        # unbuffered, each block goes straight to the operating system
+        self.file = open(filePath, "wb", buffering=0)
+        self._block = np.empty(self.blockBytes, dtype=np.uint8)
+        self._position = 0
+        self._freeBlocks: List[np.ndarray] = []
+        self._pending: Deque[Tuple[Future, np.ndarray]] = deque()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="RawStreamWriter")
+
+    def _writeBlock(self, data: memoryview) -> None:
+        while len(data) > 0:
+            data = data[self.file.write(data) :]
+
+    def _writeSidecar(self, closed: bool = False) -> None:
+        writeJSON(
+            self.filePath + ".json",
+            {
+                "shape": list(self.shape),
+                "dtype": self.dtype.str,
+                "frameCount": self.frameCount if closed else None,
+                "timestamps": self.timestamps if closed else [],
+                "metadata": self.metadata,
+            },
+        )
+
+    def _submitBlock(self) -> None:
+        block = self._block
+        self._pending.append(
+            (self._writer.submit(self._writeBlock, memoryview(block)[: self._position]), block)
+        )
+        while len(self._pending) > 0 and (
+            len(self._pending) > self.maxPendingBlocks or self._pending[0][0].done()
+        ):
+            future, written = self._pending.popleft()
+            future.result()
+            self._freeBlocks.append(written)
+        self._block = self._freeBlocks.pop() if len(self._freeBlocks) > 0 else np.empty_like(block)
+        self._position = 0
+
+    def write(self, frame: np.ndarray) -> None:
+        if frame is None:
+            raise ValueError("No frame to write")
+        if self.shape is None:
+            self.shape, self.dtype = frame.shape, frame.dtype
+            self._writeSidecar()
+        elif frame.shape != self.shape or frame.dtype != self.dtype:
+            raise ValueError(
+                f"Frame of shape {frame.shape} ({frame.dtype}) does not match "
+                f"the stream ({self.shape}, {self.dtype})"
+            )
+        data = np.ascontiguousarray(frame).reshape(-1).view(np.uint8)
+        offset = 0
+        while offset < data.size:
+            size = min(data.size - offset, self.blockBytes - self._position)
+            self._block[self._position : self._position + size] = data[offset : offset + size]
+            self._position += size
+            offset += size
+            if self._position == self.blockBytes:
+                self._submitBlock()
+        self.timestamps.append(time.time())
+        self.frameCount += 1
+
+    def close(self) -> None:
+        if self._position > 0:
+            self._submitBlock()
+        while len(self._pending) > 0:
+            self._pending.popleft()[0].result()
+        self._writer.shutdown()
+        self.file.close()
+        if self.shape is not None:
+            self._writeSidecar(closed=True)
+
+
+class RolloverWriter:
+    def __init__(
+        self,
+        filePath: str,
+        extension: str,
+        openPart: Callable[[str, int], Tuple[object, Callable[[np.ndarray], None]]],
+        maxBytes: int = None,
+        maxSeconds: float = None,
+        frameOverhead: int = 0,
+    ) -> None:
+        """Splits a recording into numbered files. The first file is `<filePath><extension>`,
+        the next ones `<filePath>_0001<extension>`, `<filePath>_0002<extension>`, ...;
+        a new file is started before the current one exceeds `maxBytes` bytes
+        (counting `frameOverhead` more bytes for each frame) or after `maxSeconds` seconds.
+
+        Files are switched between two frames, so no frame is lost: the next file is opened
+        in the background once the current one is half full, and the full one is closed in the background.
+
+        Args:
+            filePath (str): path of the first file, without extension.
+            extension (str): extension of the files.
+            openPart (Callable[[str, int], Tuple[object, Callable[[np.ndarray], None]]]): opens a file given its path (without extension) and its number, returning the file and the function writing a frame to it.
+            maxBytes (int, optional): maximum size of each file (bytes). Defaults to None (no size limit).
+            maxSeconds (float, optional): maximum duration of each file (seconds). Defaults to None (no time limit).
+            frameOverhead (int, optional): bytes added to a file by each frame in addition to its pixels. Defaults to 0.
+        """
+        self.filePath = filePath
+        self.extension = extension
+        self.openPart = openPart
+        self.maxBytes = maxBytes
+        self.maxSeconds = maxSeconds
+        self.frameOverhead = frameOverhead
+        self.partPaths = [self._partPath(0) + extension]
+        self._file, self._writeFunc = openPart(self._partPath(0), 0)
+        self._partBytes = 0
+        self._partStart = time.monotonic()
+        self._nextPart: Future = None
+        self._closing: List[Future] = []
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="FileRollover")
+
+    def _partPath(self, index: int) -> str:
+        return self.filePath if index == 0 else f"{self.filePath}_{index:04d}"
+
+    def _isFilled(self, fraction: float, frameBytes: int = 0) -> bool:
+        if self.maxBytes is not None and self._partBytes + frameBytes > self.maxBytes * fraction:
+            return True
+        return (
+            self.maxSeconds is not None
+            and time.monotonic() - self._partStart >= self.maxSeconds * fraction
+        )
+
+    def _openNextPart(self) -> None:
+        index = len(self.partPaths)
+        self._nextPart = self._executor.submit(self.openPart, self._partPath(index), index)
+
+    def _rollover(self) -> None:
+        if self._nextPart is None:
+            self._openNextPart()
+        fullFile = self._file
+        self._file, self._writeFunc = self._nextPart.result()
+        self._nextPart = None
+        self._closing.append(self._executor.submit(fullFile.close))
+        self.partPaths.append(self._partPath(len(self.partPaths)) + self.extension)
+        self._partBytes = 0
+        self._partStart = time.monotonic()
+
+    def write(self, frame: np.ndarray) -> None:
+        if frame is None:
+            raise ValueError("No frame to write")
+        frameBytes = frame.nbytes + self.frameOverhead
+        # a file always holds at least one frame
+        if self._partBytes > 0 and self._isFilled(1.0, frameBytes):
+            self._rollover()
+        self._writeFunc(frame)
+        self._partBytes += frameBytes
+        if self._nextPart is None and self._isFilled(0.5):
+            self._openNextPart()
+
+    def close(self) -> None:
+        self._file.close()
+        for closing in self._closing:
+            closing.result()
+        if self._nextPart is not None:
+            # the file opened ahead of time was not used
+            unusedFile, _ = self._nextPart.result()
+            unusedFile.close()
+            unusedPath = self._partPath(len(self.partPaths)) + self.extension
+            # raw streams also have a JSON sidecar file
+            for path in [unusedPath, unusedPath + ".json"]:
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                elif os.path.exists(path):
+                    os.remove(path)
+        self._executor.shutdown()
+
+
+def openRawStream(filePath: str) -> np.ndarray:
+    """Opens a raw stream as a read-only memory map of shape (frames, *frame shape), without loading it.
+    A stream which is still being recorded contains the frames written to disk so far.
+
+    Args:
+        filePath (str): path of the binary file.
+
+    Returns:
+        np.ndarray: frames of the stream.
+    """
+    with open(filePath + ".json", "r", encoding="utf-8") as file:
+        sidecar = json.load(file)
+    shape, dtype = tuple(sidecar["shape"]), np.dtype(sidecar["dtype"])
+    frameCount = sidecar["frameCount"]
+    if frameCount is None:
+        frameCount = os.path.getsize(filePath) // (int(np.prod(shape)) * dtype.itemsize)
+    if frameCount == 0:
+        return np.empty((0, *shape), dtype=dtype)
+    return np.memmap(filePath, dtype=dtype, mode="r", shape=(frameCount, *shape))
+
+
+def convertRawStream(
+    filePath: str, fileFormat: FileFormat, compression: str = None
+) -> str:
+    """Converts a raw stream into another file format, next to the stream.
+    The metadata of the stream are stored in the new file; HDF5 files also store the timestamps.
+
+    Args:
+        filePath (str): path of the binary file.
+        fileFormat (FileFormat): format of the new file.
+        compression (str, optional): compression of the new file (see FILE_COMPRESSIONS). Defaults to None.
+
+    Returns:
+        str: path of the new file.
+    """
+    if fileFormat == FileFormat["Raw stream"]:
+        raise ValueError("The file is already a raw stream")
+    frames = openRawStream(filePath)
+    with open(filePath + ".json", "r", encoding="utf-8") as file:
+        sidecar = json.load(file)
+    outputPath = filePath[: -len(".raw")] if filePath.endswith(".raw") else filePath
+    writerInfo = WriterInfo(
+        folder=os.path.dirname(outputPath),
+        filename=os.path.basename(outputPath),
+        fileFormat=fileFormat,
+        recordType=RecordType["Number of frames"],
+        stackSize=len(frames),
+        compression=compression,
+    )
+    colorType = ColorType.RGB if frames.ndim == 4 else ColorType.GRAYLEVEL
+    file, writeFunc = createFrameWriter(outputPath, writerInfo, colorType, sidecar["metadata"])
+    timestamps = sidecar["timestamps"]
+    try:
+        for index, frame in enumerate(frames):
+            if isinstance(file, HDF5Writer) and index < len(timestamps):
+                file.write(np.asarray(frame), timestamps[index])
+            else:
+                writeFunc(np.asarray(frame))
+    finally:
+        file.close()
+    return outputPath + FILE_EXTENSIONS[fileFormat]
+
+
+def rawStreamReader(path):
+    """napari reader of raw streams: opens them as memory maps, so they are not loaded in memory."""
+    if isinstance(path, list):
+        path = path[0]
+    if not path.endswith(".raw") or not os.path.isfile(path + ".json"):
+        return None
+
+    def readRawStream(path):
+        path = path[0] if isinstance(path, list) else path
+        frames = openRawStream(path)
+        return [(frames, {"name": os.path.basename(path), "rgb": frames.ndim == 4}, "image")]
+
+    return readRawStream
+
+
+def openFrameFile(
+    filePath: str,
+    writerInfo: WriterInfo,
+    colorType: ColorType,
+    metadata: dict = None,
+    frameCount: int = None,
+    maxBytes: int = None,
+) -> Tuple[object, Callable[[np.ndarray], None]]:
+    """Opens a single output file in the format of the writer information (see `createFrameWriter`).
+
+    Args:
+        filePath (str): path of the file, without extension.
+        writerInfo (WriterInfo): writer information of the recording.
+        colorType (ColorType): color type of the camera.
+        metadata (dict, optional): metadata stored in the file. Defaults to None.
+        frameCount (int, optional): number of frames of the file, if known in advance. Defaults to None.
+        maxBytes (int, optional): maximum size of the file, if known in advance (bytes). Defaults to None.
+
+    Returns:
+        Tuple[object, Callable[[np.ndarray], None]]: the opened file and the function writing a frame to it.
+    """
+    metadata = metadata if metadata is not None else {}
+    filePath = filePath + FILE_EXTENSIONS[writerInfo.fileFormat]
+    isTiff = writerInfo.fileFormat in [FileFormat["ImageJ TIFF"], FileFormat["OME-TIFF"]]
+    isImageJ = writerInfo.fileFormat == FileFormat["ImageJ TIFF"]
+    if isTiff and frameCount is not None and writerInfo.compression is None:
+        file = MemmapTiffWriter(
+            filePath,
+            frameCount,
+            isImageJ,
+            TIFF_PHOTOMETRIC_MAP[colorType][0],
+            metadata,
+        )
+        return file, file.write
+    elif isTiff:
+        if isImageJ:
+            bigtiff = False
+        elif maxBytes is not None:
+            bigtiff = maxBytes > CLASSIC_TIFF_LIMIT
+        else:
+            # decided with the first frame, from the expected size of the file
+            bigtiff = None
+        file = BatchedTiffWriter(
+            filePath,
+            isImageJ,
+            TIFF_PHOTOMETRIC_MAP[colorType][0],
+            metadata,
+            writerInfo.compression,
+            bigtiff=bigtiff,
+            frameCount=frameCount,
+        )
+        return file, file.write
+    elif writerInfo.fileFormat == FileFormat["HDF5"]:
+        file = HDF5Writer(filePath, writerInfo.compression, metadata)
+        return file, file.write
+    elif writerInfo.fileFormat == FileFormat["OME-Zarr"]:
+        file = ZarrWriter(
+            filePath, writerInfo.compression, metadata, writerInfo.pyramidLevels
+        )
+        return file, file.write
+    elif writerInfo.fileFormat == FileFormat["Raw stream"]:
+        file = RawStreamWriter(filePath, metadata)
+        return file, file.write
+    raise ValueError("Unsupported file format selected for recording!")
+
+
+def createFrameWriter(
+    filePath: str,
+    writerInfo: WriterInfo,
+    colorType: ColorType,
+    metadata: dict = None,
+    frameCount: int = None,
+) -> Tuple[object, Callable[[np.ndarray], None]]:
+    """Opens the output file of a recording in the format of the writer information.
+    If the writer information sets a maximum size or duration of the files, the recording
+    is split into numbered files. OME-TIFF files which may exceed the 4 GB limit of classic TIFF files
+    (open-ended recordings, recordings expected to exceed it or a larger maximum size) are written
+    as BigTIFF; ImageJ does not support BigTIFF, so ImageJ TIFF recordings of unknown length
+    are always split before reaching 4 GB.
+
+    Args:
+        filePath (str): path of the file, without extension.
+        writerInfo (WriterInfo): writer information of the recording.
+        colorType (ColorType): color type of the camera.
+        metadata (dict, optional): metadata stored in the file. Defaults to None.
+        frameCount (int, optional): number of frames of the recording, if known in advance; uncompressed TIFF files are then preallocated and memory-mapped. Defaults to None.
+
+    Returns:
+        Tuple[object, Callable[[np.ndarray], None]]: the opened file (to be closed at the end of the recording) and the function writing a frame to it.
+    """
+    metadata = metadata if metadata is not None else {}
+    maxBytes = writerInfo.rolloverBytes if writerInfo.rolloverBytes > 0 else None
+    maxSeconds = writerInfo.rolloverSeconds if writerInfo.rolloverSeconds > 0 else None
+    isTiff = writerInfo.fileFormat in [FileFormat["ImageJ TIFF"], FileFormat["OME-TIFF"]]
+    isImageJ = writerInfo.fileFormat == FileFormat["ImageJ TIFF"]
+    # preallocated files of any size are supported
+    isPreallocated = isTiff and frameCount is not None and writerInfo.compression is None
+    if maxBytes is None and maxSeconds is None and (not isImageJ or isPreallocated):
+        return openFrameFile(filePath, writerInfo, colorType, metadata, frameCount)
+    if isImageJ:
+        maxBytes = min(maxBytes or CLASSIC_TIFF_LIMIT, CLASSIC_TIFF_LIMIT)
+
+    def openPart(partPath: str, index: int) -> Tuple[object, Callable[[np.ndarray], None]]:
+        return openFrameFile(
+            partPath, writerInfo, colorType, {**metadata, "Part": index}, maxBytes=maxBytes
+        )
+
+    file = RolloverWriter(
+        filePath,
+        FILE_EXTENSIONS[writerInfo.fileFormat],
+        openPart,
+        maxBytes,
+        maxSeconds,
+        TIFF_PAGE_OVERHEAD if isTiff else 0,
+    )
+    return file, file.write
@@ -0,0 +1,128 @@
+import numpy as np
+import tracemalloc
+from dataclasses import dataclass
+from time import perf_counter
+from typing import List, Tuple
+from napari_live_recording.processing_engine.preview import createPreviewStages
+
+
+@dataclass(frozen=True)
+class StageTiming:
+    """Dataclass for the benchmark results of a single stage of a filter-group."""
+
+    name: str
+    """Name of the stage.
+    """
+
+    meanTime: float
+    """Mean execution time of the stage (seconds).
+    """
+
+    p95Time: float
+    """95th percentile of the execution time of the stage (seconds).
+    """
+
+    allocatedBytes: int
+    """Peak memory allocated by the stage while processing a single frame (bytes).
+    """
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    """Dataclass for the benchmark results of a filter-group."""
+
+    stages: List[StageTiming]
+    """Results of each stage, in order of execution.
+    """
+
+    meanTime: float
+    """Mean execution time of the whole filter-group (seconds).
+    """
+
+    p95Time: float
+    """95th percentile of the execution time of the whole filter-group (seconds).
+    """
+
+    @property
+    def fps(self) -> float:
+        """Frame rate achievable by the filter-group, based on its mean execution time."""
+        return 1 / self.meanTime if self.meanTime > 0 else float("inf")
+
+
+def createSyntheticFrame(shape: Tuple[int, ...], dtype) -> np.ndarray:
+    """Creates a random frame with the given shape and data type, to be used
+    as benchmark input when no real frame from the camera is available.
+    Integer frames span the full range of their type, floating point frames are in [0, 1)."""
+    dtype = np.dtype(dtype)
+    generator = np.random.default_rng(0)
+    if dtype.kind in "ui":
+        info = np.iinfo(dtype)
+        return generator.integers(info.min, info.max, size=shape, dtype=dtype, endpoint=True)
+    return generator.random(size=shape).astype(dtype)
+
+
+def benchmarkFilterGroup(
+    filters: dict, frame: np.ndarray, iterations: int = 50, warmup: int = 2
+) -> BenchmarkResult:
+    """Runs a filter-group stage by stage on the same frame and measures the execution time
+    and the memory allocated by each stage. Times are measured without memory tracing,
+    which is done in a separate pass as it slows down the execution.
+
+    Args:
+        filters (dict): filter-group to benchmark.
+        frame (np.ndarray): input frame.
+        iterations (int, optional): number of timed runs. Defaults to 50.
+        warmup (int, optional): number of untimed runs before the timed ones. Defaults to 2.
+
+    Returns:
+        BenchmarkResult: per-stage and total results.
+    """
+    if iterations < 1:
+        raise ValueError("At least one iteration is required")
+    stages = createPreviewStages(filters)
+    times = np.zeros((iterations, len(stages)), dtype=np.float64)
+
+    def run(timings: np.ndarray = None) -> None:
+        output = frame
+        for index, (_, _, stage) in enumerate(stages):
+            start = perf_counter()
+            output = stage(output)
+            if timings is not None:
+                timings[index] = perf_counter() - start
+
+    for _ in range(warmup):
+        run()
+    for iteration in range(iterations):
+        run(times[iteration])
+
+    allocatedBytes = []
+    wasTracing = tracemalloc.is_tracing()
+    if not wasTracing:
+        tracemalloc.start()
+    try:
+        output = frame
+        for _, _, stage in stages:
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            output = stage(output)
+            _, peak = tracemalloc.get_traced_memory()
+            allocatedBytes.append(max(peak - baseline, 0))
+        del output
+    finally:
+        if not wasTracing:
+            tracemalloc.stop()
+
+    totals = times.sum(axis=1)
+    return BenchmarkResult(
+        stages=[
+            StageTiming(
+                name=name,
+                meanTime=float(times[:, index].mean()),
+                p95Time=float(np.percentile(times[:, index], 95)),
+                allocatedBytes=int(allocatedBytes[index]),
+            )
+            for index, (name, _, _) in enumerate(stages)
+        ],
+        meanTime=float(totals.mean()),
+        p95Time=float(np.percentile(totals, 95)),
+    )
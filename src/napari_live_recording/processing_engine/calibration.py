@@ -0,0 +1,97 @@
+import numpy as np
+from typing import Union
+
+
+class FlatFieldCorrection:
+    def __init__(
+        self,
+        dark: np.ndarray = None,
+        flat: np.ndarray = None,
+        fixedPoint: bool = False,
+        fractionalBits: int = 12,
+        outputDtype: Union[str, np.dtype] = np.uint16,
+    ) -> None:
+        """Flat-field and dark-frame correction stage.
+        The correction `(frame - dark) * mean(flat - dark) / (flat - dark)` is rewritten as
+        `frame * gain - offset`, where the reciprocal gain map and the offset map are precomputed
+        once in float32. Each frame is then corrected with a single multiply-subtract.
+
+        If `fixedPoint` is set, the maps are converted to integers scaled by `2 ** fractionalBits`
+        and the correction is computed with integer arithmetic only; the result is rounded, clipped
+        and returned in `outputDtype`.
+
+        Args:
+            dark (np.ndarray, optional): master dark frame. Defaults to None (no offset).
+            flat (np.ndarray, optional): master flat frame. Defaults to None (unit gain).
+            fixedPoint (bool, optional): use integer fixed-point arithmetic. Defaults to False.
+            fractionalBits (int, optional): number of fractional bits of the fixed-point maps. Defaults to 12.
+            outputDtype (Union[str, np.dtype], optional): output data type of the fixed-point correction. Defaults to np.uint16.
+        """
+        if dark is None and flat is None:
+            raise ValueError("At least one between dark and flat frames is required")
+        shape = dark.shape if dark is not None else flat.shape
+        if dark is not None and flat is not None and dark.shape != flat.shape:
+            raise ValueError(
+                f"Dark frame shape {dark.shape} does not match flat frame shape {flat.shape}"
+            )
+        dark = (
+            np.zeros(shape, dtype=np.float32)
+            if dark is None
+            else dark.astype(np.float32)
+        )
+        if flat is None:
+            gain = np.ones(shape, dtype=np.float32)
+        else:
+            response = flat.astype(np.float32) - dark
+            valid = response > 0
+            # dead pixels (no response in the flat frame) are set to zero
+            gain = np.zeros(shape, dtype=np.float32)
+            gain[valid] = response[valid].mean() / response[valid]
+        self.gain = gain
+        self.offset = dark * gain
+        self.fixedPoint = fixedPoint
+        self.outputDtype = np.dtype(outputDtype)
+        if fixedPoint:
+            scale = 1 << fractionalBits
+            self.fractionalBits = fractionalBits
+            self.fixedGain = np.rint(gain * scale).astype(np.int64)
+            # half of the scale is subtracted from the offset so that
+            # the final right shift rounds to the nearest integer
+            self.fixedOffset = np.rint(self.offset * scale).astype(np.int64) - (
+                scale >> 1
+            )
+
+    @property
+    def shape(self) -> tuple:
+        return self.gain.shape
+
+    def __call__(self, frame: np.ndarray) -> np.ndarray:
+        if frame.shape != self.shape:
+            raise ValueError(
+                f"Frame shape {frame.shape} does not match calibration shape {self.shape}"
+            )
+        if self.fixedPoint:
+            corrected = np.multiply(frame, self.fixedGain, dtype=np.int64)
+            corrected -= self.fixedOffset
+            corrected >>= self.fractionalBits
+            info = np.iinfo(self.outputDtype)
+            np.clip(corrected, info.min, info.max, out=corrected)
+            return corrected.astype(self.outputDtype)
+        corrected = np.multiply(frame, self.gain, dtype=np.float32)
+        corrected -= self.offset
+        return corrected
+
+
+def averageFrames(frames) -> np.ndarray:
+    """Averages an iterable of frames into a float32 master frame,
+    accumulating in float64 to avoid losing precision over many frames."""
+    accumulator = None
+    count = 0
+    for frame in frames:
+        if accumulator is None:
+            accumulator = np.zeros(frame.shape, dtype=np.float64)
+        accumulator += frame
+        count += 1
+    if count == 0:
+        raise ValueError("No frames to average")
+    return (accumulator / count).astype(np.float32)
@@ -0,0 +1,70 @@
+import numpy as np
+from typing import Callable, Dict, List, Tuple
+from napari_live_recording.common import createPipelineFilter
+
+
+class FilterGraph:
+    def __init__(
+        self,
+        outputs: Dict[str, List[str]],
+        filterGroupsDict: Dict[str, dict],
+    ) -> None:
+        """Graph of filter groups with named outputs.
+        Each output is described as a chain of filter groups applied in order to the incoming frame.
+        Chains are merged into a prefix tree, so that filter groups shared at the beginning of
+        several chains are computed only once per frame and their result fanned out to all the
+        outputs depending on them.
+
+        Example: {"record": ["Denoise"], "display": ["Denoise", "Downsample", "Stretch"]}
+        computes "Denoise" once and reuses its result for both outputs.
+
+        The first output of the dictionary is the primary output of the graph.
+
+        Args:
+            outputs (Dict[str, List[str]]): output name -> ordered list of filter group names.
+            filterGroupsDict (Dict[str, dict]): dictionary of the available filter groups.
+        """
+        if len(outputs) == 0:
+            raise ValueError("A filter graph requires at least one output")
+        self.outputs: Dict[str, Tuple[str, ...]] = {}
+        self.nodes: Dict[Tuple[str, ...], Callable] = {}
+        for outputName, chain in outputs.items():
+            missingGroups = [name for name in chain if name not in filterGroupsDict]
+            if missingGroups:
+                raise ValueError(
+                    f"Output \"{outputName}\" uses unknown filter groups: {missingGroups}"
+                )
+            # "No Filter" does not change the frame, so it does not create a node
+            chain = tuple(
+                groupName
+                for groupName in chain
+                if list(filterGroupsDict[groupName].values())[0] is not None
+            )
+            for depth in range(1, len(chain) + 1):
+                prefix = chain[:depth]
+                # parents are always inserted before their children,
+                # so the insertion order of the nodes is a valid evaluation order
+                if prefix not in self.nodes:
+                    self.nodes[prefix] = createPipelineFilter(
+                        filterGroupsDict[prefix[-1]]
+                    )
+            self.outputs[outputName] = chain
+
+    @property
+    def primaryOutput(self) -> str:
+        """Name of the primary output of the graph."""
+        return next(iter(self.outputs))
+
+    @property
+    def secondaryOutputs(self) -> List[str]:
+        """Names of all the outputs of the graph except the primary one."""
+        return list(self.outputs.keys())[1:]
+
+    def __call__(self, frame: np.ndarray) -> Dict[str, np.ndarray]:
+        """Computes each node of the graph once and returns the frame of each output."""
+        results = {(): frame}
+        for prefix, pipeline in self.nodes.items():
+            results[prefix] = pipeline(results[prefix[:-1]])
+        return {
+            outputName: results[chain] for outputName, chain in self.outputs.items()
+        }
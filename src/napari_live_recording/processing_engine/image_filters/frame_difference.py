@@ -0,0 +1,11 @@
+from napari_live_recording.processing_engine.temporal import FrameDifference
+
+exportedFilters = ["FrameDifference"]
+
+parametersDict = {"lag": 1}
+
+parametersHints = {
+    "lag": "Number of frames between the current frame and the subtracted one, integer value larger than 0",
+}
+
+functionDescription = "Stateful filter. Returns the difference between the current frame and the frame acquired N frames before. The state is reset when the ROI changes or the acquisition is restarted."
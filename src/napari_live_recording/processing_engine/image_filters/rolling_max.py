@@ -0,0 +1,11 @@
+from napari_live_recording.processing_engine.temporal import RollingMax
+
+exportedFilters = ["RollingMax"]
+
+parametersDict = {"windowSize": 10}
+
+parametersHints = {
+    "windowSize": "Number of consecutive frames from which the maximum is taken, integer value larger than 0",
+}
+
+functionDescription = "Stateful filter. Returns the pixel-wise maximum of the last N frames of the stream. The state is reset when the ROI changes or the acquisition is restarted."
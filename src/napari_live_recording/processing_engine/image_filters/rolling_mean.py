@@ -0,0 +1,11 @@
+from napari_live_recording.processing_engine.temporal import RollingMean
+
+exportedFilters = ["RollingMean"]
+
+parametersDict = {"windowSize": 10}
+
+parametersHints = {
+    "windowSize": "Number of consecutive frames averaged together, integer value larger than 0",
+}
+
+functionDescription = "Stateful filter. Returns the average of the last N frames of the stream. The average is updated from a running sum, so the cost per frame does not depend on the window size. The state is reset when the ROI changes or the acquisition is restarted."
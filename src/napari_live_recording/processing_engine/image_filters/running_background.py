@@ -0,0 +1,12 @@
+from napari_live_recording.processing_engine.temporal import RunningBackground
+
+exportedFilters = ["RunningBackground"]
+
+parametersDict = {"alpha": 0.05, "subtract": True}
+
+parametersHints = {
+    "alpha": "Update rate of the background estimate, float value between 0 and 1. Smaller values adapt more slowly",
+    "subtract": "If True the background is subtracted from the current frame, if False the background estimate is returned",
+}
+
+functionDescription = "Stateful filter. Keeps an exponential running estimate of the background of the stream. The state is reset when the ROI changes or the acquisition is restarted."
@@ -0,0 +1,159 @@
+import functools
+import numpy as np
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Hashable, List, Tuple
+from napari_live_recording.common import (
+    getDtypePolicy,
+    getFilterStages,
+    saturatingCast,
+)
+from napari_live_recording.processing_engine.temporal import isTemporalFilter
+
+# default memory budget of the preview stage cache
+DEFAULT_CACHE_SIZE_BYTES = 256 * 1024 * 1024
+
+
+class StageCache:
+    def __init__(self, maxBytes: int = DEFAULT_CACHE_SIZE_BYTES) -> None:
+        """Least-recently-used cache of intermediate stage outputs, bounded by memory.
+        Stored arrays are marked as read-only, as they are shared between
+        all the pipelines starting with the same stages.
+
+        Args:
+            maxBytes (int, optional): maximum number of bytes kept in the cache. Defaults to DEFAULT_CACHE_SIZE_BYTES.
+        """
+        self.maxBytes = maxBytes
+        self.currentBytes = 0
+        self._entries: "OrderedDict[Hashable, np.ndarray]" = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable) -> np.ndarray:
+        """Returns the cached output for `key` (marking it as most recently used), or None."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: np.ndarray) -> None:
+        """Stores a stage output, evicting the least recently used ones if the memory budget is exceeded.
+        Outputs larger than the whole budget are not stored."""
+        value = np.asarray(value)
+        if value.nbytes > self.maxBytes:
+            return
+        value.flags.writeable = False
+        with self._lock:
+            if key in self._entries:
+                self.currentBytes -= self._entries.pop(key).nbytes
+            self._entries[key] = value
+            self.currentBytes += value.nbytes
+            while self.currentBytes > self.maxBytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.currentBytes -= evicted.nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.currentBytes = 0
+
+
+def _freeze(value) -> Hashable:
+    """Converts a parameter value into a hashable key."""
+    if isinstance(value, dict):
+        return tuple((key, _freeze(item)) for key, item in sorted(value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, np.ndarray):
+        return (value.dtype.str, value.shape, value.tobytes())
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+def createPreviewStages(filters: dict) -> List[Tuple[str, Hashable, Callable]]:
+    """Splits a filter-group into its stages, each one paired with its name and a key that identifies it
+    (function and parameters). The casts of the dtype policy are stages as well,
+    so that changing the output data type does not recompute the filters.
+    Temporal filters are instantiated anew, as the preview is a single frame."""
+    stages = []
+    dtypePolicy = getDtypePolicy(filters)
+    if dtypePolicy.workingDtype is not None:
+        stages.append(
+            (
+                f"Cast to {dtypePolicy.workingDtype}",
+                ("workingDtype", dtypePolicy.workingDtype),
+                functools.partial(saturatingCast, dtype=dtypePolicy.workingDtype),
+            )
+        )
+    for name, filter in getFilterStages(filters).items():
+        if filter is None:
+            continue
+        function, parameters = filter[0], filter[1]
+        identifier = (
+            getattr(function, "__module__", None),
+            getattr(function, "__qualname__", repr(function)),
+        )
+        if isTemporalFilter(function):
+            stage = function(**parameters)
+        else:
+            stage = functools.partial(function, **parameters)
+        stages.append((name, (identifier, _freeze(parameters)), stage))
+    if dtypePolicy.outputDtype is not None:
+        stages.append(
+            (
+                f"Cast to {dtypePolicy.outputDtype}",
+                ("outputDtype", dtypePolicy.outputDtype),
+                functools.partial(saturatingCast, dtype=dtypePolicy.outputDtype),
+            )
+        )
+    return stages
+
+
+def evaluatePreview(
+    image: np.ndarray, imageKey: Hashable, filters: dict, cache: StageCache
+) -> np.ndarray:
+    """Applies a filter-group to the preview image reusing the cached outputs
+    of the longest prefix of stages already computed; only the stages
+    following it are evaluated and their outputs are added to the cache.
+
+    Args:
+        image (np.ndarray): preview image.
+        imageKey (Hashable): key identifying the preview image (i.e. a counter increased each time a new image is loaded).
+        filters (dict): filter-group to apply.
+        cache (StageCache): cache of the stage outputs.
+
+    Returns:
+        np.ndarray: output of the last stage of the filter-group.
+    """
+    stages = createPreviewStages(filters)
+    # the key of each stage output is the key of the whole prefix ending with it,
+    # so that changing a stage invalidates all the following ones
+    prefixKeys = []
+    prefixKey = (imageKey,)
+    for _, stageKey, _ in stages:
+        prefixKey = (prefixKey, stageKey)
+        prefixKeys.append(prefixKey)
+
+    output = image
+    first = 0
+    for index in reversed(range(len(stages))):
+        cached = cache.get(prefixKeys[index])
+        if cached is not None:
+            output = cached
+            first = index + 1
+            break
+    for index in range(first, len(stages)):
+        # stages get a writable copy of their input, as in the live pipeline: cached outputs
+        # are read-only, and a stage returning its input must not freeze the preview image
+        output = stages[index][2](np.array(output))
+        cache.put(prefixKeys[index], output)
+    return output
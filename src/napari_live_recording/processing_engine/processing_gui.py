@@ -3,11 +3,24 @@ import cv2 as cv
 import numpy as np
 from ast import literal_eval
 from napari_live_recording.processing_engine.image_filters import *
-from napari_live_recording.common import createPipelineFilter, Settings
-from napari_live_recording.processing_engine import image_filters, defaultImagePath
-import importlib
-import pkgutil
-from qtpy.QtCore import Qt, Signal
+from napari_live_recording.common import (
+    Settings,
+    DtypePolicy,
+    DTYPE_POLICY_KEY,
+    AVAILABLE_DTYPES,
+    getDtypePolicy,
+    getFilterStages,
+)
+from napari_live_recording.processing_engine import defaultImagePath
+from napari_live_recording.processing_engine.preview import StageCache, evaluatePreview
+from napari_live_recording.processing_engine.registry import filterRegistry
+from napari_live_recording.processing_engine.benchmark import (
+    BenchmarkResult,
+    benchmarkFilterGroup,
+    createSyntheticFrame,
+)
+from napari.qt.threading import thread_worker, FunctionWorker
+from qtpy.QtCore import Qt, Signal, QTimer
 import shutil
 from qtpy.QtWidgets import (
     QDialog,
@@ -25,7 +38,18 @@ from qtpy.QtWidgets import (
     QDialogButtonBox,
     QListWidget,
     QAbstractItemView,
+    QComboBox,
+    QTableWidget,
+    QTableWidgetItem,
+    QHeaderView,
+    QCheckBox,
+    QSpinBox,
 )
+from typing import Dict, Tuple
+
+# delay (in ms) between the last edit of the filter-group
+# and the automatic refresh of the preview image
+PREVIEW_DEBOUNCE_MS = 300
 
 
 class LeftList(QListWidget):
@@ -102,14 +126,19 @@ class RightList(QListWidget):
                 self.addItem(item)
 
     def convertItemListToDict(self):
-        """Convenience method to convert the QListWidgetItems in the list to a dictionary of functions with their parameters"""
+        """Convenience method to convert the QListWidgetItems in the list to a dictionary of functions with their parameters.
+        Filters added from the left list are stored as registry references and are imported here."""
         functionsDict = {}
         for i in range(self.count()):
             item = self.item(i)
+            data = item.data(Qt.UserRole)
+            if isinstance(data[0], str):
+                data[0] = filterRegistry.load(data[0])
+                item.setData(Qt.UserRole, data)
             functionsDict[f"{i+1}." + item.text()] = [
-                item.data(Qt.UserRole)[0],
-                item.data(Qt.UserRole)[1],
-                item.data(Qt.UserRole)[2],
+                data[0],
+                data[1],
+                data[2],
                 item.toolTip(),
             ]
         return functionsDict
@@ -184,16 +213,151 @@ class ExistingFilterGroupsDialog(QDialog):
         self.filterDeleted.emit()
 
 
+class FilterGraphCreationDialog(QDialog):
+    """Dialog Window to create a filter-graph. A filter-graph has one or more named outputs, each one computed by applying a chain of existing filter-groups to the incoming frame. Filter-groups at the beginning of several chains are computed only once. The first output is the primary one (recorded and shown in the main live layer), the others are shown in separate live layers."""
+
+    def __init__(self, parent=None):
+        super(FilterGraphCreationDialog, self).__init__(parent)
+
+        self.setWindowTitle("Create Filter-Graph")
+        self.settings = Settings()
+        self.filterGroupsDict = self.settings.getFilterGroupsDict()
+        self.graphNameLineEdit = QLineEdit()
+        self.outputsTable = QTableWidget(0, 2)
+        self.outputsTable.setHorizontalHeaderLabels(["Output name", "Filter-Groups"])
+        self.outputsTable.horizontalHeader().setSectionResizeMode(
+            QHeaderView.Stretch
+        )
+        self.outputsTable.setToolTip(
+            "Filter-Groups are applied in the given order and separated by commas. Available Filter-Groups: "
+            + ", ".join(self.filterGroupsDict.keys())
+        )
+        self.addOutput_btn = QPushButton("Add output")
+        self.removeOutput_btn = QPushButton("Remove output")
+        self.addOutput_btn.clicked.connect(self.addOutputRow)
+        self.removeOutput_btn.clicked.connect(
+            lambda: self.outputsTable.removeRow(self.outputsTable.currentRow())
+        )
+        self.buttonBox = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        self.buttonBox.accepted.connect(self.saveFilterGraph)
+        self.buttonBox.rejected.connect(self.reject)
+
+        layout = QGridLayout()
+        layout.addWidget(QLabel("Graph Name"), 0, 0)
+        layout.addWidget(self.graphNameLineEdit, 0, 1)
+        layout.addWidget(self.outputsTable, 1, 0, 1, 2)
+        layout.addWidget(self.addOutput_btn, 2, 0)
+        layout.addWidget(self.removeOutput_btn, 2, 1)
+        layout.addWidget(self.buttonBox, 3, 0, 1, 2)
+        self.setLayout(layout)
+        self.addOutputRow()
+
+    def addOutputRow(self):
+        row = self.outputsTable.rowCount()
+        self.outputsTable.insertRow(row)
+        self.outputsTable.setItem(row, 0, QTableWidgetItem(f"output{row + 1}"))
+        self.outputsTable.setItem(row, 1, QTableWidgetItem(""))
+
+    def saveFilterGraph(self):
+        """Validates the outputs of the graph and stores the graph in the settings."""
+        graphName = self.graphNameLineEdit.text()
+        if graphName == "":
+            QMessageBox.warning(self, "Filter-Graph", "Please Name your Filter-Graph.")
+            return
+        if graphName in self.filterGroupsDict:
+            QMessageBox.warning(
+                self, "Filter-Graph", "A Filter-Group with the same name already exists."
+            )
+            return
+        outputs = {}
+        for row in range(self.outputsTable.rowCount()):
+            outputName = self.outputsTable.item(row, 0).text().strip()
+            chain = [
+                groupName.strip()
+                for groupName in self.outputsTable.item(row, 1).text().split(",")
+                if groupName.strip() != ""
+            ]
+            unknownGroups = [
+                groupName for groupName in chain if groupName not in self.filterGroupsDict
+            ]
+            if outputName == "" or outputName in outputs or unknownGroups:
+                QMessageBox.warning(
+                    self,
+                    "Filter-Graph",
+                    f"Invalid output in row {row + 1}. Output names must be unique and Filter-Groups must exist.",
+                )
+                return
+            outputs[outputName] = chain
+        if len(outputs) == 0:
+            QMessageBox.warning(self, "Filter-Graph", "Please add at least one output.")
+            return
+        filterGraphsDict = self.settings.getFilterGraphsDict()
+        filterGraphsDict[graphName] = outputs
+        self.settings.setFilterGraphsDict(filterGraphsDict)
+        self.accept()
+
+
+class BenchmarkResultsDialog(QDialog):
+    """Dialog Window showing the benchmark results of a filter-group, one row for each stage."""
+
+    def __init__(self, result: BenchmarkResult, frameDescription: str, parent=None):
+        super(BenchmarkResultsDialog, self).__init__(parent)
+
+        self.setWindowTitle("Filter-Group Benchmark")
+        self.table = QTableWidget(len(result.stages), 4)
+        self.table.setHorizontalHeaderLabels(
+            ["Stage", "Mean (ms)", "p95 (ms)", "Allocated (MB)"]
+        )
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        for row, stage in enumerate(result.stages):
+            for column, text in enumerate(
+                [
+                    stage.name,
+                    f"{stage.meanTime * 1e3:.3f}",
+                    f"{stage.p95Time * 1e3:.3f}",
+                    f"{stage.allocatedBytes / 2**20:.2f}",
+                ]
+            ):
+                self.table.setItem(row, column, QTableWidgetItem(text))
+        self.summaryLabel = QLabel(
+            f"Input: {frameDescription}\n"
+            f"Total: mean {result.meanTime * 1e3:.3f} ms, p95 {result.p95Time * 1e3:.3f} ms\n"
+            f"Achievable frame rate: {result.fps:.1f} fps"
+        )
+        self.buttonBox = QDialogButtonBox(QDialogButtonBox.Ok)
+        self.buttonBox.accepted.connect(self.accept)
+        layout = QVBoxLayout()
+        layout.addWidget(self.table)
+        layout.addWidget(self.summaryLabel)
+        layout.addWidget(self.buttonBox)
+        self.setLayout(layout)
+
+
 class FilterGroupCreationWidget(QWidget):
     """Main Window containing two lists, one Right List and one Left List. Drag items from the left to the right list to add them to the processing pipeline. The left listed can be searched for items. New items can be loaded from files.The right list can be cleared. By applying the right list, the functions (associated eith the items in the right list) will be put in to a processing pipeline."""
 
     filterAdded = Signal()
 
-    def __init__(self, parent=None):
+    def __init__(
+        self, parent=None, cameraFrameFormats: Dict[str, Tuple[tuple, str]] = None
+    ):
+        """Filter-group creation widget.
+
+        Args:
+            parent (QWidget, optional): parent widget. Defaults to None.
+            cameraFrameFormats (Dict[str, Tuple[tuple, str]], optional): frame shape and data type of each available camera, used to benchmark the filter-group on a synthetic frame. Defaults to None.
+        """
         super(QWidget, self).__init__(parent)
+        self.cameraFrameFormats = cameraFrameFormats or {}
+        self.benchmarkWorker: FunctionWorker = None
         self.settings = Settings()
         self.filterGroupsDict = self.settings.getFilterGroupsDict()
         self.filters_folder = image_filtersPath
+        self.previewCache = StageCache()
+        self.previewImageKey = 0
+        self.previewWorker: FunctionWorker = None
+        self.isPreviewPending = False
         self.initializeMainWindow()
 
         self.loadFiles()
@@ -214,6 +378,7 @@ class FilterGroupCreationWidget(QWidget):
             data[1] = values
             item.setData(Qt.UserRole, data)
             data = item.data(Qt.UserRole)
+            self.schedulePreviewUpdate()
 
         dialog.show()
 
@@ -221,58 +386,100 @@ class FilterGroupCreationWidget(QWidget):
         e.accept()
 
     def loadFiles(self):
-        """load the files from the folder 'image filters' and and load the functions from each file. The functions and parameters are stored as data associated with each item."""
+        """Load the filters of the folder 'image filters' from the filter registry. Modules are not imported,
+        the parameters and descriptions of their filters are read from the registry and stored as data associated with each item.
+        A filter is imported only when the filter-group of the right list is created or previewed."""
         self.leftList.clear()
-        moduleList = []
-        for importer, modname, ispkg in pkgutil.iter_modules(image_filters.__path__):
-            if not modname == "__init__":
-                moduleList.append(
-                    "napari_live_recording.processing_engine.image_filters." + modname
-                )
-        for module in map(importlib.import_module, moduleList):
-            for func in filter(callable, module.__dict__.values()):
-                loadedInformation = [
-                    func,
-                    module.parametersDict,
-                    module.parametersHints,
-                ]
-                item = QListWidgetItem()
-                item.setText(func.__name__)
-                item.setToolTip(module.functionDescription)
-                item.setData(Qt.UserRole, loadedInformation)
-                self.leftList.addItem(item)
+        for info in filterRegistry.scan():
+            item = QListWidgetItem()
+            item.setText(info.name)
+            item.setToolTip(info.functionDescription)
+            item.setData(
+                Qt.UserRole,
+                [info.reference, dict(info.parametersDict), info.parametersHints],
+            )
+            self.leftList.addItem(item)
 
     def clearListWidget(self):
         """Clearing the right list."""
         self.rightList.clear()
         self.filterNameLineEdit.clear()
+        self.setDtypePolicy(DtypePolicy())
 
     def returnRightListContent(self, isPreview: bool = False):
-        """Use the items in the right list in their current order and create a nested function from them. For creating the nested function 'pims' used to achieve lazy evaluation."""
+        """Use the items in the right list in their current order to create a filter-group. If `isPreview` is set, the filter-group is returned to be applied to the preview image, otherwise it is stored in the settings."""
         functionsDict = self.rightList.convertItemListToDict()
         filterName = self.filterNameLineEdit.text()
+        dtypePolicy = self.currentDtypePolicy()
+        if dtypePolicy != DtypePolicy():
+            functionsDict[DTYPE_POLICY_KEY] = dtypePolicy
 
         if isPreview:
-            composedFunction = createPipelineFilter(functionsDict)
-            return composedFunction
+            return functionsDict
         else:
             if filterName == "":
                 self.alertWindow("Please Name your Filter-Group.")
             else:
                 self.filterGroupsDict = self.settings.getFilterGroupsDict()
-                self.filterGroupsDict[filterName] = functionsDict
+                try:
+                    self.filterGroupsDict[filterName] = functionsDict
+                except ValueError as e:
+                    self.alertWindow(str(e))
+                    return
                 self.settings.setFilterGroupsDict(self.filterGroupsDict)
                 self.filterAdded.emit()
 
-    def updatePreviewImage(self):
-        try:
-            currentFilterGroup = self.returnRightListContent(True)
-            newImage = currentFilterGroup(self.image)
-            self.imageView.setImage(newImage)
-        except Exception as e:
-            self.alertWindow(str(e))
+    def currentDtypePolicy(self) -> DtypePolicy:
+        """Returns the data type policy selected for the current filter-group."""
+        workingDtype = self.workingDtypeComboBox.currentText()
+        outputDtype = self.outputDtypeComboBox.currentText()
+        return DtypePolicy(
+            workingDtype=None if workingDtype == "Input" else workingDtype,
+            outputDtype=None if outputDtype == "Input" else outputDtype,
+        )
+
+    def setDtypePolicy(self, dtypePolicy: DtypePolicy):
+        self.workingDtypeComboBox.setCurrentText(dtypePolicy.workingDtype or "Input")
+        self.outputDtypeComboBox.setCurrentText(dtypePolicy.outputDtype or "Input")
+
+    def schedulePreviewUpdate(self):
+        """Restarts the debounce timer of the preview, so that the preview is refreshed
+        only once the filter-group has not been edited for PREVIEW_DEBOUNCE_MS."""
+        if self.autoRefreshCheckBox.isChecked():
+            self.previewTimer.start()
+
+    def updatePreviewImage(self, isManual: bool = True):
+        """Applies the current filter-group to the preview image in a background worker.
+        Stage outputs are cached, so only the stages following the last edited one are recomputed.
+        If a preview is already being computed, a new one is started as soon as it finishes."""
+        self.previewTimer.stop()
+        if self.previewWorker is not None:
+            self.isPreviewPending = True
+            return
+
+        @thread_worker(worker_class=FunctionWorker, start_thread=False)
+        def previewWorker(image, imageKey, filters):
+            return evaluatePreview(image, imageKey, filters, self.previewCache)
+
+        def previewErrored(e):
+            if isManual:
+                self.alertWindow(str(e))
             print("Error", e)
 
+        self.previewWorker = previewWorker(
+            self.image, self.previewImageKey, self.returnRightListContent(True)
+        )
+        self.previewWorker.returned.connect(self.imageView.setImage)
+        self.previewWorker.errored.connect(previewErrored)
+        self.previewWorker.finished.connect(self.previewWorkerFinished)
+        self.previewWorker.start()
+
+    def previewWorkerFinished(self):
+        self.previewWorker = None
+        if self.isPreviewPending:
+            self.isPreviewPending = False
+            self.updatePreviewImage(isManual=False)
+
     def alertWindow(self, text):
         dialog = QMessageBox()
         dialog.setText("Current Filters not applicable:  " + text)
@@ -308,21 +515,30 @@ class FilterGroupCreationWidget(QWidget):
             item = existingFilterGroupsDialog.listWidget.currentItem()
             text = item.text()
             functionsDict = self.filterGroupsDict[text]
-            self.rightList.convertFunctionsDictToItemList(functionsDict)
+            self.rightList.convertFunctionsDictToItemList(
+                getFilterStages(functionsDict)
+            )
+            self.setDtypePolicy(getDtypePolicy(functionsDict))
         else:
             pass
         existingFilterGroupsDialog.show()
 
+    def showFilterGraphCreation(self):
+        filterGraphCreationDialog = FilterGraphCreationDialog()
+        if filterGraphCreationDialog.exec():
+            self.filterAdded.emit()
+
     def loadPreviewImage(self, isDefault=False):
         """Method for loading the preview image. Either the default image or a selected image from a folder."""
         if isDefault:
-            if self.settings.settings.contains("Preview Image"):
-                self.image = self.settings.getSetting("Preview Image")
+            previewImage = self.settings.getPreviewImage()
+            if previewImage is not None:
+                self.image = previewImage
             else:
                 image_ = cv.imread(defaultImagePath)
                 image_ = cv.transpose(image_)
                 self.image = image_
-            self.imageView.setImage(self.image)
+            self.previewImageChanged()
         else:
             try:
                 filepath, _ = QFileDialog.getOpenFileName(
@@ -336,11 +552,64 @@ class FilterGroupCreationWidget(QWidget):
                 image_ = cv.transpose(image_)
                 image_ = cv.cvtColor(image_, cv.COLOR_BGR2RGB)
                 self.image = image_
-                self.settings.setSetting("Preview Image", self.image)
-                self.imageView.setImage(self.image)
+                self.settings.setPreviewImage(self.image)
+                self.previewImageChanged()
             except:
                 pass
 
+    def benchmarkSourceChanged(self, source: str):
+        """Selects the data type of the chosen camera for the synthetic benchmark frame."""
+        isCamera = source in self.cameraFrameFormats
+        self.benchmarkDtypeComboBox.setEnabled(isCamera)
+        if isCamera:
+            self.benchmarkDtypeComboBox.setCurrentText(self.cameraFrameFormats[source][1])
+
+    def runBenchmark(self):
+        """Runs the current filter-group several times on the preview image or on a synthetic frame
+        with the shape and data type of the selected camera, then shows the time spent in each stage."""
+        if self.benchmarkWorker is not None:
+            return
+        source = self.benchmarkSourceComboBox.currentText()
+        if source in self.cameraFrameFormats:
+            shape = self.cameraFrameFormats[source][0]
+            dtype = self.benchmarkDtypeComboBox.currentText()
+            frame = createSyntheticFrame(shape, dtype)
+            frameDescription = f"synthetic frame {shape} {dtype} ({source})"
+        else:
+            frame = self.image
+            frameDescription = f"preview image {frame.shape} {frame.dtype}"
+
+        @thread_worker(worker_class=FunctionWorker, start_thread=False)
+        def benchmarkWorker(filters, frame, iterations):
+            return benchmarkFilterGroup(filters, frame, iterations)
+
+        def benchmarkFinished():
+            self.benchmarkWorker = None
+            self.benchmark_btn.setEnabled(True)
+
+        def showResults(result: BenchmarkResult):
+            dialog = BenchmarkResultsDialog(result, frameDescription, self)
+            dialog.exec()
+
+        self.benchmarkWorker = benchmarkWorker(
+            self.returnRightListContent(True),
+            frame,
+            self.benchmarkIterationsSpinBox.value(),
+        )
+        self.benchmarkWorker.returned.connect(showResults)
+        self.benchmarkWorker.errored.connect(lambda e: self.alertWindow(str(e)))
+        self.benchmarkWorker.finished.connect(benchmarkFinished)
+        self.benchmark_btn.setEnabled(False)
+        self.benchmarkWorker.start()
+
+    def previewImageChanged(self):
+        """Drops the cached stage outputs of the previous preview image and shows the new one."""
+        self.previewCache.clear()
+        self.previewImageKey += 1
+        self.imageView.setImage(self.image)
+        if self.rightList.count() > 0:
+            self.schedulePreviewUpdate()
+
     def initializeMainWindow(self):
         """Creates the widgets and the layouts of the MainWindow"""
         self.setAcceptDrops(True)
@@ -375,15 +644,44 @@ class FilterGroupCreationWidget(QWidget):
         self.filterNameLabel = QLabel("Filter Name")
         self.loadExistingFilter_btn = QPushButton("Show Exisiting Filter-Groups")
         self.loadExistingFilter_btn.clicked.connect(self.showExistingFilterGroups)
+        self.createFilterGraph_btn = QPushButton("Create Filter-Graph")
+        self.createFilterGraph_btn.clicked.connect(self.showFilterGraphCreation)
+        self.workingDtypeLabel = QLabel("Working dtype")
+        self.workingDtypeComboBox = QComboBox()
+        self.workingDtypeComboBox.setToolTip(
+            "Data type of the frames entering the first filter. 'Input' keeps the camera data type."
+        )
+        self.outputDtypeLabel = QLabel("Output dtype")
+        self.outputDtypeComboBox = QComboBox()
+        self.outputDtypeComboBox.setToolTip(
+            "Data type of the processed frames (saturating cast). 'Input' keeps the data type returned by the last filter."
+        )
+        dtypeNames = [dtype if dtype else "Input" for dtype in AVAILABLE_DTYPES]
+        self.workingDtypeComboBox.addItems(dtypeNames)
+        self.outputDtypeComboBox.addItems(dtypeNames)
         self.clear_btn.clicked.connect(self.clearListWidget)
         self.createFilter_btn.clicked.connect(self.returnRightListContent)
         self.rightList.itemDoubleClicked.connect(self.openParameterDialogWindow)
+        self.rightList.model().rowsInserted.connect(self.schedulePreviewUpdate)
+        self.rightList.model().rowsRemoved.connect(self.schedulePreviewUpdate)
+        self.rightList.model().rowsMoved.connect(self.schedulePreviewUpdate)
+        self.workingDtypeComboBox.currentTextChanged.connect(
+            self.schedulePreviewUpdate
+        )
+        self.outputDtypeComboBox.currentTextChanged.connect(
+            self.schedulePreviewUpdate
+        )
         self.rightContainerLayout.addWidget(self.loadExistingFilter_btn, 0, 0, 1, 2)
         self.rightContainerLayout.addWidget(self.rightList, 1, 0, 1, 2)
         self.rightContainerLayout.addWidget(self.clear_btn, 3, 0)
         self.rightContainerLayout.addWidget(self.createFilter_btn, 3, 1)
         self.rightContainerLayout.addWidget(self.filterNameLabel, 2, 0)
         self.rightContainerLayout.addWidget(self.filterNameLineEdit, 2, 1)
+        self.rightContainerLayout.addWidget(self.workingDtypeLabel, 4, 0)
+        self.rightContainerLayout.addWidget(self.workingDtypeComboBox, 4, 1)
+        self.rightContainerLayout.addWidget(self.outputDtypeLabel, 5, 0)
+        self.rightContainerLayout.addWidget(self.outputDtypeComboBox, 5, 1)
+        self.rightContainerLayout.addWidget(self.createFilterGraph_btn, 6, 0, 1, 2)
 
         # right Column
         self.previewContainer = QGroupBox()
@@ -392,7 +690,19 @@ class FilterGroupCreationWidget(QWidget):
         self.refresh_btn = QPushButton("Refresh")
         self.loadNewPreviewImage_btn = QPushButton("Load new Image")
 
-        self.refresh_btn.clicked.connect(self.updatePreviewImage)
+        self.autoRefreshCheckBox = QCheckBox("Auto refresh")
+        self.autoRefreshCheckBox.setChecked(True)
+        self.autoRefreshCheckBox.setToolTip(
+            "Refresh the preview automatically when the filter-group is edited."
+        )
+        self.previewTimer = QTimer(self)
+        self.previewTimer.setSingleShot(True)
+        self.previewTimer.setInterval(PREVIEW_DEBOUNCE_MS)
+        self.previewTimer.timeout.connect(
+            lambda: self.updatePreviewImage(isManual=False)
+        )
+
+        self.refresh_btn.clicked.connect(lambda: self.updatePreviewImage())
         self.loadNewPreviewImage_btn.clicked.connect(self.loadPreviewImage)
 
         self.imageView = ImageView(parent=self.previewContainer)
@@ -402,6 +712,33 @@ class FilterGroupCreationWidget(QWidget):
         self.previewContainerLayout.addWidget(self.imageView, 0, 0, 1, 2)
         self.previewContainerLayout.addWidget(self.refresh_btn, 1, 0, 1, 1)
         self.previewContainerLayout.addWidget(self.loadNewPreviewImage_btn, 1, 1, 1, 1)
+        self.previewContainerLayout.addWidget(self.autoRefreshCheckBox, 2, 0, 1, 2)
+
+        self.benchmarkSourceComboBox = QComboBox()
+        self.benchmarkSourceComboBox.addItem("Preview image")
+        self.benchmarkSourceComboBox.addItems(list(self.cameraFrameFormats.keys()))
+        self.benchmarkSourceComboBox.setToolTip(
+            "Input of the benchmark: the preview image or a synthetic frame with the ROI of the selected camera."
+        )
+        self.benchmarkDtypeComboBox = QComboBox()
+        self.benchmarkDtypeComboBox.addItems(
+            [dtype for dtype in AVAILABLE_DTYPES if dtype is not None]
+        )
+        self.benchmarkDtypeComboBox.setToolTip("Data type of the synthetic frame.")
+        self.benchmarkDtypeComboBox.setEnabled(False)
+        self.benchmarkIterationsSpinBox = QSpinBox()
+        self.benchmarkIterationsSpinBox.setRange(1, 10000)
+        self.benchmarkIterationsSpinBox.setValue(50)
+        self.benchmarkIterationsSpinBox.setPrefix("Iterations: ")
+        self.benchmark_btn = QPushButton("Benchmark")
+        self.benchmarkSourceComboBox.currentTextChanged.connect(
+            self.benchmarkSourceChanged
+        )
+        self.benchmark_btn.clicked.connect(self.runBenchmark)
+        self.previewContainerLayout.addWidget(self.benchmarkSourceComboBox, 3, 0)
+        self.previewContainerLayout.addWidget(self.benchmarkDtypeComboBox, 3, 1)
+        self.previewContainerLayout.addWidget(self.benchmarkIterationsSpinBox, 4, 0)
+        self.previewContainerLayout.addWidget(self.benchmark_btn, 4, 1)
 
         # Combining all three columns
         layout = QGridLayout(self)
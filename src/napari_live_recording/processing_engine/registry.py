@@ -0,0 +1,205 @@
+import ast
+import importlib
+import json
+import os
+from dataclasses import dataclass
+from threading import Lock
+from typing import Callable, Dict, List
+from napari_live_recording.common import filterIndexFilePath
+from napari_live_recording.processing_engine.image_filters import image_filtersPath
+
+# name of the module variable listing the filters exported by a module
+EXPORTS_NAME = "exportedFilters"
+
+# module variables read without importing the module
+METADATA_NAMES = ["parametersDict", "parametersHints", "functionDescription"]
+
+
+@dataclass(frozen=True)
+class FilterInfo:
+    """Dataclass for the metadata of a filter, read without importing its module."""
+
+    moduleName: str
+    """Full name of the module defining the filter.
+    """
+
+    name: str
+    """Name of the filter function (or temporal filter class) in the module.
+    """
+
+    parametersDict: dict
+    """Default values of the filter parameters.
+    """
+
+    parametersHints: dict
+    """Description of each filter parameter.
+    """
+
+    functionDescription: str
+    """Description of the filter.
+    """
+
+    @property
+    def reference(self) -> str:
+        """Returns the `module:function` reference of the filter."""
+        return f"{self.moduleName}:{self.name}"
+
+
+def readModuleMetadata(filePath: str) -> Dict[str, str]:
+    """Parses a filter module and returns the source of the literals assigned to
+    its exports list and metadata variables. The module is not imported.
+    Modules without an exports list export the functions and classes they define
+    (names imported from other modules are never exported)."""
+    with open(filePath, "r", encoding="utf-8") as file:
+        source = file.read()
+    tree = ast.parse(source, filename=filePath)
+    metadata = {}
+    definitions = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            definitions.append(node.name)
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name) and target.id in [
+                    EXPORTS_NAME,
+                    *METADATA_NAMES,
+                ]:
+                    metadata[target.id] = ast.get_source_segment(source, node.value)
+    if EXPORTS_NAME not in metadata:
+        metadata[EXPORTS_NAME] = repr(definitions)
+    return metadata
+
+
+class FilterRegistry:
+    def __init__(
+        self,
+        folder: str = image_filtersPath,
+        package: str = "napari_live_recording.processing_engine.image_filters",
+        indexFilePath: str = filterIndexFilePath,
+    ) -> None:
+        """Registry of the filters available in the filters folder.
+        The metadata of each module is extracted by parsing its source and is cached,
+        in memory and in an index file, together with the modification time of the module;
+        a module is parsed again only when it changes, and imported only when one of its filters is used.
+
+        Args:
+            folder (str, optional): folder of the filter modules. Defaults to the image_filters folder.
+            package (str, optional): package of the filter modules. Defaults to "napari_live_recording.processing_engine.image_filters".
+            indexFilePath (str, optional): path of the metadata index file. Defaults to filterIndexFilePath.
+        """
+        self.folder = folder
+        self.package = package
+        self.indexFilePath = indexFilePath
+        self._index: Dict[str, dict] = None
+        self._filters: Dict[str, FilterInfo] = {}
+        self._loadedModules: Dict[str, float] = {}
+        self._lock = Lock()
+
+    def _readIndex(self) -> Dict[str, dict]:
+        try:
+            with open(self.indexFilePath, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _writeIndex(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.indexFilePath), exist_ok=True)
+            with open(self.indexFilePath, "w", encoding="utf-8") as file:
+                json.dump(self._index, file, indent=1)
+        except OSError:
+            # the index is only a cache, the registry works without it
+            pass
+
+    def scan(self) -> List[FilterInfo]:
+        """Updates the registry with the modules of the filters folder and returns the available filters.
+        Only new or modified modules are parsed."""
+        with self._lock:
+            if self._index is None:
+                self._index = self._readIndex()
+            changed = False
+            found = set()
+            for entry in sorted(os.scandir(self.folder), key=lambda entry: entry.name):
+                moduleName, extension = os.path.splitext(entry.name)
+                if (
+                    not entry.is_file()
+                    or extension != ".py"
+                    or moduleName.startswith("_")
+                ):
+                    continue
+                found.add(moduleName)
+                mtime = entry.stat().st_mtime
+                cached = self._index.get(moduleName)
+                if cached is None or cached["mtime"] != mtime:
+                    try:
+                        metadata = readModuleMetadata(entry.path)
+                    except (OSError, SyntaxError, ValueError) as e:
+                        print(f"Could not read filter module {entry.name}: {e}")
+                        continue
+                    self._index[moduleName] = {"mtime": mtime, "metadata": metadata}
+                    changed = True
+            for moduleName in set(self._index.keys()) - found:
+                self._index.pop(moduleName)
+                changed = True
+            if changed:
+                self._writeIndex()
+
+            self._filters = {}
+            for moduleName, cached in self._index.items():
+                for info in self._createFilterInfos(moduleName, cached["metadata"]):
+                    self._filters[info.reference] = info
+            return list(self._filters.values())
+
+    def _createFilterInfos(self, moduleName: str, metadata: Dict[str, str]) -> List[FilterInfo]:
+        try:
+            values = {key: ast.literal_eval(value) for key, value in metadata.items()}
+        except (ValueError, SyntaxError):
+            # metadata which is not a literal requires importing the module
+            module = importlib.import_module(f"{self.package}.{moduleName}")
+            values = {
+                key: getattr(module, key)
+                for key in [EXPORTS_NAME, *METADATA_NAMES]
+                if hasattr(module, key)
+            }
+        return [
+            FilterInfo(
+                moduleName=f"{self.package}.{moduleName}",
+                name=name,
+                parametersDict=values.get("parametersDict", {}),
+                parametersHints=values.get("parametersHints", {}),
+                functionDescription=values.get("functionDescription", ""),
+            )
+            for name in values.get(EXPORTS_NAME, [])
+        ]
+
+    def filterInfo(self, reference: str) -> FilterInfo:
+        """Returns the metadata of a filter from its `module:function` reference."""
+        if reference not in self._filters:
+            self.scan()
+        return self._filters[reference]
+
+    def load(self, reference: str) -> Callable:
+        """Imports the module of a filter, if not yet imported, and returns the filter.
+        Modules modified after being imported are reloaded.
+
+        Args:
+            reference (str): `module:function` reference of the filter.
+
+        Returns:
+            Callable: the filter function or temporal filter class.
+        """
+        moduleName, name = reference.split(":")
+        module = importlib.import_module(moduleName)
+        filePath = getattr(module, "__file__", None)
+        if filePath is not None:
+            mtime = os.path.getmtime(filePath)
+            previousMtime = self._loadedModules.setdefault(moduleName, mtime)
+            if previousMtime != mtime:
+                module = importlib.reload(module)
+                self._loadedModules[moduleName] = mtime
+        return getattr(module, name)
+
+
+# registry shared by all the filter creation windows,
+# so that the metadata is parsed only once per session
+filterRegistry = FilterRegistry()
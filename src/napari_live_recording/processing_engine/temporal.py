@@ -0,0 +1,227 @@
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import Tuple, Union
+
+
+def accumulatorDtype(dtype, count: int) -> np.dtype:
+    """Returns the smallest data type which can hold the sum of `count` values
+    of the given data type without overflowing. Floating point types are kept."""
+    dtype = np.dtype(dtype)
+    if dtype.kind not in "ui":
+        return dtype
+    requiredBits = dtype.itemsize * 8 + int(np.ceil(np.log2(count)))
+    for size in (1, 2, 4, 8):
+        if size * 8 >= requiredBits:
+            return np.dtype(dtype.kind + str(size))
+    return np.dtype(dtype.kind + "8")
+
+
+class RollingAccumulator:
+    def __init__(self, windowSize: int, dtype: Union[str, np.dtype] = np.float32) -> None:
+        """Preallocated ring of the last K frames with a running sum.
+        Pushing a new frame updates the sum in constant time with respect to the window size,
+        as only the incoming frame is added and the outgoing frame is subtracted.
+        With an integer working data type, the sum is kept in a data type wide enough
+        to hold the sum of K frames without overflowing (see `accumulatorDtype`).
+
+        Args:
+            windowSize (int): number of frames (K) kept in the ring.
+            dtype (Union[str, np.dtype], optional): working data type of the ring. Defaults to np.float32.
+        """
+        if windowSize < 1:
+            raise ValueError("Window size must be at least 1")
+        self.windowSize = int(windowSize)
+        self.dtype = np.dtype(dtype)
+        self.sumDtype = accumulatorDtype(self.dtype, self.windowSize)
+        self.ring: np.ndarray = None
+        self.sum: np.ndarray = None
+        self._index = 0
+        self._count = 0
+
+    @property
+    def frameShape(self) -> Tuple[int, ...]:
+        """Shape of the frames currently accumulated, or an empty tuple if not yet allocated."""
+        return self.ring.shape[1:] if self.ring is not None else ()
+
+    @property
+    def count(self) -> int:
+        """Number of valid frames currently stored in the ring."""
+        return self._count
+
+    @property
+    def full(self) -> bool:
+        return self._count == self.windowSize
+
+    def allocate(self, frameShape: Tuple[int, ...]) -> None:
+        """Allocates the ring and the running sum for the given frame shape and resets the state."""
+        self.ring = np.zeros((self.windowSize, *frameShape), dtype=self.dtype)
+        self.sum = np.zeros(frameShape, dtype=self.sumDtype)
+        self._index = 0
+        self._count = 0
+
+    def reset(self) -> None:
+        """Clears the accumulated state while keeping the allocated memory."""
+        if self.ring is not None:
+            self.ring.fill(0)
+            self.sum.fill(0)
+        self._index = 0
+        self._count = 0
+
+    def push(self, frame: np.ndarray) -> None:
+        """Adds a new frame to the ring, evicting the oldest one when the ring is full.
+        The ring is (re)allocated automatically if the frame shape changes (i.e. after an ROI change).
+        """
+        if self.ring is None or frame.shape != self.frameShape:
+            self.allocate(frame.shape)
+        slot = self.ring[self._index]
+        if self.full:
+            np.subtract(self.sum, slot, out=self.sum)
+        np.copyto(slot, frame, casting="unsafe")
+        np.add(self.sum, slot, out=self.sum)
+        self._index = (self._index + 1) % self.windowSize
+        self._count = min(self._count + 1, self.windowSize)
+
+        # floating point sums drift when adding and subtracting for a long time;
+        # each time the ring wraps around the sum is rebuilt from the stored frames,
+        # which keeps the cost amortized constant per frame
+        if self._index == 0 and self.dtype.kind == "f":
+            np.sum(self.ring, axis=0, out=self.sum)
+
+    def oldest(self) -> np.ndarray:
+        """Returns a view of the oldest frame stored in the ring."""
+        if self.full:
+            return self.ring[self._index]
+        return self.ring[0]
+
+    def newest(self) -> np.ndarray:
+        """Returns a view of the newest frame stored in the ring."""
+        return self.ring[(self._index - 1) % self.windowSize]
+
+    def valid(self) -> np.ndarray:
+        """Returns a view of the valid frames stored in the ring (unordered)."""
+        return self.ring[: self._count] if not self.full else self.ring
+
+
+class TemporalFilter(ABC):
+    def __init__(self, windowSize: int = 1, workingDtype: str = "float32") -> None:
+        """Base class for stateful filters operating on a stream of frames.
+        Differently from per-frame filters, a temporal filter is instantiated once
+        per processing run and keeps its own preallocated state across calls.
+        The state is reset automatically when the frame shape changes (i.e. when the ROI is changed)
+        and a new instance is created each time the processing is (re)started.
+
+        Args:
+            windowSize (int, optional): number of frames kept by the filter. Defaults to 1.
+            workingDtype (str, optional): data type of the internal state. Defaults to "float32".
+        """
+        self.accumulator = RollingAccumulator(windowSize, workingDtype)
+        self._output: np.ndarray = None
+
+    def reset(self) -> None:
+        """Clears the filter state."""
+        self.accumulator.reset()
+
+    def _outputBuffer(self) -> np.ndarray:
+        """Returns a preallocated output array with the same shape and type of the accumulator."""
+        if self._output is None or self._output.shape != self.accumulator.frameShape:
+            self._output = np.empty(
+                self.accumulator.frameShape, dtype=self.accumulator.dtype
+            )
+        return self._output
+
+    def __call__(self, frame: np.ndarray) -> np.ndarray:
+        # the filter must return a new array each time, as the output
+        # is stored in the frame buffers and must not be modified afterwards
+        return np.copy(self.update(frame))
+
+    @abstractmethod
+    def update(self, frame: np.ndarray) -> np.ndarray:
+        """Updates the filter state with a new frame and returns the filter output."""
+        raise NotImplementedError()
+
+
+class RollingMean(TemporalFilter):
+    """Mean of the last K frames, computed from a running sum."""
+
+    def __init__(self, windowSize: int = 10, workingDtype: str = "float32") -> None:
+        super().__init__(windowSize, workingDtype)
+
+    def update(self, frame: np.ndarray) -> np.ndarray:
+        self.accumulator.push(frame)
+        return np.divide(
+            self.accumulator.sum,
+            self.accumulator.count,
+            out=self._outputBuffer(),
+            casting="unsafe",
+        )
+
+
+class RollingMax(TemporalFilter):
+    """Pixel-wise maximum of the last K frames. The maximum is not invertible,
+    so the output is reduced over the stored frames at each call."""
+
+    def __init__(self, windowSize: int = 10, workingDtype: str = "float32") -> None:
+        super().__init__(windowSize, workingDtype)
+
+    def update(self, frame: np.ndarray) -> np.ndarray:
+        self.accumulator.push(frame)
+        return np.max(self.accumulator.valid(), axis=0, out=self._outputBuffer())
+
+
+class FrameDifference(TemporalFilter):
+    """Difference between the current frame and the frame acquired K frames before."""
+
+    def __init__(self, lag: int = 1, workingDtype: str = "float32") -> None:
+        # the ring holds the current frame as well as the K previous ones
+        super().__init__(lag + 1, workingDtype)
+
+    def update(self, frame: np.ndarray) -> np.ndarray:
+        self.accumulator.push(frame)
+        return np.subtract(
+            self.accumulator.newest(),
+            self.accumulator.oldest(),
+            out=self._outputBuffer(),
+        )
+
+
+class RunningBackground(TemporalFilter):
+    """Exponential running estimate of the background. If `subtract` is set,
+    the background is removed from the current frame, otherwise the background itself is returned."""
+
+    def __init__(
+        self, alpha: float = 0.05, subtract: bool = True, workingDtype: str = "float32"
+    ) -> None:
+        super().__init__(1, workingDtype)
+        self.alpha = alpha
+        self.subtract = subtract
+        self._initialized = False
+
+    def reset(self) -> None:
+        super().reset()
+        self._initialized = False
+
+    def update(self, frame: np.ndarray) -> np.ndarray:
+        accumulator = self.accumulator
+        if accumulator.ring is None or frame.shape != accumulator.frameShape:
+            accumulator.allocate(frame.shape)
+            self._initialized = False
+        background = accumulator.sum
+        if not self._initialized:
+            np.copyto(background, frame, casting="unsafe")
+            self._initialized = True
+        else:
+            # background += alpha * (frame - background)
+            delta = self._outputBuffer()
+            np.subtract(frame, background, out=delta, casting="unsafe")
+            delta *= self.alpha
+            background += delta
+        if self.subtract:
+            return np.subtract(
+                frame, background, out=self._outputBuffer(), casting="unsafe"
+            )
+        return background
+
+
+def isTemporalFilter(filter) -> bool:
+    """Returns True if the input is a stateful temporal filter class."""
+    return isinstance(filter, type) and issubclass(filter, TemporalFilter)
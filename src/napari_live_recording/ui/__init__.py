@@ -5,17 +5,25 @@ from qtpy.QtWidgets import (
     QSpacerItem,
     QSizePolicy,
 )
-from typing import Dict, TYPE_CHECKING
+from typing import Dict, Tuple, Union, TYPE_CHECKING
 from napari_live_recording.common import (
     THIRTY_FPS,
+    REDUCED_DISPLAY_RATE_FACTOR,
     WriterInfo,
     Settings,
+    BinningMode,
+    BackpressurePolicy,
+    RecordingMode,
 )
 from napari_live_recording.control.devices import devicesDict, ICamera
+from napari_live_recording.control.regions import regionsFromShapes
+from napari_live_recording.processing_engine.graph import FilterGraph
+from napari.utils.notifications import show_warning
 from napari_live_recording.ui.widgets import (
     CameraTab,
     RecordHandling,
     CameraSelection,
+    StatisticsPlot,
 )
 import numpy as np
 
@@ -35,6 +43,7 @@ class ViewerAnchor:
         self.mainController = mainController
         self.settings = Settings()
         self.filterGroupsDict = self.settings.getFilterGroupsDict()
+        self.filterGraphsDict = self.settings.getFilterGraphsDict()
         self.mainLayout = QVBoxLayout()
         self.selectionWidget = CameraSelection()
         self.selectionWidget.setDeviceSelectionWidget(list(devicesDict.keys()))
@@ -51,6 +60,9 @@ class ViewerAnchor:
         self.recordingWidget.signals["snapRequested"].connect(self.snap)
         self.recordingWidget.signals["liveRequested"].connect(self.live)
         self.recordingWidget.signals["recordRequested"].connect(self.recordAndProcess)
+        self.recordingWidget.signals["preflightRequested"].connect(
+            self.checkRecordingCapacity
+        )
 
         self.mainController.newMaxTimePoint.connect(
             self.recordingWidget.recordProgress.setMaximum
@@ -59,13 +71,33 @@ class ViewerAnchor:
             self.recordingWidget.recordProgress.setValue
         )
         self.recordingWidget.filterCreated.connect(self.refreshAvailableFilters)
+        self.recordingWidget.cameraFrameFormats = self.cameraFrameFormats
         self.mainController.recordFinished.connect(
             lambda: self.recordingWidget.record.setChecked(False)
         )
         self.mainController.cameraDeleted.connect(self.recordingWidget.live.setChecked)
+        self.statisticsPlots: Dict[str, StatisticsPlot] = {}
+        self.mainController.recordFinished.connect(self.stopStatisticsPlots)
+        self.mainController.writerBehind.connect(self.handleWriterBehind)
+        self.mainController.writerCaughtUp.connect(self.handleWriterCaughtUp)
+        self.mainController.recordFinished.connect(
+            lambda: self.setDisplayRateReduced(False)
+        )
+        self.isDisplayRateReduced = False
+        self.mainController.capacityChecked.connect(
+            self.recordingWidget.setRecordingCapacity
+        )
+        self.mainController.capacityCheckFailed.connect(
+            self.recordingWidget.setRecordingCapacityError
+        )
         self.liveTimer = QTimer()
         self.liveTimer.timeout.connect(self._updateLiveLayers)
         self.liveTimer.setInterval(THIRTY_FPS)
+        # memory usage of the raw buffers, also shown while recording
+        self.bufferStatusTimer = QTimer()
+        self.bufferStatusTimer.timeout.connect(self._updateBufferStatus)
+        self.bufferStatusTimer.setInterval(1000)
+        self.bufferStatusTimer.start()
         self.isFirstTab = True
         self.mainLayout.addItem(verticalSpacer)
 
@@ -82,10 +114,54 @@ class ViewerAnchor:
         camera: ICamera = devicesDict[interface](name, idx)
         cameraKey = f"{camera.name}:{camera.__class__.__name__}:{str(idx)}"
         self.filterGroupsDict = self.settings.getFilterGroupsDict()
-        tab = CameraTab(camera, self.filterGroupsDict, interface)
+        self.filterGraphsDict = self.settings.getFilterGraphsDict()
+        tab = CameraTab(
+            camera, {**self.filterGroupsDict, **self.filterGraphsDict}, interface
+        )
 
         self.mainController.addCamera(cameraKey, camera)
         tab.deleteButton.clicked.connect(lambda: self.deleteCameraUI(cameraKey))
+        tab.calibrationWidget.signals["captureRequested"].connect(
+            lambda frameType, numberOfFrames: self.captureCalibrationFrame(
+                cameraKey, frameType, numberOfFrames
+            )
+        )
+        tab.calibrationWidget.signals["clearRequested"].connect(
+            lambda: self.clearCalibration(cameraKey)
+        )
+        tab.calibrationWidget.signals["optionsChanged"].connect(
+            lambda enabled, fixedPoint: self.mainController.setCalibrationOptions(
+                cameraKey, enabled, fixedPoint
+            )
+        )
+        tab.binningWidget.signals["binningChanged"].connect(
+            lambda factor, mode: self.changeBinning(cameraKey, factor, mode)
+        )
+        tab.bufferWidget.signals["compressionChanged"].connect(
+            lambda codec: self.mainController.setBufferCompression(cameraKey, codec)
+        )
+        tab.regionsWidget.signals["drawRequested"].connect(
+            lambda: self.drawRegions(cameraKey)
+        )
+        tab.regionsWidget.signals["applyRequested"].connect(
+            lambda: self.applyRegions(cameraKey)
+        )
+        tab.regionsWidget.signals["clearRequested"].connect(
+            lambda: self.clearRegions(cameraKey)
+        )
+        # calibration masters and regions are not valid anymore after an ROI change
+        tab.roiWidget.signals["changeROIRequested"].connect(
+            lambda _: self.clearCalibration(cameraKey)
+        )
+        tab.roiWidget.signals["fullROIRequested"].connect(
+            lambda _: self.clearCalibration(cameraKey)
+        )
+        tab.roiWidget.signals["changeROIRequested"].connect(
+            lambda _: self.clearRegions(cameraKey)
+        )
+        tab.roiWidget.signals["fullROIRequested"].connect(
+            lambda _: self.clearRegions(cameraKey)
+        )
         self.cameraWidgetGroups[cameraKey] = tab
         self.tabs.addTab(tab.widget, cameraKey)
 
@@ -99,14 +175,91 @@ class ViewerAnchor:
             self.isFirstTab = True
         del self.cameraWidgetGroups[cameraKey]
 
+    def captureCalibrationFrame(
+        self, cameraKey: str, frameType: str, numberOfFrames: int
+    ) -> None:
+        self.mainController.captureCalibrationFrame(cameraKey, frameType, numberOfFrames)
+        self.cameraWidgetGroups[cameraKey].calibrationWidget.setStatus(
+            list(self.mainController.calibrationMasters[cameraKey].keys())
+        )
+
+    def changeBinning(self, cameraKey: str, factor: int, mode: BinningMode) -> None:
+        self.mainController.setBinning(cameraKey, factor, mode)
+        # calibration masters and regions refer to the binned frames
+        self.clearCalibration(cameraKey)
+        self.clearRegions(cameraKey)
+
+    def clearCalibration(self, cameraKey: str) -> None:
+        self.mainController.clearCalibration(cameraKey)
+        self.cameraWidgetGroups[cameraKey].calibrationWidget.setStatus([])
+
+    def drawRegions(self, cameraKey: str) -> None:
+        """Adds (or selects) the Shapes layer in which the regions to record for a camera are drawn."""
+        layerKey = f"Regions {cameraKey}"
+        if layerKey not in self.viewer.layers:
+            self.viewer.add_shapes(
+                name=layerKey,
+                ndim=2,
+                shape_type="rectangle",
+                edge_color="yellow",
+                face_color="transparent",
+            )
+        layer = self.viewer.layers[layerKey]
+        self.viewer.layers.selection.active = layer
+        layer.mode = "add_rectangle"
+
+    def applyRegions(self, cameraKey: str) -> None:
+        """Records only the rectangles drawn in the regions layer of a camera."""
+        layerKey = f"Regions {cameraKey}"
+        if layerKey not in self.viewer.layers:
+            return
+        frameShape, _ = self.cameraFrameFormats()[cameraKey]
+        regions = regionsFromShapes(self.viewer.layers[layerKey].data, frameShape)
+        self.mainController.setRegions(cameraKey, regions)
+        self.cameraWidgetGroups[cameraKey].regionsWidget.setStatus(regions)
+
+    def clearRegions(self, cameraKey: str) -> None:
+        self.mainController.setRegions(cameraKey, [])
+        self.cameraWidgetGroups[cameraKey].regionsWidget.setStatus([])
+
+    def cameraFrameFormats(self) -> Dict[str, Tuple[tuple, str]]:
+        """Returns the frame shape and data type of each camera. The data type is taken
+        from the last acquired (or displayed) frame; cameras which have not acquired yet default to uint16."""
+        formats = {}
+        for key, buffer in self.mainController.rawBuffers.items():
+            dtype = "uint16"
+            if len(buffer.buffer) > 0:
+                dtype = buffer.buffer[0].dtype.name
+            elif f"Live {key}" in self.viewer.layers:
+                dtype = self.viewer.layers[f"Live {key}"].data.dtype.name
+            shape = tuple(buffer.frameShape)
+            binning = self.mainController.binnings.get(key)
+            if binning is not None and len(buffer.buffer) == 0:
+                shape = binning.outputShape(shape)
+            formats[key] = (shape, dtype)
+        return formats
+
     def refreshAvailableFilters(self):
         for key in self.cameraWidgetGroups.keys():
             tab = self.cameraWidgetGroups[key]
             previousIndex = tab.getFiltersComboCurrentIndex()
             self.filterGroupsDict = self.settings.getFilterGroupsDict()
-            tab.setFiltersCombo(self.filterGroupsDict)
+            self.filterGraphsDict = self.settings.getFilterGraphsDict()
+            tab.setFiltersCombo(
+                list(self.filterGroupsDict.keys()) + list(self.filterGraphsDict.keys())
+            )
             tab.setFiltersComboCurrentIndex(previousIndex)
 
+    def selectedFilter(self, cameraKey: str) -> Union[dict, FilterGraph]:
+        """Returns the filter group or the filter graph currently selected for a camera."""
+        cameraTab = self.cameraWidgetGroups[cameraKey]
+        selectedFilterName = cameraTab.getFiltersComboCurrentText()
+        if selectedFilterName in self.filterGraphsDict:
+            return FilterGraph(
+                self.filterGraphsDict[selectedFilterName], self.filterGroupsDict
+            )
+        return self.filterGroupsDict[selectedFilterName]
+
     def recordAndProcess(self, status: bool) -> None:
         self.mainController.appendToBuffer(status)
         if status:
@@ -120,6 +273,16 @@ class ViewerAnchor:
                 recordType=self.recordingWidget.recordComboBox.currentEnum(),
                 stackSize=self.recordingWidget.recordSize,
                 acquisitionTime=self.recordingWidget.recordSize,
+                accumulatedFrames=self.recordingWidget.accumulationSpinBox.value(),
+                accumulationMode=self.recordingWidget.accumulationComboBox.currentEnum(),
+                writeFrames=self.recordingWidget.framesCheckBox.isChecked(),
+                trigger=self.recordingWidget.triggerWidget.triggerSettings,
+                compression=self.recordingWidget.compression,
+                pyramidLevels=self.recordingWidget.pyramidLevels,
+                rolloverBytes=self.recordingWidget.rolloverBytes,
+                rolloverSeconds=self.recordingWidget.rolloverSeconds,
+                backpressurePolicy=self.recordingWidget.backpressurePolicy,
+                backpressureSeconds=self.recordingWidget.backpressureSeconds,
             )
             writerInfoProcessed = WriterInfo(
                 folder=self.recordingWidget.folderTextEdit.text(),
@@ -128,20 +291,111 @@ class ViewerAnchor:
                 recordType=self.recordingWidget.recordComboBox.currentEnum(),
                 stackSize=self.recordingWidget.recordSize,
                 acquisitionTime=self.recordingWidget.recordSize,
+                statistics=self.recordingWidget.selectedStatistics,
+                statisticsFormat=self.recordingWidget.statisticsFormatComboBox.currentEnum(),
+                writeFrames=self.recordingWidget.framesCheckBox.isChecked(),
+                trigger=self.recordingWidget.triggerWidget.triggerSettings,
+                compression=self.recordingWidget.compression,
+                pyramidLevels=self.recordingWidget.pyramidLevels,
+                rolloverBytes=self.recordingWidget.rolloverBytes,
+                rolloverSeconds=self.recordingWidget.rolloverSeconds,
+                backpressurePolicy=self.recordingWidget.backpressurePolicy,
+                backpressureSeconds=self.recordingWidget.backpressureSeconds,
             )
 
             for key in cameraKeys:
-                cameraTab = self.cameraWidgetGroups[key]
-                selectedFilter = cameraTab.getFiltersComboCurrentText()
-                filtersList[key] = self.filterGroupsDict[selectedFilter]
-            self.mainController.process(filtersList, writerInfoProcessed)
-            self.mainController.record(cameraKeys, writerInfo)
+                filtersList[key] = self.selectedFilter(key)
+            self.mainController.recordAndProcess(
+                filtersList,
+                writerInfo,
+                writerInfoProcessed,
+                self.recordingWidget.recordingMode,
+            )
+            if self.recordingWidget.statisticsPlotCheckBox.isChecked():
+                self.startStatisticsPlots()
+
+    def checkRecordingCapacity(self) -> None:
+        """Checks whether the record folder can sustain the data rate of the cameras with the current
+        settings; raw frames are written once every accumulated group, processed frames once per frame,
+        as selected by the recording mode."""
+        if len(self.mainController.deviceControllers) == 0:
+            return
+        mode = self.recordingWidget.recordingMode
+        outputsPerFrame = 0.0
+        if self.recordingWidget.framesCheckBox.isChecked():
+            if mode != RecordingMode["Processed"]:
+                outputsPerFrame += 1 / self.recordingWidget.accumulationSpinBox.value()
+            if mode != RecordingMode["Raw"]:
+                outputsPerFrame += 1
+        self.recordingWidget.preflightButton.setEnabled(False)
+        self.recordingWidget.preflightLabel.setText("Checking the record folder...")
+        self.recordingWidget.preflightLabel.show()
+        self.mainController.checkRecordingCapacity(
+            self.recordingWidget.folderTextEdit.text(), outputsPerFrame
+        )
+
+    def startStatisticsPlots(self) -> None:
+        """Shows a live plot of the statistics recorded for each camera, replacing the plots of previous recordings."""
+        self.stopStatisticsPlots()
+        for key, plot in self.statisticsPlots.items():
+            self.viewer.window.remove_dock_widget(plot)
+        self.statisticsPlots.clear()
+        for key, recorder in self.mainController.statisticsRecorders.items():
+            plot = StatisticsPlot(recorder.history, recorder.columns)
+            self.viewer.window.add_dock_widget(
+                plot, name=f"Statistics {key}", area="bottom"
+            )
+            self.statisticsPlots[key] = plot
+            plot.timer.start()
+        # new plots follow the current display rate
+        self.setDisplayRateReduced(self.isDisplayRateReduced)
+
+    def handleWriterBehind(self, cameraKey: str, stage: str) -> None:
+        """Warns that a writer cannot keep up with the camera and, if the backpressure policy
+        of the recording requires it, refreshes the live layers and the plots of the statistics
+        less often until the writers catch up."""
+        status = self.mainController.writerMonitors[cameraKey][stage].status
+        policy = self.mainController.backpressurePolicy
+        message = (
+            f"The {stage} frames of {cameraKey} are written slower than they are acquired "
+            f"({status.framesPerSecond:.1f} fps, {status.bytesPerSecond / 2**20:.1f} MiB/s, "
+            f"{status.queueDepth} frames waiting)."
+        )
+        if policy == BackpressurePolicy["Reduce display rate"]:
+            self.setDisplayRateReduced(True)
+            message += " The display rate is reduced until the writers catch up."
+        elif policy == BackpressurePolicy["Drop processed frames"]:
+            message += " Frames are not processed until the writers catch up."
+        elif policy == BackpressurePolicy["Stop recording"]:
+            message += " The recording is stopped."
+        show_warning(message)
+
+    def handleWriterCaughtUp(self, cameraKey: str, stage: str) -> None:
+        """Restores the display rate once none of the writers is behind."""
+        if not any(
+            monitor.isBehind
+            for monitors in self.mainController.writerMonitors.values()
+            for monitor in monitors.values()
+        ):
+            self.setDisplayRateReduced(False)
+
+    def setDisplayRateReduced(self, reduced: bool) -> None:
+        """Refreshes the live layers and the plots of the statistics REDUCED_DISPLAY_RATE_FACTOR
+        times less often (if `reduced` is True) or at their normal rate."""
+        self.isDisplayRateReduced = reduced
+        factor = REDUCED_DISPLAY_RATE_FACTOR if reduced else 1
+        self.liveTimer.setInterval(THIRTY_FPS * factor)
+        for plot in self.statisticsPlots.values():
+            plot.timer.setInterval(plot.refreshInterval * factor)
+
+    def stopStatisticsPlots(self) -> None:
+        for plot in self.statisticsPlots.values():
+            plot.timer.stop()
+            plot.updatePlot()
 
     def snap(self) -> None:
         for key in self.mainController.deviceControllers.keys():
-            cameraTab = self.cameraWidgetGroups[key]
-            selectedFilterName = cameraTab.getFiltersComboCurrentText()
-            selectedFilter = self.filterGroupsDict[selectedFilterName]
+            selectedFilter = self.selectedFilter(key)
             self._updateLayer(
                 f"Snap {key}", self.mainController.snap(key, selectedFilter)
             )
@@ -151,10 +405,10 @@ class ViewerAnchor:
         cameraKeys = list(self.cameraWidgetGroups.keys())
         filtersList = {}
         for key in cameraKeys:
-            cameraTab = self.cameraWidgetGroups[key]
-            selectedFilter = cameraTab.getFiltersComboCurrentText()
-            filtersList[key] = self.filterGroupsDict[selectedFilter]
-        self.mainController.live(status,filtersList)
+            filtersList[key] = self.selectedFilter(key)
+        self.mainController.live(
+            status, filtersList, self.recordingWidget.liveModeComboBox.currentEnum()
+        )
         if status:
             self.liveTimer.start()
         else:
@@ -192,9 +446,28 @@ class ViewerAnchor:
                 self._updateLayer(
                     f"Live {key}", np.copy(self.mainController.returnNewestFrame(key))
                 )
+                self.cameraWidgetGroups[key].setSkippedFrames(
+                    self.mainController.skippedFrames[key]
+                )
+                # secondary outputs of a filter graph are shown in separate layers
+                for outputName in list(self.mainController.graphOutputs[key].keys()):
+                    frame = self.mainController.returnNewestFrame(key, outputName)
+                    if frame is not None:
+                        self._updateLayer(f"Live {key} [{outputName}]", np.copy(frame))
         except Exception as e:
             pass
 
+    def _updateBufferStatus(self) -> None:
+        for key, tab in self.cameraWidgetGroups.items():
+            buffer = self.mainController.rawBuffers.get(key)
+            if buffer is not None:
+                tab.bufferWidget.setStatus(buffer.memoryUsage, buffer.compressionRatio)
+            monitors = self.mainController.writerMonitors.get(key, {})
+            tab.setWriterStatus(
+                {stage: monitor.status for stage, monitor in monitors.items()},
+                self.mainController.droppedProcessedFrames.get(key, 0),
+            )
+
     def _updateLayer(self, layerKey: str, data: np.ndarray) -> None:
         try:
             # layer is recreated in case the image changes type (i.e. grayscale -> RGB and viceversa)
@@ -9,6 +9,8 @@ from qtpy.QtWidgets import (
     QLabel,
     QComboBox,
     QSpinBox,
+    QDoubleSpinBox,
+    QCheckBox,
     QLineEdit,
     QScrollArea,
     QPushButton,
@@ -18,9 +20,16 @@ from qtpy.QtWidgets import (
     QFormLayout,
     QGridLayout,
     QGroupBox,
+    QToolButton,
+    QMenu,
+    QVBoxLayout,
 )
+from pyqtgraph import PlotWidget, mkPen
 from napari_live_recording.control.devices.interface import NumberParameter
 from napari_live_recording.control.devices import ICamera
+from napari_live_recording.control.compression import AVAILABLE_CODECS
+from napari_live_recording.control.throughput import WriterStatus
+from napari_live_recording.control.preflight import RecordingCapacity
 from superqt import QLabeledSlider, QLabeledDoubleSlider, QEnumComboBox
 from abc import ABC, abstractmethod
 from dataclasses import replace
@@ -29,12 +38,24 @@ from napari_live_recording.common import (
     ROI,
     FileFormat,
     RecordType,
+    ProcessingMode,
+    AccumulationMode,
+    MAX_FLOAT32_SUMMED_FRAMES,
+    BinningMode,
+    BackpressurePolicy,
+    RecordingMode,
+    StatisticsFormat,
+    TriggerMetric,
+    TriggerSettings,
+    AVAILABLE_BINNING_FACTORS,
+    AVAILABLE_STATISTICS,
+    FILE_COMPRESSIONS,
     MMC_DEVICE_MAP,
     microscopeDeviceDict,
     baseRecordingFolder,
     Settings,
 )
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Tuple
 from napari_live_recording.processing_engine.processing_gui import (
     FilterGroupCreationWidget,
 )
@@ -417,6 +438,86 @@ class CameraSelection(QObject):
         self.addButton.setEnabled(idx > 0)
 
 
+class TriggerHandling(QWidget):
+    def __init__(self) -> None:
+        """Trigger Handling widget. Defines the widgets to set the change metric, threshold
+        and pre/post-roll of a triggered recording.
+
+        Widget layout:
+        |(0,0) QEnumComboBox (Metric)        |(0,1) QDoubleSpinBox (Threshold)   |
+        |(1,0) QDoubleSpinBox (Pixel level)  |(1,1) QSpinBox (Subsampling)       |
+        |(2,0) QSpinBox (Pre-roll)           |(2,1) QSpinBox (Post-roll)         |
+        """
+        QWidget.__init__(self)
+        defaults = TriggerSettings()
+
+        self.metricComboBox = QEnumComboBox(enum_class=TriggerMetric)
+        self.metricComboBox.setCurrentEnum(defaults.metric)
+        self.metricComboBox.setToolTip(
+            "Mean absolute difference: change from a running background; "
+            "Pixels above level: number of pixels brighter than the pixel level."
+        )
+        self.thresholdSpinBox = QDoubleSpinBox()
+        self.thresholdSpinBox.setRange(0, 1e9)
+        self.thresholdSpinBox.setValue(defaults.threshold)
+        self.thresholdSpinBox.setPrefix("Threshold ")
+        self.pixelLevelSpinBox = QDoubleSpinBox()
+        self.pixelLevelSpinBox.setRange(0, 1e9)
+        self.pixelLevelSpinBox.setValue(defaults.pixelLevel)
+        self.pixelLevelSpinBox.setPrefix("Pixel level ")
+        self.subsamplingSpinBox = QSpinBox()
+        self.subsamplingSpinBox.setRange(1, 64)
+        self.subsamplingSpinBox.setValue(defaults.subsampling)
+        self.subsamplingSpinBox.setPrefix("Subsampling ")
+        self.preRollSpinBox = QSpinBox()
+        self.preRollSpinBox.setRange(0, 10000)
+        self.preRollSpinBox.setValue(defaults.preRollFrames)
+        self.preRollSpinBox.setPrefix("Pre-roll ")
+        self.preRollSpinBox.setSuffix(" frames")
+        self.postRollSpinBox = QSpinBox()
+        self.postRollSpinBox.setRange(0, 10000)
+        self.postRollSpinBox.setValue(defaults.postRollFrames)
+        self.postRollSpinBox.setPrefix("Post-roll ")
+        self.postRollSpinBox.setSuffix(" frames")
+        for spinBox in [
+            self.thresholdSpinBox,
+            self.pixelLevelSpinBox,
+            self.subsamplingSpinBox,
+            self.preRollSpinBox,
+            self.postRollSpinBox,
+        ]:
+            spinBox.lineEdit().setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        layout = QGridLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.metricComboBox, 0, 0)
+        layout.addWidget(self.thresholdSpinBox, 0, 1)
+        layout.addWidget(self.pixelLevelSpinBox, 1, 0)
+        layout.addWidget(self.subsamplingSpinBox, 1, 1)
+        layout.addWidget(self.preRollSpinBox, 2, 0)
+        layout.addWidget(self.postRollSpinBox, 2, 1)
+
+        self.metricComboBox.currentEnumChanged.connect(self._onMetricChanged)
+        self._onMetricChanged(self.metricComboBox.currentEnum())
+
+        self.setLayout(layout)
+
+    def _onMetricChanged(self, metric: TriggerMetric) -> None:
+        self.pixelLevelSpinBox.setEnabled(metric == TriggerMetric["Pixels above level"])
+
+    @property
+    def triggerSettings(self) -> TriggerSettings:
+        """Returns the trigger settings currently selected."""
+        return TriggerSettings(
+            metric=self.metricComboBox.currentEnum(),
+            threshold=self.thresholdSpinBox.value(),
+            pixelLevel=self.pixelLevelSpinBox.value(),
+            subsampling=self.subsamplingSpinBox.value(),
+            preRollFrames=self.preRollSpinBox.value(),
+            postRollFrames=self.postRollSpinBox.value(),
+        )
+
+
 class RecordHandling(QObject):
     recordRequested = Signal(int)
     filterCreated = Signal()
@@ -429,13 +530,21 @@ class RecordHandling(QObject):
         - single frame snap;
 
         Widget layout:
-        |(0,1-2)   QComboBox (File Format)               |(0,2)   QLabel   |
+        |(0,0) QComboBox (File Format) |(0,1) QComboBox (Compression) |(0,2) QLabel |
         |(1,0-1)   QLineEdit (Folder selection)          |(1,2) QPushButton|
         |(2,0-2)   QLineEdit (Record filename)           |(2,2)   QLabel   |
-        |(3,0-2)   QSpinBox (Record size)                |(3,2)   QLabel   |
-        |(4,0-2)                  QPushButton (Snap)                       |
-        |(5,0-2)                  QPushButton (Live)                       |
-        |(6,0-2)                  QPushButton (Record)                     |
+        |(3,0-2)   QSpinBox (Record size) / Trigger      |(3,2)   QLabel   |
+        |(4,0-1)   QSpinBox (Accumulated frames)         |(4,2) QComboBox  |
+        |(5,0) QToolButton (Statistics) |(5,1) QComboBox |(5,2) QCheckBox  |
+        |(6,0) QCheckBox (Record frames) |(6,1) QComboBox |(6,2) QCheckBox  |
+        |(7,0) QDoubleSpinBox (Size)    |(7,1) QSpinBox  |(7,2)   QLabel   |
+        |(8,0) QComboBox (Backpressure) |(8,1) QDoubleSpinBox |(8,2) QLabel |
+        |(9,0-2)                  QPushButton (Snap)                       |
+        |(10,0-1)  QPushButton (Live)                    |(10,2) QComboBox |
+        |(11,0-2)                 QPushButton (Record)                     |
+        |(12,0-1)  QPushButton (Create Filter)           |(12,2) QPushButton|
+        |(13,0-2)                 QProgressBar (Record progress)           |
+        |(14,0-2)                 QLabel (Pre-flight check)                |
 
         """
         QObject.__init__(self)
@@ -443,9 +552,15 @@ class RecordHandling(QObject):
         self.group = QGroupBox()
         self.layout = QGridLayout()
 
+        # returns the frame shape and data type of each camera,
+        # used to benchmark filter-groups; set by the owner of the widget
+        self.cameraFrameFormats: Callable[[], Dict[str, Tuple[tuple, str]]] = dict
+
         self.formatLabel = QLabel("File format")
         self.formatComboBox = QEnumComboBox(enum_class=FileFormat)
         self.formatLabel.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.compressionComboBox = QComboBox()
+        self.compressionComboBox.setToolTip("Lossless compression of the recorded files.")
         if self.settings.settings.contains("recordFolder"):
             folder = self.settings.getSetting("recordFolder")
         else:
@@ -470,13 +585,126 @@ class RecordHandling(QObject):
         self.live = QPushButton("Live")
         self.record = QPushButton("Record")
         self.createFilter = QPushButton("Create Filter")
+        self.preflightButton = QPushButton("Check disk")
+        self.preflightButton.setToolTip(
+            "Measures the frame rate of the cameras and the write speed of the record folder, "
+            "and estimates the longest recording the folder can hold."
+        )
+        self.preflightLabel = QLabel()
+        self.preflightLabel.setWordWrap(True)
+        self.preflightLabel.hide()
 
         self.live.setCheckable(True)
         self.record.setCheckable(True)
 
+        self.liveModeComboBox = QEnumComboBox(enum_class=ProcessingMode)
+        self.liveModeComboBox.setCurrentEnum(ProcessingMode["Latest only"])
+        self.liveModeComboBox.setToolTip(
+            "Scheduling of the filters during live view. "
+            "'Latest only' processes the newest frame and discards older ones, "
+            "so that the display latency stays low when filters are slower than the camera."
+        )
+
         self.recordSpinBox = QSpinBox()
         self.recordSpinBox.lineEdit().setAlignment(Qt.AlignmentFlag.AlignCenter)
 
+        self.accumulationSpinBox = QSpinBox()
+        self.accumulationSpinBox.lineEdit().setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.accumulationSpinBox.setRange(1, 1000)
+        self.accumulationSpinBox.setValue(1)
+        self.accumulationSpinBox.setPrefix("Accumulate ")
+        self.accumulationSpinBox.setSuffix(" frames")
+        self.accumulationSpinBox.setToolTip(
+            "Number of consecutive frames combined into each recorded frame (raw recording only). "
+            "1 records every frame.\n"
+            f"ImageJ TIFF files store sums as 32-bit floats, which hold the sum of at most "
+            f"{MAX_FLOAT32_SUMMED_FRAMES} 16-bit frames exactly."
+        )
+        self.accumulationComboBox = QEnumComboBox(enum_class=AccumulationMode)
+        self.accumulationComboBox.setCurrentEnum(AccumulationMode["Average"])
+
+        # per-frame statistics of the processed frames, streamed to a file while recording
+        self.statisticsButton = QToolButton()
+        self.statisticsButton.setText("Statistics")
+        self.statisticsButton.setPopupMode(QToolButton.InstantPopup)
+        self.statisticsMenu = QMenu(self.statisticsButton)
+        self.statisticsActions = {}
+        for statistic in AVAILABLE_STATISTICS:
+            action = self.statisticsMenu.addAction(statistic)
+            action.setCheckable(True)
+            self.statisticsActions[statistic] = action
+        self.statisticsButton.setMenu(self.statisticsMenu)
+        self.statisticsButton.setToolTip(
+            "Per-frame statistics of the processed frames written to a file while recording."
+        )
+        self.statisticsFormatComboBox = QEnumComboBox(enum_class=StatisticsFormat)
+        self.statisticsPlotCheckBox = QCheckBox("Live plot")
+        self.framesCheckBox = QCheckBox("Record frames")
+        self.framesCheckBox.setChecked(True)
+        self.framesCheckBox.setToolTip(
+            "When unchecked, only the per-frame statistics are recorded."
+        )
+
+        self.recordingModeComboBox = QEnumComboBox(enum_class=RecordingMode)
+        self.recordingModeComboBox.setCurrentEnum(RecordingMode["Raw and processed"])
+        self.recordingModeComboBox.setToolTip(
+            "Frames written by the recording: the raw frames, the processed frames "
+            "(required for statistics), or both in separate files."
+        )
+
+        self.pyramidCheckBox = QCheckBox("Pyramid")
+        self.pyramidCheckBox.setToolTip(
+            "Also store a downsampled (2x2 average) copy of the frames in the OME-Zarr file."
+        )
+        self.handleFileFormatChanged(self.formatComboBox.currentEnum())
+        self.updateAccumulationRange()
+
+        # long recordings are split into several files of limited size or duration
+        self.rolloverSizeSpinBox = QDoubleSpinBox()
+        self.rolloverSizeSpinBox.lineEdit().setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.rolloverSizeSpinBox.setRange(0, 1024)
+        self.rolloverSizeSpinBox.setDecimals(1)
+        self.rolloverSizeSpinBox.setSuffix(" GB")
+        self.rolloverSizeSpinBox.setSpecialValueText("No size limit")
+        self.rolloverSizeSpinBox.setToolTip(
+            "Maximum size of each recorded file; a new file is started when it is reached.\n"
+            "Without a limit, OME-TIFF files larger than 4 GB are written as BigTIFF,\n"
+            "while ImageJ TIFF files are still split at 4 GB (ImageJ does not support BigTIFF)."
+        )
+        self.rolloverTimeSpinBox = QSpinBox()
+        self.rolloverTimeSpinBox.lineEdit().setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.rolloverTimeSpinBox.setRange(0, 24 * 60)
+        self.rolloverTimeSpinBox.setSuffix(" min")
+        self.rolloverTimeSpinBox.setSpecialValueText("No time limit")
+        self.rolloverTimeSpinBox.setToolTip(
+            "Maximum duration of each recorded file; a new file is started when it is reached."
+        )
+        self.rolloverLabel = QLabel("File rollover")
+        self.rolloverLabel.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        # reaction to a writer which cannot keep up with the camera
+        self.backpressureComboBox = QEnumComboBox(enum_class=BackpressurePolicy)
+        self.backpressureComboBox.setToolTip(
+            "Reaction when a writer falls behind the camera while recording; "
+            "a warning is always shown."
+        )
+        self.backpressureSpinBox = QDoubleSpinBox()
+        self.backpressureSpinBox.lineEdit().setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.backpressureSpinBox.setRange(0.5, 60)
+        self.backpressureSpinBox.setDecimals(1)
+        self.backpressureSpinBox.setValue(2)
+        self.backpressureSpinBox.setPrefix("after ")
+        self.backpressureSpinBox.setSuffix(" s")
+        self.backpressureSpinBox.setToolTip(
+            "Time a writer can lag behind the camera before the reaction is triggered."
+        )
+        self.backpressureLabel = QLabel("Writer backpressure")
+        self.backpressureLabel.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        # settings of triggered recordings, shown in place of the record size
+        self.triggerWidget = TriggerHandling()
+        self.triggerWidget.hide()
+
         self.recordProgress = QProgressBar()
 
         # TODO: this is currently hardcoded
@@ -485,19 +713,38 @@ class RecordHandling(QObject):
         self.recordSpinBox.setRange(1, 5000)
         self.recordSpinBox.setValue(100)
 
-        self.layout.addWidget(self.formatComboBox, 0, 0, 1, 2)
+        self.layout.addWidget(self.formatComboBox, 0, 0)
+        self.layout.addWidget(self.compressionComboBox, 0, 1)
         self.layout.addWidget(self.formatLabel, 0, 2)
         self.layout.addWidget(self.folderTextEdit, 1, 0, 1, 2)
         self.layout.addWidget(self.folderButton, 1, 2)
         self.layout.addWidget(self.filenameTextEdit, 2, 0, 1, 2)
         self.layout.addWidget(self.filenameLabel, 2, 2)
         self.layout.addWidget(self.recordSpinBox, 3, 0, 1, 2)
+        self.layout.addWidget(self.triggerWidget, 3, 0, 1, 2)
         self.layout.addWidget(self.recordComboBox, 3, 2)
-        self.layout.addWidget(self.snap, 4, 0, 1, 3)
-        self.layout.addWidget(self.live, 5, 0, 1, 3)
-        self.layout.addWidget(self.record, 6, 0, 1, 3)
-        self.layout.addWidget(self.recordProgress, 8, 0, 1, 3)
-        self.layout.addWidget(self.createFilter, 7, 0, 1, 3)
+        self.layout.addWidget(self.accumulationSpinBox, 4, 0, 1, 2)
+        self.layout.addWidget(self.accumulationComboBox, 4, 2)
+        self.layout.addWidget(self.statisticsButton, 5, 0)
+        self.layout.addWidget(self.statisticsFormatComboBox, 5, 1)
+        self.layout.addWidget(self.statisticsPlotCheckBox, 5, 2)
+        self.layout.addWidget(self.framesCheckBox, 6, 0)
+        self.layout.addWidget(self.recordingModeComboBox, 6, 1)
+        self.layout.addWidget(self.pyramidCheckBox, 6, 2)
+        self.layout.addWidget(self.rolloverSizeSpinBox, 7, 0)
+        self.layout.addWidget(self.rolloverTimeSpinBox, 7, 1)
+        self.layout.addWidget(self.rolloverLabel, 7, 2)
+        self.layout.addWidget(self.backpressureComboBox, 8, 0)
+        self.layout.addWidget(self.backpressureSpinBox, 8, 1)
+        self.layout.addWidget(self.backpressureLabel, 8, 2)
+        self.layout.addWidget(self.snap, 9, 0, 1, 3)
+        self.layout.addWidget(self.live, 10, 0, 1, 2)
+        self.layout.addWidget(self.liveModeComboBox, 10, 2)
+        self.layout.addWidget(self.record, 11, 0, 1, 3)
+        self.layout.addWidget(self.recordProgress, 13, 0, 1, 3)
+        self.layout.addWidget(self.createFilter, 12, 0, 1, 2)
+        self.layout.addWidget(self.preflightButton, 12, 2)
+        self.layout.addWidget(self.preflightLabel, 14, 0, 1, 3)
         self.group.setLayout(self.layout)
         self.group.setFlat(True)
 
@@ -510,9 +757,14 @@ class RecordHandling(QObject):
 
         self.folderButton.clicked.connect(self.handleFolderSelection)
         self.recordComboBox.currentEnumChanged.connect(self.handleRecordTypeChanged)
+        self.formatComboBox.currentEnumChanged.connect(self.handleFileFormatChanged)
+        self.formatComboBox.currentEnumChanged.connect(self.updateAccumulationRange)
+        self.accumulationComboBox.currentEnumChanged.connect(self.updateAccumulationRange)
 
     def openFilterCreationWindow(self) -> None:
-        self.selectionWindow = FilterGroupCreationWidget()
+        self.selectionWindow = FilterGroupCreationWidget(
+            cameraFrameFormats=self.cameraFrameFormats()
+        )
         self.selectionWindow.filterAdded.connect(lambda: self.filterCreated.emit())
         self.selectionWindow.show()
 
@@ -525,13 +777,70 @@ class RecordHandling(QObject):
             self.folderTextEdit.setText(folder)
             self.settings.setSetting("recordFolder", folder)
 
+    def handleFileFormatChanged(self, fileFormat: FileFormat) -> None:
+        """Shows the compressions available for the selected file format.
+
+        Args:
+            fileFormat (FileFormat): new file format.
+        """
+        self.compressionComboBox.clear()
+        for compression in FILE_COMPRESSIONS[fileFormat]:
+            self.compressionComboBox.addItem(
+                "No compression" if compression is None else compression, compression
+            )
+        self.compressionComboBox.setEnabled(self.compressionComboBox.count() > 1)
+        self.pyramidCheckBox.setVisible(fileFormat == FileFormat["OME-Zarr"])
+
+    def updateAccumulationRange(self) -> None:
+        """Limits the number of summed frames for ImageJ TIFF files, which store sums as float32."""
+        isFloat32Sum = (
+            self.formatComboBox.currentEnum() == FileFormat["ImageJ TIFF"]
+            and self.accumulationComboBox.currentEnum() == AccumulationMode["Sum"]
+        )
+        self.accumulationSpinBox.setMaximum(MAX_FLOAT32_SUMMED_FRAMES if isFloat32Sum else 1000)
+
+    @property
+    def compression(self) -> str:
+        """Returns the compression currently selected (None if the files are not compressed)."""
+        return self.compressionComboBox.currentData()
+
+    @property
+    def pyramidLevels(self) -> int:
+        """Returns the number of downsampled levels stored in OME-Zarr files."""
+        if self.formatComboBox.currentEnum() != FileFormat["OME-Zarr"]:
+            return 0
+        return int(self.pyramidCheckBox.isChecked())
+
+    @property
+    def rolloverBytes(self) -> int:
+        """Returns the maximum size of each recorded file in bytes (0 for no limit)."""
+        return int(self.rolloverSizeSpinBox.value() * 2**30)
+
+    @property
+    def rolloverSeconds(self) -> float:
+        """Returns the maximum duration of each recorded file in seconds (0 for no limit)."""
+        return self.rolloverTimeSpinBox.value() * 60.0
+
+    @property
+    def recordingMode(self) -> RecordingMode:
+        return self.recordingModeComboBox.currentEnum()
+
+    @property
+    def backpressurePolicy(self) -> BackpressurePolicy:
+        return self.backpressureComboBox.currentEnum()
+
+    @property
+    def backpressureSeconds(self) -> float:
+        return self.backpressureSpinBox.value()
+
     def handleRecordTypeChanged(self, recordType: RecordType) -> None:
         """Handles the change of the record type.
 
         Args:
             recordType (RecordType): new record type.
         """
-        if recordType == RecordType["Toggled"]:
+        self.triggerWidget.setVisible(recordType == RecordType["Triggered"])
+        if recordType in [RecordType["Toggled"], RecordType["Triggered"]]:
             self.recordSpinBox.setEnabled(False)
             self.recordSpinBox.hide()
         else:
@@ -558,6 +867,7 @@ class RecordHandling(QObject):
         """
         self.snap.setEnabled(not status)
         self.record.setEnabled(not status)
+        self.liveModeComboBox.setEnabled(not status)
 
     def handleRecordToggled(self, status: bool) -> None:
         """Enables/Disables pushbuttons when the record button is toggled.
@@ -568,12 +878,64 @@ class RecordHandling(QObject):
         self.snap.setEnabled(not status)
         self.live.setEnabled(not status)
         self.recordSpinBox.setEnabled(not status)
+        self.accumulationSpinBox.setEnabled(not status)
+        self.accumulationComboBox.setEnabled(not status)
+        self.statisticsButton.setEnabled(not status)
+        self.statisticsFormatComboBox.setEnabled(not status)
+        self.statisticsPlotCheckBox.setEnabled(not status)
+        self.framesCheckBox.setEnabled(not status)
+        self.recordingModeComboBox.setEnabled(not status)
+        self.triggerWidget.setEnabled(not status)
+        self.formatComboBox.setEnabled(not status)
+        self.pyramidCheckBox.setEnabled(not status)
+        self.rolloverSizeSpinBox.setEnabled(not status)
+        self.rolloverTimeSpinBox.setEnabled(not status)
+        self.backpressureComboBox.setEnabled(not status)
+        self.backpressureSpinBox.setEnabled(not status)
+        self.preflightButton.setEnabled(not status)
+        self.compressionComboBox.setEnabled(
+            not status and self.compressionComboBox.count() > 1
+        )
         
+    def setRecordingCapacity(self, capacity: RecordingCapacity) -> None:
+        """Shows the result of the pre-flight check of the record folder."""
+        self.preflightButton.setEnabled(True)
+        text = (
+            f"Disk: {capacity.writeSpeed / 2**20:.0f} MiB/s, "
+            f"needed: {capacity.dataRate / 2**20:.1f} MiB/s. "
+        )
+        if not capacity.isSustainable:
+            text += "The folder is too slow for the cameras: frames will be lost. "
+        if capacity.maxSeconds == float("inf"):
+            text += f"Free space: {capacity.freeBytes / 2**30:.1f} GiB."
+        else:
+            hours, rest = divmod(int(capacity.maxSeconds), 3600)
+            text += (
+                f"Free space: {capacity.freeBytes / 2**30:.1f} GiB, "
+                f"enough for {hours} h {rest // 60} min {rest % 60} s."
+            )
+        self.preflightLabel.setText(text)
+        self.preflightLabel.show()
+
+    def setRecordingCapacityError(self, message: str) -> None:
+        self.preflightButton.setEnabled(True)
+        self.preflightLabel.setText(f"Pre-flight check failed: {message}")
+        self.preflightLabel.show()
+
     @property
     def recordSize(self) -> int:
         """Returns the record size currently indicated in the QSpinBox widget."""
         return self.recordSpinBox.value()
 
+    @property
+    def selectedStatistics(self) -> Tuple[str, ...]:
+        """Returns the per-frame statistics selected for recording."""
+        return tuple(
+            statistic
+            for statistic, action in self.statisticsActions.items()
+            if action.isChecked()
+        )
+
     @property
     def signals(self) -> Dict[str, Signal]:
         """Returns a dictionary of signals available for the RecordHandling widget.
@@ -582,7 +944,8 @@ class RecordHandling(QObject):
         - snapRequested,
         - albumRequested,
         - liveRequested,
-        - recordRequested
+        - recordRequested,
+        - preflightRequested
 
         Returns:
             Dict: Dict of signals (key: function name, value: function objects).
@@ -591,9 +954,46 @@ class RecordHandling(QObject):
             "snapRequested": self.snap.clicked,
             "liveRequested": self.live.toggled,
             "recordRequested": self.record.toggled,
+            "preflightRequested": self.preflightButton.clicked,
         }
 
 
+class StatisticsPlot(QWidget):
+    def __init__(self, history: Callable[[], np.ndarray], columns: List[str]) -> None:
+        """Live plot of the per-frame statistics of a camera during recording.
+        The latest rows of statistics are polled at a low rate, independently of the camera frame rate.
+
+        Args:
+            history (Callable[[], np.ndarray]): returns the latest rows of statistics (first column: frame index).
+            columns (List[str]): names of the columns of the statistics.
+        """
+        QWidget.__init__(self)
+        self.history = history
+        self.plotWidget = PlotWidget()
+        self.plotWidget.addLegend()
+        self.plotWidget.setLabel("bottom", "Frame")
+        self.curves = [
+            self.plotWidget.plot(pen=mkPen(index, len(columns) - 1), name=column)
+            for index, column in enumerate(columns[1:])
+        ]
+        layout = QVBoxLayout()
+        layout.addWidget(self.plotWidget)
+        self.setLayout(layout)
+
+        # refresh interval of the plot (ms)
+        self.refreshInterval = 100
+        self.timer = QTimer()
+        self.timer.setInterval(self.refreshInterval)
+        self.timer.timeout.connect(self.updatePlot)
+
+    def updatePlot(self) -> None:
+        rows = self.history()
+        if len(rows) == 0:
+            return
+        for index, curve in enumerate(self.curves):
+            curve.setData(rows[:, 0], rows[:, index + 1])
+
+
 class ROIHandling(QWidget):
     changeROIRequested = Signal(ROI)
     fullROIRequested = Signal(ROI)
@@ -727,6 +1127,273 @@ class ROIHandling(QWidget):
         }
 
 
+class BinningHandling(QWidget):
+    binningChanged = Signal(int, BinningMode)
+
+    def __init__(self) -> None:
+        """Binning Handling widget. Defines the widgets to select the software binning
+        applied to the frames of the device right after they are acquired.
+
+        Widget layout:
+        |(0,0) QLabel |(0,1) QComboBox (Factor) |(0,2) QEnumComboBox (Mode) |
+        """
+        QWidget.__init__(self)
+
+        self.binningLabel = QLabel("Binning")
+        self.binningLabel.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.factorComboBox = QComboBox()
+        for factor in AVAILABLE_BINNING_FACTORS:
+            self.factorComboBox.addItem(f"{factor}x{factor}", factor)
+        self.modeComboBox = QEnumComboBox(enum_class=BinningMode)
+        self.modeComboBox.setCurrentEnum(BinningMode["Mean"])
+        self.modeComboBox.setToolTip(
+            "Sum: sum of each block of pixels (wider data type); "
+            "Mean: average of each block of pixels; "
+            "Decimation: first pixel of each block."
+        )
+        self.modeComboBox.setEnabled(False)
+
+        layout = QGridLayout()
+        layout.addWidget(self.binningLabel, 0, 0)
+        layout.addWidget(self.factorComboBox, 0, 1)
+        layout.addWidget(self.modeComboBox, 0, 2)
+
+        self.factorComboBox.currentIndexChanged.connect(self._onBinningChanged)
+        self.modeComboBox.currentEnumChanged.connect(self._onBinningChanged)
+
+        self.setLayout(layout)
+
+    @property
+    def factor(self) -> int:
+        return self.factorComboBox.currentData()
+
+    def _onBinningChanged(self) -> None:
+        """Private slot for the binning settings. Exposes a signal with the updated binning."""
+        self.modeComboBox.setEnabled(self.factor > 1)
+        self.binningChanged.emit(self.factor, self.modeComboBox.currentEnum())
+
+    @property
+    def signals(self) -> Dict[str, Signal]:
+        """Returns a dictionary of signals available for the BinningHandling widget.
+        Exposed signals are:
+
+        - binningChanged
+
+        Returns:
+            Dict: Dict of signals (key: function name, value: function objects).
+        """
+        return {"binningChanged": self.binningChanged}
+
+
+class BufferHandling(QWidget):
+    compressionChanged = Signal(object)
+
+    def __init__(self) -> None:
+        """Buffer Handling widget. Defines the widgets to select the lossless compression
+        of the raw frames kept in memory and shows the memory used by the buffer.
+
+        Widget layout:
+        |(0,0) QLabel |(0,1) QComboBox (Codec) |
+        |(1,0-1)      QLabel (Status)          |
+        """
+        QWidget.__init__(self)
+
+        self.compressionLabel = QLabel("Buffer compression")
+        self.compressionLabel.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.codecComboBox = QComboBox()
+        self.codecComboBox.addItem("Off", None)
+        for codec in AVAILABLE_CODECS.keys():
+            self.codecComboBox.addItem(codec, codec)
+        self.codecComboBox.setToolTip(
+            "Lossless compression of the raw frames waiting to be written; "
+            "the buffer holds more frames in the same memory."
+        )
+        self.statusLabel = QLabel()
+        self.statusLabel.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.setStatus(0, 1.0)
+
+        layout = QGridLayout()
+        layout.addWidget(self.compressionLabel, 0, 0)
+        layout.addWidget(self.codecComboBox, 0, 1)
+        layout.addWidget(self.statusLabel, 1, 0, 1, 2)
+
+        self.codecComboBox.currentIndexChanged.connect(
+            lambda: self.compressionChanged.emit(self.codecComboBox.currentData())
+        )
+
+        self.setLayout(layout)
+
+    def setStatus(self, memoryUsage: int, compressionRatio: float) -> None:
+        """Shows the memory used by the buffer and the compression ratio of its frames."""
+        self.statusLabel.setText(
+            f"Buffer: {memoryUsage / 2**20:.1f} MiB (ratio {compressionRatio:.2f}x)"
+        )
+
+    @property
+    def signals(self) -> Dict[str, Signal]:
+        """Returns a dictionary of signals available for the BufferHandling widget.
+        Exposed signals are:
+
+        - compressionChanged
+
+        Returns:
+            Dict: Dict of signals (key: function name, value: function objects).
+        """
+        return {"compressionChanged": self.compressionChanged}
+
+
+class RegionsHandling(QWidget):
+    drawRequested = Signal()
+    applyRequested = Signal()
+    clearRequested = Signal()
+
+    def __init__(self) -> None:
+        """Regions Handling widget. Defines the widgets to record only a set of regions of interest
+        of the device, drawn as rectangles in a napari Shapes layer; each region is written to its own file.
+
+        Widget layout:
+        |(0,0) QPushButton (Draw)  |(0,1) QPushButton (Apply)  |
+        |(1,0) QPushButton (Clear) |(1,1) QLabel (Status)      |
+        """
+        QWidget.__init__(self)
+
+        self.drawButton = QPushButton("Draw regions")
+        self.drawButton.setToolTip(
+            "Adds a Shapes layer in which the regions to record are drawn as rectangles."
+        )
+        self.applyButton = QPushButton("Record regions")
+        self.applyButton.setToolTip(
+            "Records only the rectangles of the regions layer, each in its own file."
+        )
+        self.clearButton = QPushButton("Record full frame")
+        self.statusLabel = QLabel("Full frame")
+        self.statusLabel.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        layout = QGridLayout()
+        layout.addWidget(self.drawButton, 0, 0)
+        layout.addWidget(self.applyButton, 0, 1)
+        layout.addWidget(self.clearButton, 1, 0)
+        layout.addWidget(self.statusLabel, 1, 1)
+
+        self.drawButton.clicked.connect(self.drawRequested.emit)
+        self.applyButton.clicked.connect(self.applyRequested.emit)
+        self.clearButton.clicked.connect(self.clearRequested.emit)
+
+        self.setLayout(layout)
+
+    def setStatus(self, regions: List[ROI]) -> None:
+        """Shows how many regions are recorded."""
+        self.statusLabel.setText(
+            f"{len(regions)} region(s)" if len(regions) > 0 else "Full frame"
+        )
+
+    @property
+    def signals(self) -> Dict[str, Signal]:
+        """Returns a dictionary of signals available for the RegionsHandling widget.
+        Exposed signals are:
+
+        - drawRequested,
+        - applyRequested,
+        - clearRequested
+
+        Returns:
+            Dict: Dict of signals (key: function name, value: function objects).
+        """
+        return {
+            "drawRequested": self.drawRequested,
+            "applyRequested": self.applyRequested,
+            "clearRequested": self.clearRequested,
+        }
+
+
+class CalibrationHandling(QWidget):
+    captureRequested = Signal(str, int)
+    clearRequested = Signal()
+    optionsChanged = Signal(bool, bool)
+
+    def __init__(self) -> None:
+        """Calibration Handling widget. Defines the widgets to capture the master dark and flat frames
+        of the device and to enable the flat-field correction applied before the filters.
+
+        Widget layout:
+        |(0,0) QLabel              |(0,1) QSpinBox (Number of frames)     |
+        |(1,0) QPushButton (Dark)  |(1,1) QPushButton (Flat)              |
+        |(2,0) QCheckBox (Enable)  |(2,1) QCheckBox (Fixed-point)         |
+        |(3,0) QPushButton (Clear) |(3,1) QLabel (Status)                 |
+        """
+        QWidget.__init__(self)
+
+        self.framesLabel = QLabel("Averaged frames")
+        self.framesLabel.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.framesSpinBox = QSpinBox()
+        self.framesSpinBox.lineEdit().setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.framesSpinBox.setRange(1, 1000)
+        self.framesSpinBox.setValue(20)
+
+        self.captureDarkButton = QPushButton("Capture dark")
+        self.captureFlatButton = QPushButton("Capture flat")
+        self.clearButton = QPushButton("Clear calibration")
+        self.enableCheckBox = QCheckBox("Flat-field correction")
+        self.fixedPointCheckBox = QCheckBox("Fixed-point output")
+        self.fixedPointCheckBox.setToolTip(
+            "Compute the correction with integer arithmetic and output 16-bit frames."
+        )
+        self.statusLabel = QLabel("No masters")
+        self.statusLabel.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        layout = QGridLayout()
+        layout.addWidget(self.framesLabel, 0, 0)
+        layout.addWidget(self.framesSpinBox, 0, 1)
+        layout.addWidget(self.captureDarkButton, 1, 0)
+        layout.addWidget(self.captureFlatButton, 1, 1)
+        layout.addWidget(self.enableCheckBox, 2, 0)
+        layout.addWidget(self.fixedPointCheckBox, 2, 1)
+        layout.addWidget(self.clearButton, 3, 0)
+        layout.addWidget(self.statusLabel, 3, 1)
+
+        self.captureDarkButton.clicked.connect(
+            lambda: self.captureRequested.emit("dark", self.framesSpinBox.value())
+        )
+        self.captureFlatButton.clicked.connect(
+            lambda: self.captureRequested.emit("flat", self.framesSpinBox.value())
+        )
+        self.clearButton.clicked.connect(self.clearRequested.emit)
+        self.enableCheckBox.toggled.connect(self._onOptionsChanged)
+        self.fixedPointCheckBox.toggled.connect(self._onOptionsChanged)
+
+        self.setLayout(layout)
+
+    def setStatus(self, masters: List[str]) -> None:
+        """Shows which master frames are currently available."""
+        self.statusLabel.setText(
+            "Masters: " + ", ".join(masters) if len(masters) > 0 else "No masters"
+        )
+
+    def _onOptionsChanged(self) -> None:
+        """Private slot for the calibration options. Exposes a signal with the updated options."""
+        self.optionsChanged.emit(
+            self.enableCheckBox.isChecked(), self.fixedPointCheckBox.isChecked()
+        )
+
+    @property
+    def signals(self) -> Dict[str, Signal]:
+        """Returns a dictionary of signals available for the CalibrationHandling widget.
+        Exposed signals are:
+
+        - captureRequested,
+        - clearRequested,
+        - optionsChanged
+
+        Returns:
+            Dict: Dict of signals (key: function name, value: function objects).
+        """
+        return {
+            "captureRequested": self.captureRequested,
+            "clearRequested": self.clearRequested,
+            "optionsChanged": self.optionsChanged,
+        }
+
+
 class CameraTab(QObject):
     """Camera tab widget. Used to create a new tab for an added camera."""
 
@@ -786,9 +1453,22 @@ class CameraTab(QObject):
             self.layout.addWidget(scrollArea, 1, 0, 1, 2)
 
         self.deleteButton = QPushButton("Delete camera")
+        self.skippedFramesLabel = QLabel("Skipped frames (live): 0")
+        self.writerStatusLabel = QLabel()
+        self.setWriterStatus({})
 
         settingsLayout.addRow(self.deleteButton)
+        settingsLayout.addRow(self.skippedFramesLabel)
+        settingsLayout.addRow(self.writerStatusLabel)
         settingsLayout.addRow(self.roiWidget)
+        self.binningWidget = BinningHandling()
+        settingsLayout.addRow(self.binningWidget)
+        self.regionsWidget = RegionsHandling()
+        settingsLayout.addRow(self.regionsWidget)
+        self.bufferWidget = BufferHandling()
+        settingsLayout.addRow(self.bufferWidget)
+        self.calibrationWidget = CalibrationHandling()
+        settingsLayout.addRow(self.calibrationWidget)
         settingsGroup.setLayout(settingsLayout)
         self.layout.addWidget(settingsGroup)
         self.widget.setLayout(self.layout)
@@ -804,3 +1484,33 @@ class CameraTab(QObject):
 
     def setFiltersComboCurrentIndex(self, index: int):
         self.filtersCombo.combobox.setCurrentIndex(index)
+
+    def setSkippedFrames(self, skippedFrames: int):
+        self.skippedFramesLabel.setText(f"Skipped frames (live): {skippedFrames}")
+
+    def setWriterStatus(
+        self, statuses: Dict[str, WriterStatus], droppedProcessedFrames: int = 0
+    ) -> None:
+        """Shows the throughput of the writers of the latest recording of the camera.
+
+        Args:
+            statuses (Dict[str, WriterStatus]): status of each writer ("raw", "processed").
+            droppedProcessedFrames (int, optional): frames not processed because the writers were behind. Defaults to 0.
+        """
+        if len(statuses) == 0:
+            self.writerStatusLabel.setText("Writers: idle")
+            return
+        lines = []
+        for stage, status in statuses.items():
+            line = (
+                f"Writer ({stage}): {status.framesPerSecond:.1f} fps, "
+                f"{status.bytesPerSecond / 2**20:.1f} MiB/s, queue {status.queueDepth}"
+            )
+            if status.droppedFrames > 0:
+                line += f", {status.droppedFrames} lost"
+            if status.isBehind:
+                line += " (behind)"
+            lines.append(line)
+        if droppedProcessedFrames > 0:
+            lines.append(f"Frames not processed: {droppedProcessedFrames}")
+        self.writerStatusLabel.setText("\n".join(lines))